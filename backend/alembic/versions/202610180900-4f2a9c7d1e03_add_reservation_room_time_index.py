@@ -0,0 +1,68 @@
+"""add_reservation_room_time_index
+
+Composite (room_id, end_datetime, start_datetime) index for overlap probes and
+day listings, plus a btree_gist exclusion constraint that rejects overlapping
+reservations of the same room atomically.
+
+end_datetime leads start_datetime so `end_datetime > :start` only touches the
+room's current/future bookings instead of its whole history.
+
+The old check-then-insert path could store overlapping bookings, and the
+constraint cannot be added while any exist. The upgrade looks for them first
+and, if there are any, stops with the conflicting reservation ids instead of
+picking which booking to delete: cancel or move one of each pair, then re-run.
+
+Revision ID: 4f2a9c7d1e03
+Revises: e107b614e6d9
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c7d1e03'
+down_revision: Union[str, None] = 'e107b614e6d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_OVERLAPS_SHOWN = 20
+
+
+def _assert_no_overlaps() -> None:
+    pairs = op.get_bind().execute(sa.text(
+        "SELECT a.reservation_id, b.reservation_id FROM reservations a "
+        "JOIN reservations b ON a.room_id = b.room_id AND a.reservation_id < b.reservation_id "
+        "AND a.start_datetime < b.end_datetime AND b.start_datetime < a.end_datetime "
+        "ORDER BY a.reservation_id, b.reservation_id LIMIT :n"
+    ), {"n": _OVERLAPS_SHOWN + 1}).all()
+    if pairs:
+        listed = "\n".join(f"  {a} <-> {b}" for a, b in pairs[:_OVERLAPS_SHOWN])
+        more = "\n  ..." if len(pairs) > _OVERLAPS_SHOWN else ""
+        raise RuntimeError(
+            "reservations에 같은 회의실의 겹치는 예약이 있어 ex_reservations_room_no_overlap을 추가할 수 없습니다. "
+            f"각 쌍 중 하나를 취소하거나 옮긴 뒤 다시 실행하세요:\n{listed}{more}"
+        )
+
+
+def upgrade() -> None:
+    _assert_no_overlaps()
+    op.create_index(
+        'ix_reservations_room_time',
+        'reservations',
+        ['room_id', 'end_datetime', 'start_datetime'],
+    )
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        "ALTER TABLE reservations ADD CONSTRAINT ex_reservations_room_no_overlap "
+        "EXCLUDE USING gist (room_id WITH =, tsrange(start_datetime, end_datetime, '[)') WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE reservations DROP CONSTRAINT ex_reservations_room_no_overlap')
+    op.drop_index('ix_reservations_room_time', table_name='reservations')
@@ -0,0 +1,40 @@
+"""add_topology_meta
+
+Single-row table holding the topology version. `python -m app.db.seed` bumps
+it whenever a YAML sync changes buildings/floors/rooms, and API processes
+compare it against their cached snapshot instead of reloading every table.
+source_hash is the digest of the YAML last applied, so an unchanged file is
+not even parsed.
+
+Revision ID: 9b3e5f1a7c24
+Revises: 4f2a9c7d1e03
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5f1a7c24'
+down_revision: Union[str, None] = '4f2a9c7d1e03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'topology_meta',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('source_hash', sa.String(length=64), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("INSERT INTO topology_meta (id, version, source_hash, updated_at) VALUES (1, 1, '', CURRENT_TIMESTAMP)")
+
+
+def downgrade() -> None:
+    op.drop_table('topology_meta')
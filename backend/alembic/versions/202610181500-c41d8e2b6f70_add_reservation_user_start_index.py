@@ -0,0 +1,33 @@
+"""add_reservation_user_start_index
+
+(user_name, start_datetime) index for "my reservations": the user filter,
+the start-time range and the ORDER BY start_datetime of the keyset-paginated
+listing are all served from it instead of a reservations scan and sort.
+
+Revision ID: c41d8e2b6f70
+Revises: 9b3e5f1a7c24
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e2b6f70'
+down_revision: Union[str, None] = '9b3e5f1a7c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_reservations_user_start',
+        'reservations',
+        ['user_name', 'start_datetime'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_user_start', table_name='reservations')
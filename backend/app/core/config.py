@@ -1,9 +1,11 @@
 import os
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
 
 _root_app = Path(__file__).resolve().parent.parent.parent  # backend/
 # Load .env from project root (meeting_room_agent/) then backend/ for overrides
@@ -24,15 +26,152 @@ def get_database_url() -> str:
     return f"postgresql://{user}:{password}@{host}:{port}/{dbname}"
 
 
-_llm: Optional[ChatOpenAI] = None
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url() -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one (asyncpg/aiosqlite)."""
+    url = get_database_url()
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def get_db_pool_size() -> int:
+    return int(os.getenv("DB_POOL_SIZE", "10"))
+
+
+def get_db_max_overflow() -> int:
+    return int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+
+def get_topology_ttl_seconds() -> float:
+    return float(os.getenv("TOPOLOGY_TTL_SECONDS", "300"))
+
+
+def get_business_hours() -> tuple:
+    """(open, close) as datetime.time from BUSINESS_HOURS_START/END ("HH:MM"), default 09:00-19:00."""
+    from datetime import datetime as _dt
+    start = _dt.strptime(os.getenv("BUSINESS_HOURS_START", "09:00"), "%H:%M").time()
+    end = _dt.strptime(os.getenv("BUSINESS_HOURS_END", "19:00"), "%H:%M").time()
+    return start, end
+
+
+def get_suggest_days() -> int:
+    """Days searched for alternative slots, starting with the requested day."""
+    return max(1, int(os.getenv("SUGGEST_DAYS", "3")))
+
+
+def get_suggest_nearby_rooms() -> int:
+    """Other rooms (same floor first, then nearest floors) searched for alternative slots."""
+    return max(0, int(os.getenv("SUGGEST_NEARBY_ROOMS", "0")))
+
+
+def get_batch_concurrency() -> int:
+    """Default parallelism of /run/batch (BATCH_CONCURRENCY)."""
+    return max(1, int(os.getenv("BATCH_CONCURRENCY", "8")))
+
+
+def get_batch_max_queries() -> int:
+    return int(os.getenv("BATCH_MAX_QUERIES", "200"))
+
+
+def get_checkpointer_backend() -> str:
+    """'memory' (per-process LRU of conversation threads) or 'postgres' (langgraph-checkpoint-postgres)."""
+    return os.getenv("CHECKPOINTER", "memory").strip().lower()
+
+
+def get_checkpoint_max_threads() -> int:
+    return max(1, int(os.getenv("CHECKPOINT_MAX_THREADS", "1000")))
+
+
+def is_occupancy_index_enabled() -> bool:
+    """Per-process occupancy bitmaps in front of the store (app/db/occupancy.py); single-worker only."""
+    return _env_flag("OCCUPANCY_INDEX", "0")
+
+
+def get_occupancy_slot_minutes() -> int:
+    return int(os.getenv("OCCUPANCY_SLOT_MINUTES", "5"))
+
 
+def get_occupancy_horizon_days() -> int:
+    return max(1, int(os.getenv("OCCUPANCY_HORIZON_DAYS", "60")))
 
-def get_llm() -> ChatOpenAI:
+
+def get_reservation_store_backend() -> str:
+    """'sql' (default, SQLAlchemy repository) or 'memory' (process-local, see app/db/memory_store.py)."""
+    return os.getenv("RESERVATION_STORE", "sql").strip().lower()
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_fast_path_enabled() -> bool:
+    return _env_flag("FAST_PATH_ENABLED", "1")
+
+
+def get_fast_path_min_confidence() -> float:
+    return float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.85"))
+
+
+def get_router_mode() -> str:
+    """'combined' (one LLM call for intent + slots) or 'two_step' (intent call, then slot call)."""
+    return os.getenv("ROUTER_MODE", "combined").strip().lower()
+
+
+def get_reporter_mode() -> str:
+    """'template' (no LLM), 'polish' (template reworded by the LLM) or 'llm' (LLM only)."""
+    return os.getenv("REPORTER_MODE", "template").strip().lower()
+
+
+def get_llm_model_name() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4.1")
+
+
+def is_llm_cache_enabled() -> bool:
+    return _env_flag("LLM_CACHE_ENABLED", "1")
+
+
+def get_llm_cache_size() -> int:
+    return int(os.getenv("LLM_CACHE_SIZE", "1024"))
+
+
+def get_llm_cache_backend() -> str:
+    """'memory' (per-process LRU only) or 'sqlite' (LRU in front of a file shared by workers)."""
+    return os.getenv("LLM_CACHE_BACKEND", "memory").strip().lower()
+
+
+def get_llm_cache_path() -> str:
+    return os.getenv("LLM_CACHE_PATH", str(_root_app / "data" / "llm_cache.sqlite3"))
+
+
+_llm: Optional["BaseChatModel"] = None
+
+
+def get_llm_provider() -> str:
+    """'openai' (default) or 'fake' (offline fixture corpus, see app/core/fake_llm.py)."""
+    return os.getenv("LLM_PROVIDER", "openai").strip().lower()
+
+
+def get_llm() -> "BaseChatModel":
+    """Process-wide chat model; LangChain/OpenAI are imported on the first call, not with this module."""
     global _llm
+    if _llm is None and get_llm_provider() == "fake":
+        from app.core.fake_llm import FakeChatModel
+        _llm = FakeChatModel(
+            corpus_path=os.getenv("FAKE_LLM_CORPUS", str(_root_app / "data" / "fake_llm_corpus.yml")),
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")),
+        )
     if _llm is None:
+        from langchain_openai import ChatOpenAI
         _llm = ChatOpenAI(
             api_key=os.getenv("OPENAI_API_KEY"),
-            model=os.getenv("OPENAI_MODEL", "gpt-4.1"),
+            model=get_llm_model_name(),
             temperature=0.2,
             max_retries=2,
             max_tokens=None,
@@ -48,7 +187,7 @@ def __getattr__(name: str):
 
 
 def check_env_set() -> tuple:
-    required = ["OPENAI_API_KEY"]
+    required = ["OPENAI_API_KEY"] if get_llm_provider() == "openai" else []
     missing = [k for k in required if not os.getenv(k)]
     if missing:
         return False, ", ".join(missing)
@@ -0,0 +1,168 @@
+"""Offline stand-in for ChatOpenAI used by benchmarks and load tests (LLM_PROVIDER=fake).
+
+Structured calls (RouterExtract, RouteOut and the *Slots models) are answered
+from a YAML fixture corpus matched on the normalized query (an entry's `more`
+list fills RouterExtract.more for multi-request queries); free-text calls
+(reporter) echo a short summary of the last message. Every call sleeps
+FAKE_LLM_LATENCY_MS first so graph timings resemble a real model.
+"""
+import asyncio
+import re
+import time
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import yaml
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+
+from app.core.llm_cache import normalize_query
+from app.core.state import BookExtract, CheckExtract, FindExtract
+
+_EXTRACTS = {"Check": CheckExtract, "Find": FindExtract, "Book": BookExtract}
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 2)
+
+
+def _last_human(messages: List[BaseMessage]) -> str:
+    for m in reversed(messages):
+        if isinstance(m, HumanMessage):
+            return m.content if isinstance(m.content, str) else str(m.content)
+    return ""
+
+
+class FakeChatModel(BaseChatModel):
+    corpus_path: str
+    latency_ms: float = 0.0
+    _entries: Optional[Dict[str, Dict[str, Any]]] = PrivateAttr(default=None)
+    _entries_day: Optional[date] = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-corpus"
+
+    def _corpus(self) -> Dict[str, Dict[str, Any]]:
+        """Corpus keyed by normalized query, with {today}/{tomorrow} filled in for the current day."""
+        today = date.today()
+        if self._entries is None or self._entries_day != today:
+            with open(self.corpus_path, "r", encoding="utf-8") as f:
+                raw = yaml.safe_load(f) or {}
+            subs = {"today": today.isoformat(), "tomorrow": (today + timedelta(days=1)).isoformat()}
+
+            def fill(value: Any) -> Any:
+                if isinstance(value, str):
+                    return re.sub(r"\{(today|tomorrow)\}", lambda m: subs[m.group(1)], value)
+                if isinstance(value, dict):
+                    return {k: fill(v) for k, v in value.items()}
+                if isinstance(value, list):
+                    return [fill(v) for v in value]
+                return value
+
+            entries = {}
+            for item in raw.get("responses", []):
+                item = fill(item)
+                entries[normalize_query(item["query"])] = item
+            self._entries, self._entries_day = entries, today
+        return self._entries
+
+    def queries(self) -> List[str]:
+        return [entry["query"] for entry in self._corpus().values()]
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        return self._corpus().get(normalize_query(query))
+
+    def _structured(self, schema, query: str) -> Any:
+        entry = self.lookup(query) or {"intent": "Unknown", "slots": {}}
+        intent, slots = entry["intent"], dict(entry.get("slots") or {})
+        name = schema.__name__
+        if name == "RouterExtract":
+            more = [_extract_values(m["intent"], dict(m.get("slots") or {})) for m in entry.get("more") or []]
+            return schema.model_validate({"result": _extract_values(intent, slots), "more": more})
+        if name == "RouteOut":
+            return schema(intent=intent, params={} if intent in _EXTRACTS else slots)
+        return schema.model_validate(_defaults(schema, slots))
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        prompt = "".join(str(m.content) for m in messages)
+        text = "처리 결과: " + _last_human(messages)[:200]
+        return AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": _approx_tokens(prompt),
+                "output_tokens": _approx_tokens(text),
+                "total_tokens": _approx_tokens(prompt) + _approx_tokens(text),
+            },
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        for word in re.findall(r"\S+\s*", self._reply(messages).content):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+            if run_manager:
+                await run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs: Any):
+        async def call(messages: List[BaseMessage]) -> Any:
+            await asyncio.sleep(self.latency_ms / 1000)
+            parsed = self._structured(schema, _last_human(messages))
+            if not include_raw:
+                return parsed
+            raw = self._reply(messages)
+            return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+        return RunnableLambda(call, name=f"FakeStructured[{schema.__name__}]")
+
+
+def _extract_values(intent: str, slots: Dict[str, Any]) -> Dict[str, Any]:
+    """One RouterExtract item (result or an element of more) for a corpus intent and slots."""
+    extract = _EXTRACTS.get(intent)
+    if extract is not None:
+        return _defaults(extract, {**slots, "intent": intent})
+    need_more = intent == "Unknown"
+    return {
+        "intent": intent, "params": slots, "need_more": need_more,
+        "ask_user": "요청을 이해하지 못했어요. 다시 말씀해 주세요." if need_more else "",
+    }
+
+
+def _defaults(schema, values: Dict[str, Any]) -> Dict[str, Any]:
+    """`values` plus empty defaults for the schema's remaining required fields."""
+    out = dict(values)
+    for name, field in schema.model_fields.items():
+        if name not in out and field.is_required():
+            out[name] = 0 if field.annotation is int else ""
+    return out
+
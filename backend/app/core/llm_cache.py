@@ -0,0 +1,189 @@
+"""Cache for structured LLM calls made by the router.
+
+Retries and repeated questions ("내 예약 보여줘 홍길동") produce the same
+structured output, so results are cached under a key built from the normalized
+query, the prompt name and version, the model name and today's date (relative
+dates such as "내일" resolve differently each day). Entries live in an
+in-process LRU; with LLM_CACHE_BACKEND=sqlite they are also written to a SQLite
+file so that every worker on the host shares them. Keys of a past day can never
+be hit again, so the file only keeps the current day's rows.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.config import (
+    get_llm_cache_backend,
+    get_llm_cache_path,
+    get_llm_cache_size,
+    get_llm_model_name,
+    is_llm_cache_enabled,
+)
+
+T = TypeVar("T", bound=BaseModel)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.~…]+$")
+
+
+def normalize_query(query: str) -> str:
+    """NFKC, lower case, collapsed whitespace and no trailing punctuation."""
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING.sub("", text)
+
+
+def make_key(query: str, prompt_name: str, prompt_version: str, schema: str, today: str) -> str:
+    raw = json.dumps(
+        [normalize_query(query), prompt_name, prompt_version, schema, get_llm_model_name(), today],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class LLMCacheStats:
+    hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+llm_cache_stats = LLMCacheStats()
+
+
+class _LRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _SQLiteStore:
+    """Key/value table in a local SQLite file; calls are run off the event loop.
+
+    Each row records the day its key was built for, and the first write of a
+    new day deletes every older row.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._pruned_day = ""
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_cache)")}
+            if columns and "day" not in columns:
+                # File from before rows were dated: nothing in it is worth keeping.
+                conn.execute("DROP TABLE llm_cache")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, day TEXT NOT NULL, value TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_day ON llm_cache (day)")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, key: str, value: Dict[str, Any], day: str) -> None:
+        conn = self._conn()
+        if day > self._pruned_day:
+            conn.execute("DELETE FROM llm_cache WHERE day < ?", (day,))
+            self._pruned_day = day
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, day, value) VALUES (?, ?, ?)",
+            (key, day, json.dumps(value, ensure_ascii=False)),
+        )
+        conn.commit()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, value: Dict[str, Any], day: str) -> None:
+        await asyncio.to_thread(self._put, key, value, day)
+
+
+_lru: Optional[_LRU] = None
+_shared: Optional[_SQLiteStore] = None
+
+
+def _stores():
+    global _lru, _shared
+    if _lru is None:
+        _lru = _LRU(get_llm_cache_size())
+        if get_llm_cache_backend() == "sqlite":
+            _shared = _SQLiteStore(get_llm_cache_path())
+    return _lru, _shared
+
+
+def clear_llm_cache() -> None:
+    """Drop the in-process entries (the shared file is left alone)."""
+    if _lru is not None:
+        _lru.clear()
+
+
+async def cached_structured(
+    schema: Type[T],
+    query: str,
+    prompt_name: str,
+    prompt_version: str,
+    today: str,
+    call: Callable[[], Awaitable[T]],
+) -> T:
+    """Return the cached `schema` result for this query/prompt/model/day, or await `call` and cache it."""
+    if not is_llm_cache_enabled():
+        return await call()
+    lru, shared = _stores()
+    key = make_key(query, prompt_name, prompt_version, schema.__name__, today)
+    value = lru.get(key)
+    if value is None and shared is not None:
+        value = await shared.get(key)
+        if value is not None:
+            lru.put(key, value)
+            llm_cache_stats.shared_hits += 1
+    if value is not None:
+        llm_cache_stats.hits += 1
+        return schema.model_validate(value)
+    llm_cache_stats.misses += 1
+    result = await call()
+    value = result.model_dump(mode="json")
+    lru.put(key, value)
+    if shared is not None:
+        await shared.put(key, value, today)
+    return result
@@ -0,0 +1,142 @@
+"""Prometheus instrumentation for the agent: graph nodes, LLM calls, repository DB time and pools.
+
+Hot-path cost is a couple of perf_counter() calls and a labelled counter or
+histogram update per node, LLM call or repository call. Pool, fast-path,
+LLM-cache and occupancy-index figures are read only when /metrics is scraped.
+"""
+import asyncio
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+
+NODE_SECONDS = Histogram("agent_node_seconds", "Wall time per graph node", ["node"])
+LLM_SECONDS = Histogram(
+    "agent_llm_call_seconds", "LLM call latency per prompt", ["prompt"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0),
+)
+LLM_TOKENS = Counter("agent_llm_tokens", "LLM tokens per prompt", ["prompt", "kind"])
+DB_CALL_SECONDS = Histogram(
+    "agent_db_call_seconds", "Time per repository function call", ["function"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+DB_QUERIES = Counter("agent_db_queries", "SQL statements executed per repository function", ["function"])
+
+_db_function: ContextVar[str] = ContextVar("db_function", default="other")
+
+
+def timed_node(name: str, fn: Callable) -> Callable:
+    """Wrap a (sync or async) graph node so its wall time lands in agent_node_seconds."""
+    hist = NODE_SECONDS.labels(name)
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state):
+            t0 = time.perf_counter()
+            try:
+                return await fn(state)
+            finally:
+                hist.observe(time.perf_counter() - t0)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        t0 = time.perf_counter()
+        try:
+            return fn(state)
+        finally:
+            hist.observe(time.perf_counter() - t0)
+    return wrapper
+
+
+def db_timed(fn: Callable) -> Callable:
+    """Time a repository coroutine and attribute the statements it runs to its name."""
+    hist = DB_CALL_SECONDS.labels(fn.__name__)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = _db_function.set(fn.__name__)
+        t0 = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            hist.observe(time.perf_counter() - t0)
+            _db_function.reset(token)
+    return wrapper
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    DB_QUERIES.labels(_db_function.get()).inc()
+
+
+def instrument_engine(engine) -> None:
+    """Count every statement executed on `engine` (sync Engine or AsyncEngine)."""
+    target = getattr(engine, "sync_engine", engine)
+    if not event.contains(target, "before_cursor_execute", _count_statement):
+        event.listen(target, "before_cursor_execute", _count_statement)
+
+
+def observe_llm(prompt: str, seconds: float, message: Any = None) -> None:
+    """Record latency and, when the message carries usage_metadata, token counts."""
+    LLM_SECONDS.labels(prompt).observe(seconds)
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        LLM_TOKENS.labels(prompt, "input").inc(usage.get("input_tokens", 0))
+        LLM_TOKENS.labels(prompt, "output").inc(usage.get("output_tokens", 0))
+
+
+class _ScrapeTimeCollector:
+    """Pool, fast-path, LLM-cache and occupancy-index figures, read at scrape time only."""
+
+    def describe(self):
+        # Lets REGISTRY.register() learn the names without importing the modules read in collect().
+        yield GaugeMetricFamily("agent_db_pool_connections", "Connection pool state", labels=["engine", "state"])
+        yield CounterMetricFamily("agent_llm_cache", "LLM cache lookups", labels=["result"])
+        yield CounterMetricFamily("agent_fast_path", "Router fast-path attempts", labels=["result"])
+        yield CounterMetricFamily("agent_occupancy_index", "Availability reads by the occupancy bitmaps", labels=["result"])
+
+    def collect(self):
+        from app.core.llm_cache import llm_cache_stats
+        from app.db import session as db_session
+        from app.db.occupancy import occupancy_stats
+        from app.graph.fast_path import fast_path_stats
+
+        pool = GaugeMetricFamily("agent_db_pool_connections", "Connection pool state", labels=["engine", "state"])
+        for label, engine in (("sync", db_session._engine), ("async", db_session._async_engine)):
+            if engine is None:
+                continue
+            p = getattr(engine, "sync_engine", engine).pool
+            for state in ("size", "checkedin", "checkedout", "overflow"):
+                fn = getattr(p, state, None)
+                if fn is not None:
+                    pool.add_metric([label, state], fn())
+        yield pool
+
+        cache = CounterMetricFamily("agent_llm_cache", "LLM cache lookups", labels=["result"])
+        cache.add_metric(["hit"], llm_cache_stats.hits)
+        cache.add_metric(["shared_hit"], llm_cache_stats.shared_hits)
+        cache.add_metric(["miss"], llm_cache_stats.misses)
+        yield cache
+
+        fast = CounterMetricFamily("agent_fast_path", "Router fast-path attempts", labels=["result"])
+        fast.add_metric(["hit"], fast_path_stats.hits)
+        fast.add_metric(["miss"], fast_path_stats.misses)
+        yield fast
+
+        occupancy = CounterMetricFamily(
+            "agent_occupancy_index", "Availability reads by the occupancy bitmaps", labels=["result"]
+        )
+        occupancy.add_metric(["hit"], occupancy_stats.hits)
+        occupancy.add_metric(["fallback"], occupancy_stats.fallbacks)
+        yield occupancy
+
+
+REGISTRY.register(_ScrapeTimeCollector())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus text exposition and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
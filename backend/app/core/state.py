@@ -1,21 +1,25 @@
-from typing import Any, Dict, List, Literal, Optional, TypedDict, Annotated
+from typing import Any, Dict, List, Literal, Optional, TypedDict, Annotated, Union
 
 from pydantic import BaseModel, Field
 
 
 class AgentState(TypedDict):
     query: Annotated[str, "사용자 입력 원문"]
-    intent: Annotated[Literal["Check", "Book", "Change", "Cancel", "Mine", "Unknown"], "의도"]
+    intent: Annotated[Literal["Check", "Find", "Book", "Change", "Cancel", "Mine", "Unknown"], "의도"]
     params: Annotated[Dict[str, Any], "슬롯/파라미터"]
     need_more: Annotated[bool, "필수 슬롯 부족 여부"]
     ask_user: Annotated[str, "부족 슬롯에 대해 사용자에게 물을 질문"]
-    plan: Annotated[List[str], "실행할 도구 시퀀스(간단히 1개)"]
-    tool_result: Annotated[Optional[Dict[str, Any]], "도구 실행 결과"]
+    more_requests: Annotated[List[Dict[str, Any]], "한 쿼리에 함께 요청된 추가 작업들 ({intent, params})"]
+    plan: Annotated[List[str], "실행할 도구 이름 (steps 순서)"]
+    steps: Annotated[List[Dict[str, Any]], "실행 단계 ({id, tool, params, after: 먼저 끝나야 하는 단계 id})"]
+    results: Annotated[List[Optional[Dict[str, Any]]], "steps 순서의 도구 실행 결과"]
+    tool_result: Annotated[Optional[Dict[str, Any]], "첫 단계의 도구 실행 결과"]
     final_answer: Annotated[Optional[str], "최종 사용자 응답"]
+    pending_query: Annotated[str, "역질문으로 끝난 요청의 누적 원문 (대화 스레드의 다음 턴에서 이어 받음)"]
 
 
 class RouteOut(BaseModel):
-    intent: Literal["Check", "Book", "Change", "Cancel", "Mine", "Unknown"]
+    intent: Literal["Check", "Find", "Book", "Change", "Cancel", "Mine", "Unknown"]
     params: Dict[str, Any] = Field(default_factory=dict)
     need_more: bool = False
     ask_user: str = ""
@@ -30,6 +34,10 @@ class BookSlots(BaseModel):
     title: str = Field(description="회의 제목")
     start: str = Field(description="시작 시각, 반드시 YYYY-MM-DDTHH:MM")
     end: str = Field(description="종료 시각, 반드시 YYYY-MM-DDTHH:MM")
+    repeat: str = Field(default="", description="반복 예약이면 daily(매일) 또는 weekly(매주), 아니면 빈 문자열")
+    repeat_interval: int = Field(default=0, description="며칠/몇 주마다 반복 (격주 → 2), 말하지 않았으면 0")
+    repeat_count: int = Field(default=0, description="반복 총 횟수 (첫 회 포함), 말하지 않았으면 0")
+    repeat_until: str = Field(default="", description="반복 마지막 날짜 YYYY-MM-DD, 말하지 않았으면 빈 문자열")
 
 
 class CheckSlots(BaseModel):
@@ -38,3 +46,39 @@ class CheckSlots(BaseModel):
     room: str = Field(description="회의실 호실")
     start: str = Field(description="시작 시각 YYYY-MM-DDTHH:MM")
     end: str = Field(description="종료 시각 YYYY-MM-DDTHH:MM")
+
+
+class FindSlots(BaseModel):
+    building: str = Field(description="건물명")
+    floor: int = Field(description="층 수 숫자, 층을 말하지 않았으면 0")
+    start: str = Field(description="시작 시각 YYYY-MM-DDTHH:MM")
+    end: str = Field(description="종료 시각 YYYY-MM-DDTHH:MM")
+
+
+class CheckExtract(CheckSlots):
+    intent: Literal["Check"]
+
+
+class FindExtract(FindSlots):
+    intent: Literal["Find"]
+
+
+class BookExtract(BookSlots):
+    intent: Literal["Book"]
+
+
+class OtherExtract(BaseModel):
+    intent: Literal["Change", "Cancel", "Mine", "Unknown"]
+    params: Dict[str, Any] = Field(default_factory=dict, description="reservation_id, user_name, start/end 등 추출된 값")
+    need_more: bool = False
+    ask_user: str = ""
+
+
+Extract = Annotated[Union[CheckExtract, FindExtract, BookExtract, OtherExtract], Field(discriminator="intent")]
+
+
+class RouterExtract(BaseModel):
+    result: Extract = Field(description="의도와 해당 의도의 슬롯")
+    more: List[Extract] = Field(
+        default_factory=list, description="한 쿼리에 작업이 여럿이면 두 번째부터의 작업 (없으면 빈 목록)"
+    )
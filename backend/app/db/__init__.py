@@ -1,5 +1,6 @@
-from app.db.session import get_session, init_db
+from app.db.session import get_async_session, get_session, init_db, unit_of_work
 from app.db.models import Base, Building, Floor, Room, Reservation
+from app.db.store import ReservationStore, get_store, warm_store
 
 __all__ = [
     "Base",
@@ -7,6 +8,11 @@ __all__ = [
     "Floor",
     "Room",
     "Reservation",
+    "ReservationStore",
+    "get_async_session",
     "get_session",
+    "get_store",
     "init_db",
+    "unit_of_work",
+    "warm_store",
 ]
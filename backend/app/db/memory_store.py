@@ -0,0 +1,253 @@
+"""In-memory ReservationStore.
+
+Each room keeps its reservations as parallel sorted lists of starts, ends and
+ids. Reservations in one room never overlap, so both lists are sorted, and
+bisect gives O(log n) overlap checks and day windows. A per-user index serves
+"my reservations". One lock guards all state, so the store is safe to share
+between threads and the event loop. Each call is atomic on its own; the store
+does not take part in unit_of_work() transactions.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+_INDEXED = ("building_id", "floor_id", "room_id", "start_datetime", "end_datetime")
+
+
+def _row(
+    reservation_id: str, building_id: int, floor_id: int, room_id: int,
+    user_name: str, purpose: str, title: str,
+    start_datetime: datetime, end_datetime: datetime,
+) -> Dict[str, Any]:
+    return {
+        "reservation_id": reservation_id,
+        "building_id": building_id,
+        "floor_id": floor_id,
+        "room_id": room_id,
+        "user_name": user_name,
+        "purpose": purpose,
+        "title": title,
+        "start_datetime": start_datetime,
+        "end_datetime": end_datetime,
+    }
+
+
+class _RoomIndex:
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.ids: List[str] = []
+
+    def overlapping(self, start: datetime, end: datetime, exclude: Optional[str] = None) -> Optional[str]:
+        # Only intervals starting before `end` can overlap; the latest of them ends last.
+        i = bisect_left(self.starts, end) - 1
+        if i >= 0 and self.ids[i] == exclude:
+            i -= 1
+        if i >= 0 and self.ends[i] > start:
+            return self.ids[i]
+        return None
+
+    def _bounds(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        return bisect_right(self.ends, start), bisect_left(self.starts, end)
+
+    def window(self, start: datetime, end: datetime) -> List[str]:
+        """Ids of reservations intersecting [start, end), in start order."""
+        lo, hi = self._bounds(start, end)
+        return self.ids[lo:hi]
+
+    def intervals(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        lo, hi = self._bounds(start, end)
+        return list(zip(self.starts[lo:hi], self.ends[lo:hi]))
+
+    def insert(self, start: datetime, end: datetime, reservation_id: str) -> None:
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, reservation_id)
+
+    def remove(self, start: datetime, reservation_id: str) -> None:
+        i = bisect_left(self.starts, start)
+        while self.ids[i] != reservation_id:
+            i += 1
+        del self.starts[i], self.ends[i], self.ids[i]
+
+
+class MemoryReservationStore:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._rooms: Dict[int, _RoomIndex] = {}
+        self._by_user: Dict[str, Dict[str, None]] = {}
+
+    def _room(self, room_id: int) -> _RoomIndex:
+        index = self._rooms.get(room_id)
+        if index is None:
+            index = self._rooms[room_id] = _RoomIndex()
+        return index
+
+    def _insert(self, row: Dict[str, Any]) -> None:
+        rid = row["reservation_id"]
+        self._rows[rid] = row
+        self._room(row["room_id"]).insert(row["start_datetime"], row["end_datetime"], rid)
+        self._by_user.setdefault(row["user_name"], {})[rid] = None
+
+    def _remove(self, reservation_id: str) -> Optional[Dict[str, Any]]:
+        row = self._rows.pop(reservation_id, None)
+        if row is None:
+            return None
+        self._rooms[row["room_id"]].remove(row["start_datetime"], reservation_id)
+        self._by_user.get(row["user_name"], {}).pop(reservation_id, None)
+        return row
+
+    def _conflict(self, room_id: int, start: datetime, end: datetime, exclude: Optional[str] = None) -> Optional[str]:
+        index = self._rooms.get(room_id)
+        return index.overlapping(start, end, exclude) if index else None
+
+    async def find_overlapping(
+        self, building_id: int, floor_id: int, room_id: int,
+        new_start: datetime, new_end: datetime,
+        exclude_reservation_id: Optional[str] = None,
+    ) -> Optional[str]:
+        with self._lock:
+            return self._conflict(room_id, new_start, new_end, exclude_reservation_id)
+
+    async def busy_room_ids(self, room_ids: Iterable[int], start: datetime, end: datetime) -> Set[int]:
+        with self._lock:
+            return {rid for rid in room_ids if self._conflict(rid, start, end)}
+
+    async def room_intervals(
+        self, room_ids: Iterable[int], start: datetime, end: datetime
+    ) -> Dict[int, List[Tuple[datetime, datetime]]]:
+        with self._lock:
+            return {
+                rid: self._rooms[rid].intervals(start, end) if rid in self._rooms else []
+                for rid in room_ids
+            }
+
+    async def spans(self, start: datetime, end: datetime) -> List[Tuple[str, int, datetime, datetime]]:
+        with self._lock:
+            return [
+                (r["reservation_id"], r["room_id"], r["start_datetime"], r["end_datetime"])
+                for r in self._rows.values()
+                if r["start_datetime"] < end and r["end_datetime"] > start
+            ]
+
+    async def get(self, reservation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._rows.get(reservation_id)
+            return dict(row) if row else None
+
+    async def room_reservations(
+        self, building_id: int, floor_id: int, room_id: int, day: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            index = self._rooms.get(room_id)
+            if index is None:
+                return []
+            if day is None:
+                ids = list(index.ids)
+            else:
+                start_d = datetime.combine(day, datetime.min.time())
+                ids = index.window(start_d, start_d + timedelta(days=1))
+            rows = (self._rows[rid] for rid in ids)
+            return [
+                dict(r) for r in rows
+                if r["building_id"] == building_id and r["floor_id"] == floor_id
+            ]
+
+    def _try_add(self, row: Dict[str, Any]) -> Optional[str]:
+        rid = row["reservation_id"]
+        conflict = self._conflict(row["room_id"], row["start_datetime"], row["end_datetime"])
+        if conflict or rid in self._rows:
+            return conflict or rid
+        self._insert(row)
+        return None
+
+    async def try_add(
+        self, reservation_id: str, building_id: int, floor_id: int, room_id: int,
+        user_name: str, purpose: str, title: str,
+        start_datetime: datetime, end_datetime: datetime,
+    ) -> Optional[str]:
+        with self._lock:
+            return self._try_add(_row(
+                reservation_id, building_id, floor_id, room_id,
+                user_name, purpose, title, start_datetime, end_datetime,
+            ))
+
+    async def try_add_many(self, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+        conflicts: Dict[str, str] = {}
+        with self._lock:
+            for row in rows:
+                conflict = self._try_add(_row(**row))
+                if conflict:
+                    conflicts[row["reservation_id"]] = conflict
+        return conflicts
+
+    async def replace(
+        self, old_reservation_id: str, reservation_id: str,
+        building_id: int, floor_id: int, room_id: int,
+        user_name: str, purpose: str, title: str,
+        start_datetime: datetime, end_datetime: datetime,
+    ) -> Optional[str]:
+        with self._lock:
+            old = self._remove(old_reservation_id)
+            conflict = self._try_add(_row(
+                reservation_id, building_id, floor_id, room_id,
+                user_name, purpose, title, start_datetime, end_datetime,
+            ))
+            if conflict and old is not None:
+                self._insert(old)
+            return conflict
+
+    async def delete(self, reservation_id: str) -> bool:
+        with self._lock:
+            return self._remove(reservation_id) is not None
+
+    async def update(self, reservation_id: str, **kwargs: Any) -> bool:
+        with self._lock:
+            row = self._rows.get(reservation_id)
+            if row is None:
+                return False
+            values = {k: v for k, v in kwargs.items() if k in row}
+            if any(k in _INDEXED or k == "user_name" for k in values):
+                self._remove(reservation_id)
+                self._insert({**row, **values})
+            else:
+                row.update(values)
+            return True
+
+    async def user_reservations(
+        self, user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None,
+        limit: Optional[int] = None, after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        start_begin = datetime.combine(start_day, time(0, 0))
+        end_inclusive = datetime.combine(end_day, time(23, 59, 59))
+        with self._lock:
+            rows = [self._rows[rid] for rid in self._by_user.get(user_name, ())]
+        items = [
+            {
+                "reservation_id": r["reservation_id"],
+                "building_id": r["building_id"],
+                "floor_id": r["floor_id"],
+                "room_id": r["room_id"],
+                "title": r["title"],
+                "purpose": r["purpose"],
+                "start": r["start_datetime"],
+                "end": r["end_datetime"],
+            }
+            for r in rows
+            if r["start_datetime"] <= end_inclusive and r["end_datetime"] >= start_begin
+            and (building_id_filter is None or r["building_id"] == building_id_filter)
+            and (after is None or (r["start_datetime"], r["reservation_id"]) > after)
+        ]
+        items.sort(key=lambda x: (x["start"], x["reservation_id"]))
+        return items if limit is None else items[:limit]
+
+    async def iter_user_reservations(
+        self, user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        for item in await self.user_reservations(user_name, start_day, end_day, building_id_filter):
+            yield item
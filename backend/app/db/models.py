@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import DDL, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, column, event, func
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -43,6 +44,17 @@ class Room(Base):
     reservations: Mapped[list["Reservation"]] = relationship("Reservation", back_populates="room")
 
 
+class TopologyMeta(Base):
+    """Single row (id=1) whose version bumps whenever a topology sync changes buildings/floors/rooms."""
+
+    __tablename__ = "topology_meta"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    source_hash: Mapped[str] = mapped_column(String(64), nullable=False, default="")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
 class Reservation(Base):
     __tablename__ = "reservations"
 
@@ -54,8 +66,28 @@ class Reservation(Base):
     user_name: Mapped[str] = mapped_column(String(100), nullable=False)
     purpose: Mapped[str] = mapped_column(String(200), default="")
     title: Mapped[str] = mapped_column(String(200), nullable=False) 
-    notes: Mapped[str] = mapped_column(String(500), nullable=False)
+    notes: Mapped[str] = mapped_column(String(500), nullable=False, default="")
     start_datetime: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     end_datetime: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
+    __table_args__ = (
+        Index("ix_reservations_room_time", "room_id", "end_datetime", "start_datetime"),
+        Index("ix_reservations_user_start", "user_name", "start_datetime"),
+        ExcludeConstraint(
+            (column("room_id"), "="),
+            (func.tsrange(column("start_datetime"), column("end_datetime"), "[)"), "&&"),
+            name="ex_reservations_room_no_overlap",
+            using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+
     room: Mapped["Room"] = relationship("Room", back_populates="reservations")
+
+
+# The exclusion constraint needs btree_gist for the "=" on room_id; metadata.create_all
+# (seeding, benchmarks) must install it just like the alembic migration does.
+event.listen(
+    Reservation.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,336 @@
+"""Per-room, per-day occupancy bitmaps in front of a ReservationStore (OCCUPANCY_INDEX=1).
+
+A day is cut into OCCUPANCY_SLOT_MINUTES slots and each (room, day) keeps a
+Python int whose bit i is set when a reservation touches slot i: 288 bits for
+5-minute slots, a few dozen bytes per busy room-day. "Is this room free?" is
+one AND against a range mask, "which rooms are free?" one AND per room, and
+busy runs for gap finding come out of the bits directly.
+
+Only [today, today + OCCUPANCY_HORIZON_DAYS) is indexed. The index is loaded
+with one query at startup and again when the date rolls over, then follows
+the writes made through this store (after their unit of work commits).
+
+Bits are conservative: a clear range is free, but a set bit is conclusive only
+when the question and that day's reservations sit on slot boundaries.
+Inconclusive or out-of-horizon questions, and anything that needs a
+reservation id, go to the wrapped store. Writes from other processes are not
+seen, so the index is off by default and meant for single-worker deployments.
+"""
+import asyncio
+import weakref
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import get_occupancy_horizon_days, get_occupancy_slot_minutes
+from app.db.session import after_commit
+
+_Span = Tuple[datetime, datetime]
+_INDEXED = ("room_id", "start_datetime", "end_datetime")
+
+
+@dataclass
+class OccupancyStats:
+    hits: int = 0
+    fallbacks: int = 0
+
+
+occupancy_stats = OccupancyStats()
+
+
+def _runs(bits: int) -> Iterator[Tuple[int, int]]:
+    """[lo, hi) slot ranges of consecutive set bits, lowest first."""
+    while bits:
+        lo = (bits & -bits).bit_length() - 1
+        x = bits >> lo
+        length = (x ^ (x + 1)).bit_length() - 1
+        yield lo, lo + length
+        bits &= ~(((1 << length) - 1) << lo)
+
+
+class _Day:
+    __slots__ = ("bits", "spans", "ragged")
+
+    def __init__(self):
+        self.bits = 0
+        self.spans: Dict[str, _Span] = {}
+        self.ragged = 0  # spans not on slot boundaries
+
+
+class OccupancyIndex:
+    def __init__(self, first_day: Optional[date], slot_minutes: int, horizon_days: int):
+        self.first_day = first_day
+        self.slot = timedelta(minutes=slot_minutes)
+        self.horizon_days = horizon_days
+        self._days: Dict[Tuple[int, date], _Day] = {}
+        self._where: Dict[str, Tuple[int, datetime, datetime]] = {}
+
+    def horizon(self) -> _Span:
+        start = datetime.combine(self.first_day, time())
+        return start, start + timedelta(days=self.horizon_days)
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        if self.first_day is None:
+            return False
+        lo, hi = self.horizon()
+        return lo <= start and end <= hi
+
+    def _aligned(self, t: datetime) -> bool:
+        return (t - datetime.combine(t.date(), time())) % self.slot == timedelta(0)
+
+    def _day_masks(self, start: datetime, end: datetime) -> Iterator[Tuple[date, int]]:
+        """(day, slot mask) for each day of [start, end) inside the horizon."""
+        lo_h, hi_h = self.horizon()
+        start, end = max(start, lo_h), min(end, hi_h)
+        day = start.date()
+        while datetime.combine(day, time()) < end:
+            midnight = datetime.combine(day, time())
+            lo = (max(start, midnight) - midnight) // self.slot
+            hi = -((midnight - min(end, midnight + timedelta(days=1))) // self.slot)
+            yield day, (1 << hi) - (1 << lo)
+            day += timedelta(days=1)
+
+    def _mask(self, start: datetime, end: datetime) -> int:
+        return next(self._day_masks(start, end), (None, 0))[1]
+
+    def add(self, reservation_id: str, room_id: int, start: datetime, end: datetime) -> None:
+        self.remove(reservation_id)
+        if self.first_day is None:
+            return
+        ragged = not (self._aligned(start) and self._aligned(end))
+        for day, mask in self._day_masks(start, end):
+            entry = self._days.get((room_id, day))
+            if entry is None:
+                entry = self._days[(room_id, day)] = _Day()
+            entry.spans[reservation_id] = (start, end)
+            entry.bits |= mask
+            entry.ragged += ragged
+            self._where[reservation_id] = (room_id, start, end)
+
+    def remove(self, reservation_id: str) -> None:
+        where = self._where.pop(reservation_id, None)
+        if where is None:
+            return
+        room_id, start, end = where
+        for day, _ in self._day_masks(start, end):
+            entry = self._days[(room_id, day)]
+            del entry.spans[reservation_id]
+            if not entry.spans:
+                del self._days[(room_id, day)]
+                continue
+            # Neighbours may share an edge slot with the removed span, so recompute the day.
+            midnight = datetime.combine(day, time())
+            entry.bits = entry.ragged = 0
+            for s, e in entry.spans.values():
+                entry.bits |= self._mask(max(s, midnight), min(e, midnight + timedelta(days=1)))
+                entry.ragged += not (self._aligned(s) and self._aligned(e))
+
+    def span(self, reservation_id: str) -> Optional[Tuple[int, datetime, datetime]]:
+        return self._where.get(reservation_id)
+
+    def is_free(self, room_id: int, start: datetime, end: datetime) -> Optional[bool]:
+        """True/False when the bitmaps decide it, None when the store has to."""
+        if not self.covers(start, end):
+            return None
+        exact = self._aligned(start) and self._aligned(end)
+        for day, mask in self._day_masks(start, end):
+            entry = self._days.get((room_id, day))
+            if entry is not None and entry.bits & mask:
+                return False if exact and not entry.ragged else None
+        return True
+
+    def busy_intervals(self, room_id: int, start: datetime, end: datetime) -> Optional[List[_Span]]:
+        """Busy runs clipped to [start, end) in time order, or None when a day has off-slot spans."""
+        if not self.covers(start, end):
+            return None
+        out: List[_Span] = []
+        for day, mask in self._day_masks(start, end):
+            entry = self._days.get((room_id, day))
+            if entry is None:
+                continue
+            if entry.ragged:
+                return None
+            midnight = datetime.combine(day, time())
+            # The mask covers whole slots; clip so an off-slot query edge does not widen the first/last run.
+            out.extend(
+                (max(midnight + lo * self.slot, start), min(midnight + hi * self.slot, end))
+                for lo, hi in _runs(entry.bits & mask)
+            )
+        return out
+
+
+class OccupancyIndexedStore:
+    """ReservationStore answering availability from an OccupancyIndex and delegating the rest."""
+
+    def __init__(self, base, slot_minutes: Optional[int] = None, horizon_days: Optional[int] = None):
+        self._base = base
+        self._slot_minutes = slot_minutes or get_occupancy_slot_minutes()
+        self._horizon_days = horizon_days or get_occupancy_horizon_days()
+        if (24 * 60) % self._slot_minutes:
+            raise ValueError(f"OCCUPANCY_SLOT_MINUTES는 하루(1440분)를 나누어떨어지게 해야 합니다: {self._slot_minutes}")
+        self._index = OccupancyIndex(None, self._slot_minutes, self._horizon_days)
+        self._pending: Optional[List[Callable[[OccupancyIndex], None]]] = None
+        # One lock per event loop, as in services.topology: this store outlives asyncio.run() calls.
+        self._rebuild_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def rebuild(self) -> None:
+        """Reload the horizon starting today from the wrapped store (one query)."""
+        loop = asyncio.get_running_loop()
+        lock = self._rebuild_locks.get(loop)
+        if lock is None:
+            lock = self._rebuild_locks[loop] = asyncio.Lock()
+        async with lock:
+            if self._index.first_day == date.today():
+                return
+            index = OccupancyIndex(date.today(), self._slot_minutes, self._horizon_days)
+            # Writes committed while the snapshot loads are replayed on the new index.
+            self._pending = []
+            try:
+                for reservation_id, room_id, start, end in await self._base.spans(*index.horizon()):
+                    index.add(reservation_id, room_id, start, end)
+                for op in self._pending:
+                    op(index)
+                self._index = index
+            finally:
+                self._pending = None
+
+    async def _ready(self) -> OccupancyIndex:
+        if self._index.first_day != date.today():
+            await self.rebuild()
+        return self._index
+
+    def _apply(self, op: Callable[[OccupancyIndex], None]) -> None:
+        def run() -> None:
+            op(self._index)
+            if self._pending is not None:
+                self._pending.append(op)
+        after_commit(run)
+
+    async def find_overlapping(
+        self, building_id: int, floor_id: int, room_id: int,
+        new_start: datetime, new_end: datetime,
+        exclude_reservation_id: Optional[str] = None,
+    ) -> Optional[str]:
+        index = await self._ready()
+        if exclude_reservation_id is None and index.is_free(room_id, new_start, new_end):
+            occupancy_stats.hits += 1
+            return None
+        occupancy_stats.fallbacks += 1
+        return await self._base.find_overlapping(
+            building_id, floor_id, room_id, new_start, new_end, exclude_reservation_id
+        )
+
+    async def busy_room_ids(self, room_ids: Iterable[int], start: datetime, end: datetime) -> Set[int]:
+        index = await self._ready()
+        busy: Set[int] = set()
+        unknown: List[int] = []
+        for rid in room_ids:
+            free = index.is_free(rid, start, end)
+            if free is None:
+                unknown.append(rid)
+            elif not free:
+                busy.add(rid)
+        if not unknown:
+            occupancy_stats.hits += 1
+            return busy
+        occupancy_stats.fallbacks += 1
+        return busy | await self._base.busy_room_ids(unknown, start, end)
+
+    async def room_intervals(
+        self, room_ids: Iterable[int], start: datetime, end: datetime
+    ) -> Dict[int, List[_Span]]:
+        index = await self._ready()
+        out: Dict[int, List[_Span]] = {}
+        unknown: List[int] = []
+        for rid in room_ids:
+            intervals = index.busy_intervals(rid, start, end)
+            if intervals is None:
+                unknown.append(rid)
+            else:
+                out[rid] = intervals
+        if not unknown:
+            occupancy_stats.hits += 1
+            return out
+        occupancy_stats.fallbacks += 1
+        out.update(await self._base.room_intervals(unknown, start, end))
+        return out
+
+    async def spans(self, start: datetime, end: datetime) -> List[Tuple[str, int, datetime, datetime]]:
+        return await self._base.spans(start, end)
+
+    async def get(self, reservation_id: str) -> Optional[Dict[str, Any]]:
+        return await self._base.get(reservation_id)
+
+    async def room_reservations(
+        self, building_id: int, floor_id: int, room_id: int, day: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        return await self._base.room_reservations(building_id, floor_id, room_id, day)
+
+    async def try_add(
+        self, reservation_id: str, building_id: int, floor_id: int, room_id: int,
+        user_name: str, purpose: str, title: str,
+        start_datetime: datetime, end_datetime: datetime,
+    ) -> Optional[str]:
+        conflict = await self._base.try_add(
+            reservation_id, building_id, floor_id, room_id,
+            user_name, purpose, title, start_datetime, end_datetime,
+        )
+        if not conflict:
+            self._apply(lambda index: index.add(reservation_id, room_id, start_datetime, end_datetime))
+        return conflict
+
+    async def try_add_many(self, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+        conflicts = await self._base.try_add_many(rows)
+        added = [r for r in rows if r["reservation_id"] not in conflicts]
+        if added:
+            def op(index: OccupancyIndex) -> None:
+                for r in added:
+                    index.add(r["reservation_id"], r["room_id"], r["start_datetime"], r["end_datetime"])
+            self._apply(op)
+        return conflicts
+
+    async def replace(
+        self, old_reservation_id: str, reservation_id: str,
+        building_id: int, floor_id: int, room_id: int,
+        user_name: str, purpose: str, title: str,
+        start_datetime: datetime, end_datetime: datetime,
+    ) -> Optional[str]:
+        conflict = await self._base.replace(
+            old_reservation_id, reservation_id, building_id, floor_id, room_id,
+            user_name, purpose, title, start_datetime, end_datetime,
+        )
+        if not conflict:
+            def op(index: OccupancyIndex) -> None:
+                index.remove(old_reservation_id)
+                index.add(reservation_id, room_id, start_datetime, end_datetime)
+            self._apply(op)
+        return conflict
+
+    async def delete(self, reservation_id: str) -> bool:
+        ok = await self._base.delete(reservation_id)
+        if ok:
+            self._apply(lambda index: index.remove(reservation_id))
+        return ok
+
+    async def update(self, reservation_id: str, **kwargs: Any) -> bool:
+        ok = await self._base.update(reservation_id, **kwargs)
+        if ok and any(k in _INDEXED for k in kwargs):
+            row = await self._base.get(reservation_id)
+            if row is not None:
+                self._apply(lambda index: index.add(
+                    reservation_id, row["room_id"], row["start_datetime"], row["end_datetime"]
+                ))
+        return ok
+
+    async def user_reservations(
+        self, user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None,
+        limit: Optional[int] = None, after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._base.user_reservations(user_name, start_day, end_day, building_id_filter, limit, after)
+
+    def iter_user_reservations(
+        self, user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        return self._base.iter_user_reservations(user_name, start_day, end_day, building_id_filter)
@@ -1,119 +1,204 @@
 from datetime import date, datetime, time, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, delete, exists, func, insert, literal, select, tuple_, union_all, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Building, Floor, Reservation, Room
-from app.db.session import get_session
+from app.core.metrics import db_timed
+from app.db.models import Building, Floor, Reservation, Room, TopologyMeta
+from app.db.session import get_async_session, in_unit_of_work
 
+_PG_DEADLOCK = "40P01"
+_BULK_ADD_ATTEMPTS = 3
 
-def db_get_building_ids() -> Dict[str, int]:
-    with get_session() as session:
-        rows = session.execute(select(Building.id, Building.name)).all()
+
+def _is_booking_conflict(exc: DBAPIError) -> bool:
+    """Unique/exclusion violations, or a deadlock between two exclusion-constraint waiters."""
+    return isinstance(exc, IntegrityError) or getattr(exc.orig, "pgcode", None) == _PG_DEADLOCK
+
+
+@db_timed
+async def db_get_building_ids() -> Dict[str, int]:
+    async with get_async_session() as session:
+        rows = (await session.execute(select(Building.id, Building.name))).all()
         return {name: bid for bid, name in rows}
 
 
-def db_get_floor_ids(building_id: int) -> Dict[int, int]:
-    with get_session() as session:
-        rows = session.execute(
+@db_timed
+async def db_get_floor_ids(building_id: int) -> Dict[int, int]:
+    async with get_async_session() as session:
+        rows = (await session.execute(
             select(Floor.floor_number, Floor.id).where(Floor.building_id == building_id)
-        ).all()
+        )).all()
         return {fn: fid for fn, fid in rows}
 
 
-def db_get_rooms(building_id: int, floor_id: int) -> Optional[Dict[str, int]]:
-    with get_session() as session:
-        floor = session.execute(
-            select(Floor).where(and_(Floor.id == floor_id, Floor.building_id == building_id))
-        ).unique().scalars().one_or_none()
-        if not floor:
+@db_timed
+async def db_get_rooms(building_id: int, floor_id: int) -> Optional[Dict[str, int]]:
+    async with get_async_session() as session:
+        floor = await session.scalar(
+            select(Floor.id).where(and_(Floor.id == floor_id, Floor.building_id == building_id))
+        )
+        if floor is None:
             return None
-        rows = session.execute(select(Room.name, Room.id).where(Room.floor_id == floor_id)).all()
+        rows = (await session.execute(select(Room.name, Room.id).where(Room.floor_id == floor_id))).all()
         return {name: rid for name, rid in rows}
 
 
-def db_get_room_reservations(
+@db_timed
+async def db_load_topology() -> Tuple[List[Tuple[int, str]], List[Tuple[int, int, int]], List[Tuple[int, int, str]]]:
+    """All (id, name) buildings, (id, building_id, floor_number) floors and (id, floor_id, name) rooms."""
+    async with get_async_session() as session:
+        buildings = (await session.execute(select(Building.id, Building.name))).all()
+        floors = (await session.execute(select(Floor.id, Floor.building_id, Floor.floor_number))).all()
+        rooms = (await session.execute(select(Room.id, Room.floor_id, Room.name))).all()
+        return (
+            [tuple(r) for r in buildings],
+            [tuple(r) for r in floors],
+            [tuple(r) for r in rooms],
+        )
+
+
+@db_timed
+async def db_get_topology_version() -> int:
+    """topology_meta.version, bumped by every sync that changes the topology (0 if never synced)."""
+    async with get_async_session() as session:
+        version = await session.scalar(select(TopologyMeta.version).where(TopologyMeta.id == 1))
+        return version or 0
+
+
+# Reservation columns handed to services. Reads select these as Core rows so no
+# ORM entities (identity map, instance state) are built for rows turned into dicts.
+_RESERVATION_COLUMNS = (
+    Reservation.reservation_id,
+    Reservation.building_id,
+    Reservation.floor_id,
+    Reservation.room_id,
+    Reservation.user_name,
+    Reservation.purpose,
+    Reservation.title,
+    Reservation.start_datetime,
+    Reservation.end_datetime,
+)
+
+
+def _dicts(result) -> List[Dict[str, Any]]:
+    """Rows as plain dicts keyed by column label (zip over the keys: ~2x faster than dict(RowMapping))."""
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+@db_timed
+async def db_get_room_reservations(
     building_id: int, floor_id: int, room_id: int, day: Optional[date] = None
 ) -> List[Dict[str, Any]]:
-    with get_session() as session:
-        q = select(Reservation).where(
-            and_(
-                Reservation.building_id == building_id,
-                Reservation.floor_id == floor_id,
-                Reservation.room_id == room_id,
-            )
+    q = select(*_RESERVATION_COLUMNS).where(
+        Reservation.building_id == building_id,
+        Reservation.floor_id == floor_id,
+        Reservation.room_id == room_id,
+    )
+    if day is not None:
+        start_d = datetime.combine(day, datetime.min.time())
+        end_d = start_d + timedelta(days=1)
+        q = q.where(
+            Reservation.start_datetime < end_d,
+            Reservation.end_datetime > start_d,
         )
-        if day is not None:
-            start_d = datetime.combine(day, datetime.min.time())
-            end_d = start_d + timedelta(days=1)
-            q = q.where(
-                Reservation.start_datetime < end_d,
-                Reservation.end_datetime > start_d,
-            )
-        rows = session.execute(q).unique().scalars().all()
-        out = []
-        for r in rows:
-            out.append({
-                "reservation_id": r.reservation_id,
-                "building_id": r.building_id,
-                "floor_id": r.floor_id,
-                "room_id": r.room_id,
-                "user_name": r.user_name,
-                "purpose": r.purpose,
-                "title": r.title,
-                "start_datetime": r.start_datetime,
-                "end_datetime": r.end_datetime,
-            })
-        out.sort(key=lambda x: x["start_datetime"])
-        return out
+    async with get_async_session() as session:
+        return _dicts(await session.execute(q.order_by(Reservation.start_datetime)))
 
 
-def db_get_reservation(reservation_id: str) -> Optional[Dict[str, Any]]:
-    with get_session() as session:
-        r = session.execute(select(Reservation).where(Reservation.reservation_id == reservation_id)).unique().scalars().one_or_none()
-        if not r:
-            return None
-        return {
-            "reservation_id": r.reservation_id,
-            "building_id": r.building_id,
-            "floor_id": r.floor_id,
-            "room_id": r.room_id,
-            "user_name": r.user_name,
-            "purpose": r.purpose,
-            "title": r.title,
-            "start_datetime": r.start_datetime,
-            "end_datetime": r.end_datetime,
-        }
-
-
-def db_find_overlapping(
+@db_timed
+async def db_get_reservation(reservation_id: str) -> Optional[Dict[str, Any]]:
+    async with get_async_session() as session:
+        row = (await session.execute(
+            select(*_RESERVATION_COLUMNS).where(Reservation.reservation_id == reservation_id)
+        )).mappings().one_or_none()
+        return dict(row) if row is not None else None
+
+
+@db_timed
+async def db_find_overlapping(
     building_id: int, floor_id: int, room_id: int,
     new_start: datetime, new_end: datetime,
     exclude_reservation_id: Optional[str] = None,
 ) -> Optional[str]:
-    with get_session() as session:
-        q = select(Reservation).where(
-            and_(
-                Reservation.building_id == building_id,
-                Reservation.floor_id == floor_id,
-                Reservation.room_id == room_id,
-                Reservation.start_datetime < new_end,
-                Reservation.end_datetime > new_start,
+    q = select(Reservation.reservation_id).where(
+        Reservation.building_id == building_id,
+        Reservation.floor_id == floor_id,
+        Reservation.room_id == room_id,
+        Reservation.start_datetime < new_end,
+        Reservation.end_datetime > new_start,
+    )
+    if exclude_reservation_id:
+        q = q.where(Reservation.reservation_id != exclude_reservation_id)
+    async with get_async_session() as session:
+        return await session.scalar(q.limit(1))
+
+
+@db_timed
+async def db_get_busy_room_ids(room_ids: Iterable[int], start: datetime, end: datetime) -> Set[int]:
+    """Rooms among room_ids with any reservation overlapping [start, end), in one query."""
+    room_ids = list(room_ids)
+    if not room_ids:
+        return set()
+    async with get_async_session() as session:
+        rows = await session.execute(
+            select(Reservation.room_id).distinct().where(
+                Reservation.room_id.in_(room_ids),
+                Reservation.start_datetime < end,
+                Reservation.end_datetime > start,
+            )
+        )
+        return set(rows.scalars().all())
+
+
+@db_timed
+async def db_get_room_intervals(
+    room_ids: Iterable[int], start: datetime, end: datetime
+) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """(start, end) of every reservation of room_ids overlapping [start, end), per room in start order."""
+    room_ids = list(room_ids)
+    out: Dict[int, List[Tuple[datetime, datetime]]] = {rid: [] for rid in room_ids}
+    if not room_ids:
+        return out
+    async with get_async_session() as session:
+        rows = await session.execute(
+            select(Reservation.room_id, Reservation.start_datetime, Reservation.end_datetime)
+            .where(
+                Reservation.room_id.in_(room_ids),
+                Reservation.start_datetime < end,
+                Reservation.end_datetime > start,
             )
+            .order_by(Reservation.room_id, Reservation.start_datetime)
         )
-        if exclude_reservation_id:
-            q = q.where(Reservation.reservation_id != exclude_reservation_id)
-        row = session.execute(q).unique().scalars().first()
-        return row.reservation_id if row else None
+        for room_id, s, e in rows:
+            out[room_id].append((s, e))
+    return out
+
 
+@db_timed
+async def db_get_reservation_spans(start: datetime, end: datetime) -> List[Tuple[str, int, datetime, datetime]]:
+    """(reservation_id, room_id, start, end) of every reservation overlapping [start, end)."""
+    async with get_async_session() as session:
+        rows = await session.execute(
+            select(
+                Reservation.reservation_id, Reservation.room_id,
+                Reservation.start_datetime, Reservation.end_datetime,
+            ).where(Reservation.start_datetime < end, Reservation.end_datetime > start)
+        )
+        return [tuple(r) for r in rows]
 
-def db_add_reservation(
+
+@db_timed
+async def db_add_reservation(
     reservation_id: str,
     building_id: int, floor_id: int, room_id: int,
     user_name: str, purpose: str, title: str,
     start_datetime: datetime, end_datetime: datetime,
 ) -> None:
-    with get_session() as session:
+    async with get_async_session() as session:
         session.add(Reservation(
             reservation_id=reservation_id,
             building_id=building_id,
@@ -127,56 +212,268 @@ def db_add_reservation(
         ))
 
 
-def db_delete_reservation(reservation_id: str) -> bool:
-    with get_session() as session:
-        r = session.execute(select(Reservation).where(Reservation.reservation_id == reservation_id)).unique().scalars().one_or_none()
-        if not r:
-            return False
-        session.delete(r)
-        session.flush()
-        return True
+def _guarded_insert(values: Dict[str, Any]):
+    """INSERT ... SELECT <values> WHERE NOT EXISTS (overlap in the same room) RETURNING reservation_id."""
+    t = Reservation.__table__
+    overlap = select(Reservation.id).where(
+        Reservation.room_id == values["room_id"],
+        Reservation.start_datetime < values["end_datetime"],
+        Reservation.end_datetime > values["start_datetime"],
+    )
+    row = select(*[literal(v, t.c[k].type) for k, v in values.items()]).where(~exists(overlap))
+    return insert(Reservation).from_select(list(values), row).returning(Reservation.reservation_id)
 
 
-def db_update_reservation(reservation_id: str, **kwargs: Any) -> Optional[Reservation]:
-    with get_session() as session:
-        r = session.execute(select(Reservation).where(Reservation.reservation_id == reservation_id)).unique().scalars().one_or_none()
-        if not r:
-            return None
-        for k, v in kwargs.items():
-            if hasattr(r, k):
-                setattr(r, k, v)
-        session.flush()
-        return r
+def _reservation_values(
+    reservation_id: str,
+    building_id: int, floor_id: int, room_id: int,
+    user_name: str, purpose: str, title: str,
+    start_datetime: datetime, end_datetime: datetime,
+) -> Dict[str, Any]:
+    return {
+        "reservation_id": reservation_id,
+        "building_id": building_id,
+        "floor_id": floor_id,
+        "room_id": room_id,
+        "user_name": user_name,
+        "purpose": purpose,
+        "title": title,
+        "notes": "",
+        "start_datetime": start_datetime,
+        "end_datetime": end_datetime,
+    }
 
 
-def db_get_user_reservations(
-    user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None
-) -> List[Dict[str, Any]]:
+async def _run_guarded(session: AsyncSession, *stmts) -> Optional[str]:
+    """Execute stmts (the last one a guarded insert) atomically; None if the insert was refused.
+
+    Inside a unit of work the statements run in a SAVEPOINT so a refused insert
+    leaves the surrounding transaction usable.
+    """
+    nested = await session.begin_nested() if in_unit_of_work() else None
+    try:
+        result = None
+        for stmt in stmts:
+            result = await session.execute(stmt)
+        inserted = result.scalar_one_or_none()
+    except DBAPIError as e:
+        if nested is not None:
+            await nested.rollback()
+        if not _is_booking_conflict(e):
+            raise
+        return None
+    if nested is not None:
+        if inserted is None:
+            await nested.rollback()
+        else:
+            await nested.commit()
+    return inserted
+
+
+@db_timed
+async def db_try_add_reservation(
+    reservation_id: str,
+    building_id: int, floor_id: int, room_id: int,
+    user_name: str, purpose: str, title: str,
+    start_datetime: datetime, end_datetime: datetime,
+) -> Optional[str]:
+    """Insert in one statement unless the slot is taken.
+
+    Returns None on success, otherwise the conflicting reservation_id. The
+    NOT EXISTS guard answers the common case; concurrent bookers that slip past
+    it are rejected by the ex_reservations_room_no_overlap constraint.
+    """
+    values = _reservation_values(
+        reservation_id, building_id, floor_id, room_id,
+        user_name, purpose, title, start_datetime, end_datetime,
+    )
+    try:
+        async with get_async_session() as session:
+            inserted = await _run_guarded(session, _guarded_insert(values))
+    except DBAPIError as e:
+        if not _is_booking_conflict(e):
+            raise
+        inserted = None
+    if inserted is not None:
+        return None
+    conflict = await db_find_overlapping(building_id, floor_id, room_id, start_datetime, end_datetime)
+    return conflict or reservation_id
+
+
+def _conflicts_query(rows: List[Dict[str, Any]]):
+    """(candidate reservation_id, an existing reservation_id it overlaps) for every candidate row, as one query.
+
+    The candidates are a UNION ALL of literal rows joined to reservations on
+    room + time overlap, so N occurrences cost one round trip, not N probes.
+    """
+    t = Reservation.__table__
+    candidates = union_all(*[
+        select(
+            literal(r["reservation_id"], t.c.reservation_id.type).label("candidate"),
+            literal(r["room_id"], t.c.room_id.type).label("room_id"),
+            literal(r["start_datetime"], t.c.start_datetime.type).label("start_datetime"),
+            literal(r["end_datetime"], t.c.end_datetime.type).label("end_datetime"),
+        )
+        for r in rows
+    ]).cte("candidates")
+    return (
+        select(candidates.c.candidate, func.min(Reservation.reservation_id))
+        .join(Reservation, and_(
+            Reservation.room_id == candidates.c.room_id,
+            Reservation.start_datetime < candidates.c.end_datetime,
+            Reservation.end_datetime > candidates.c.start_datetime,
+        ))
+        .group_by(candidates.c.candidate)
+    )
+
+
+async def _insert_free(session: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+    conflicts = dict((await session.execute(_conflicts_query(rows))).all())
+    free = [{"notes": "", **r} for r in rows if r["reservation_id"] not in conflicts]
+    if free:
+        await session.execute(insert(Reservation), free)
+    return conflicts
+
+
+@db_timed
+async def db_try_add_reservations(rows: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Insert every row that overlaps no existing reservation, in one transaction.
+
+    `rows` carry the db_try_add_reservation fields and must not overlap each
+    other. One set-based query finds the conflicts and one bulk INSERT writes
+    the rest. Returns {reservation_id: conflicting reservation_id} for the rows
+    left out. A concurrent booker that lands in between trips the exclusion
+    constraint; the whole batch is then re-checked.
+    """
+    if not rows:
+        return {}
+    for attempt in range(_BULK_ADD_ATTEMPTS):
+        try:
+            async with get_async_session() as session:
+                if not in_unit_of_work():
+                    return await _insert_free(session, rows)
+                async with session.begin_nested():
+                    return await _insert_free(session, rows)
+        except DBAPIError as e:
+            if not _is_booking_conflict(e) or attempt == _BULK_ADD_ATTEMPTS - 1:
+                raise
+    return {}
+
+
+@db_timed
+async def db_replace_reservation(
+    old_reservation_id: str,
+    reservation_id: str,
+    building_id: int, floor_id: int, room_id: int,
+    user_name: str, purpose: str, title: str,
+    start_datetime: datetime, end_datetime: datetime,
+) -> Optional[str]:
+    """Atomically delete old_reservation_id and insert its replacement (moved room/time).
+
+    Returns None on success, otherwise the conflicting reservation_id; on
+    conflict the old reservation is left untouched.
+    """
+    values = _reservation_values(
+        reservation_id, building_id, floor_id, room_id,
+        user_name, purpose, title, start_datetime, end_datetime,
+    )
+    remove_old = delete(Reservation).where(Reservation.reservation_id == old_reservation_id)
+    try:
+        async with get_async_session() as session:
+            inserted = await _run_guarded(session, remove_old, _guarded_insert(values))
+            if inserted is None and not in_unit_of_work():
+                await session.rollback()
+    except DBAPIError as e:
+        if not _is_booking_conflict(e):
+            raise
+        inserted = None
+    if inserted is not None:
+        return None
+    conflict = await db_find_overlapping(
+        building_id, floor_id, room_id, start_datetime, end_datetime,
+        exclude_reservation_id=old_reservation_id,
+    )
+    return conflict or reservation_id
+
+
+@db_timed
+async def db_delete_reservation(reservation_id: str) -> bool:
+    async with get_async_session() as session:
+        result = await session.execute(delete(Reservation).where(Reservation.reservation_id == reservation_id))
+        return result.rowcount > 0
+
+
+@db_timed
+async def db_update_reservation(reservation_id: str, **kwargs: Any) -> bool:
+    values = {k: v for k, v in kwargs.items() if k in Reservation.__table__.c}
+    async with get_async_session() as session:
+        if not values:
+            found = (await session.execute(
+                select(Reservation.id).where(Reservation.reservation_id == reservation_id)
+            )).first()
+            return found is not None
+        result = await session.execute(
+            update(Reservation).where(Reservation.reservation_id == reservation_id).values(**values)
+        )
+        return result.rowcount > 0
+
+
+_USER_RESERVATION_COLUMNS = (
+    Reservation.reservation_id,
+    Reservation.building_id,
+    Reservation.floor_id,
+    Reservation.room_id,
+    Reservation.title,
+    Reservation.purpose,
+    Reservation.start_datetime.label("start"),
+    Reservation.end_datetime.label("end"),
+)
+
+
+def _user_reservations_query(
+    user_name: str, start_day: date, end_day: date,
+    building_id_filter: Optional[int], after: Optional[Tuple[datetime, str]],
+):
+    """Columns of the user's reservations touching [start_day, end_day], ordered (start, reservation_id).
+
+    ix_reservations_user_start serves both the filter and the ordering; `after`
+    is the (start, reservation_id) of the last row already seen (keyset cursor).
+    """
     start_begin = datetime.combine(start_day, time(0, 0))
     end_inclusive = datetime.combine(end_day, time(23, 59, 59))
-    with get_session() as session:
-        q = select(Reservation).where(
-            and_(
-                Reservation.user_name == user_name,
-                Reservation.start_datetime <= end_inclusive,
-                Reservation.end_datetime >= start_begin,
-            )
-        )
-        if building_id_filter is not None:
-            q = q.where(Reservation.building_id == building_id_filter)
-        rows = session.execute(q).unique().scalars().all()
-        items = [
-            {
-                "reservation_id": r.reservation_id,
-                "building_id": r.building_id,
-                "floor_id": r.floor_id,
-                "room_id": r.room_id,
-                "title": r.title,
-                "purpose": r.purpose,
-                "start": r.start_datetime,
-                "end": r.end_datetime,
-            }
-            for r in rows
-        ]
-        items.sort(key=lambda x: (x["start"], x["reservation_id"]))
-        return items
+    q = select(*_USER_RESERVATION_COLUMNS).where(
+        Reservation.user_name == user_name,
+        Reservation.start_datetime <= end_inclusive,
+        Reservation.end_datetime >= start_begin,
+    )
+    if building_id_filter is not None:
+        q = q.where(Reservation.building_id == building_id_filter)
+    if after is not None:
+        q = q.where(tuple_(Reservation.start_datetime, Reservation.reservation_id) > tuple_(*after))
+    return q.order_by(Reservation.start_datetime, Reservation.reservation_id)
+
+
+@db_timed
+async def db_get_user_reservations(
+    user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None,
+    limit: Optional[int] = None, after: Optional[Tuple[datetime, str]] = None,
+) -> List[Dict[str, Any]]:
+    """One page (`limit` rows after the `after` cursor) of the user's reservations, in start order."""
+    q = _user_reservations_query(user_name, start_day, end_day, building_id_filter, after)
+    if limit is not None:
+        q = q.limit(limit)
+    async with get_async_session() as session:
+        return _dicts(await session.execute(q))
+
+
+async def db_iter_user_reservations(
+    user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream all of the user's reservations in start order, `batch_size` rows per fetch (exports)."""
+    q = _user_reservations_query(user_name, start_day, end_day, building_id_filter, None)
+    async with get_async_session() as session:
+        result = await session.stream(q.execution_options(yield_per=batch_size))
+        keys = list(result.keys())
+        async for row in result:
+            yield dict(zip(keys, row))
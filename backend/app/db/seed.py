@@ -1,25 +1,198 @@
-from sqlalchemy import func, select
+"""Sync buildings/floors/rooms from the YAML in data/buildings into the DB.
 
-from app.db.models import Building, Floor, Room
+The YAML is the source of truth. Every run diffs it against the tables and
+applies only the difference as bulk `INSERT ... ON CONFLICT` statements in a
+single transaction, then bumps topology_meta.version so API processes drop
+their cached snapshot (see app.services.topology).
+
+Floors and rooms are matched on their natural keys ((building_id, floor_number)
+and (floor_id, name)); the floor/room ids in floor_ids.yml repeat across
+buildings and cannot be primary keys. Existing rows keep their ids, new rows
+get max(id)+1. Floors/rooms that disappeared from the YAML are reported, and
+deleted with --prune only when nothing references them. A run whose YAML
+digest matches the last applied one stops after a single SELECT.
+
+    python -m app.db.seed [--prune] [--dir data/buildings]
+"""
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models import Building, Floor, Reservation, Room, TopologyMeta
 from app.db.session import get_session
-from app.utils.building_manager import load_building_data
+from app.utils.building_manager import building_data_digest, load_building_data
+
+
+@dataclass
+class SyncReport:
+    buildings_added: int = 0
+    buildings_renamed: int = 0
+    floors_added: int = 0
+    rooms_added: int = 0
+    stale_floors: List[int] = field(default_factory=list)
+    stale_rooms: List[int] = field(default_factory=list)
+    pruned_floors: int = 0
+    pruned_rooms: int = 0
+    version: int = 0
+    skipped: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.buildings_added or self.buildings_renamed or self.floors_added or self.rooms_added
+            or self.pruned_floors or self.pruned_rooms
+        )
+
+
+def _insert(session: Session):
+    """Dialect insert() that supports ON CONFLICT (PostgreSQL and SQLite)."""
+    return postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def _upsert(session: Session, model, rows: List[dict], update: Tuple[str, ...] = ()) -> int:
+    """Bulk INSERT ... ON CONFLICT; `update` columns are overwritten on conflict, else the row is skipped.
+
+    RETURNING lets the dialect batch the executemany into multi-VALUES
+    statements ("insertmanyvalues"), which it does not do for a bare ON
+    CONFLICT insert, and tells how many rows were actually written.
+    """
+    table = model.__table__
+    stmt = _insert(session)(table)
+    if update:
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c.id], set_={c: stmt.excluded[c] for c in update})
+    else:
+        stmt = stmt.on_conflict_do_nothing()
+    return len(session.connection().execute(stmt.returning(table.c.id), rows).all())
+
+
+def _floor_keys(session: Session) -> Dict[Tuple[int, int], int]:
+    rows = session.execute(select(Floor.id, Floor.building_id, Floor.floor_number))
+    return {(bid, number): fid for fid, bid, number in rows}
 
 
-def seed_if_empty():
+def _sync_buildings(session: Session, building_ids: Dict[str, int], report: SyncReport) -> None:
+    existing = dict(session.execute(select(Building.id, Building.name)).all())
+    rows = [{"id": bid, "name": name} for name, bid in building_ids.items() if existing.get(bid) != name]
+    if not rows:
+        return
+    _upsert(session, Building, rows, update=("name",))
+    report.buildings_added = sum(1 for r in rows if r["id"] not in existing)
+    report.buildings_renamed = len(rows) - report.buildings_added
+
+
+def _sync_floors(session: Session, wanted: Dict[int, Dict[int, dict]], report: SyncReport) -> Dict[Tuple[int, int], int]:
+    floors = _floor_keys(session)
+    next_id = max(floors.values(), default=0) + 1
+    rows = []
+    for bid, by_number in wanted.items():
+        for number in by_number:
+            if (bid, number) not in floors:
+                floors[(bid, number)] = next_id
+                rows.append({"id": next_id, "building_id": bid, "floor_number": number})
+                next_id += 1
+    if rows:
+        # A concurrent sync may have inserted some of these floors first; keep its rows and re-read the ids.
+        report.floors_added = _upsert(session, Floor, rows)
+        if report.floors_added < len(rows):
+            floors = _floor_keys(session)
+    wanted_keys = {(bid, number) for bid, by_number in wanted.items() for number in by_number}
+    report.stale_floors = sorted(fid for key, fid in floors.items() if key not in wanted_keys)
+    return floors
+
+
+def _sync_rooms(
+    session: Session, wanted: Dict[int, Dict[int, dict]], floors: Dict[Tuple[int, int], int], report: SyncReport
+) -> None:
+    rooms = {(fid, name): rid for rid, fid, name in session.execute(select(Room.id, Room.floor_id, Room.name))}
+    next_id = max(rooms.values(), default=0) + 1
+    wanted_keys = set()
+    rows = []
+    for bid, by_number in wanted.items():
+        for number, (_floor_id_yaml, room_dict) in by_number.items():
+            fid = floors[(bid, number)]
+            for name in room_dict:
+                wanted_keys.add((fid, name))
+                if (fid, name) not in rooms:
+                    rows.append({"id": next_id, "floor_id": fid, "name": name})
+                    next_id += 1
+    if rows:
+        report.rooms_added = _upsert(session, Room, rows)
+    report.stale_rooms = sorted(rid for key, rid in rooms.items() if key not in wanted_keys)
+
+
+def _prune(session: Session, report: SyncReport) -> None:
+    """Delete stale rooms without reservations, then stale floors left without rooms or reservations."""
+    if report.stale_rooms:
+        result = session.execute(
+            delete(Room).where(
+                Room.id.in_(report.stale_rooms),
+                ~exists().where(Reservation.room_id == Room.id),
+            )
+        )
+        report.pruned_rooms = result.rowcount
+    if report.stale_floors:
+        result = session.execute(
+            delete(Floor).where(
+                Floor.id.in_(report.stale_floors),
+                ~exists().where(Room.floor_id == Floor.id),
+                ~exists().where(Reservation.floor_id == Floor.id),
+            )
+        )
+        report.pruned_floors = result.rowcount
+
+
+def _write_meta(session: Session, digest: str, bump: bool) -> int:
+    """Record the applied YAML digest, bumping the version if the topology changed; returns the version."""
+    now = datetime.now()
+    stmt = _insert(session)(TopologyMeta).values(id=1, version=1, source_hash=digest, updated_at=now)
+    changes = {"source_hash": digest, "updated_at": now}
+    if bump:
+        changes["version"] = TopologyMeta.version + 1
+    session.execute(stmt.on_conflict_do_update(index_elements=[TopologyMeta.id], set_=changes))
+    return session.scalar(select(TopologyMeta.version).where(TopologyMeta.id == 1))
+
+
+def sync_topology(buildings_dir: Optional[str] = None, prune: bool = False) -> SyncReport:
+    """Apply the YAML topology to the DB in one transaction and return what changed."""
+    digest = building_data_digest(buildings_dir)
+    report = SyncReport()
     with get_session() as session:
-        if session.scalar(select(func.count()).select_from(Building)) > 0:
-            return
-        building_ids, floor_ids = load_building_data()
-        for name, bid in building_ids.items():
-            session.add(Building(id=bid, name=name))
-        session.flush()
-        floor_pk = 1
-        room_pk = 1
-        for building_id, floors in floor_ids.items():
-            for floor_number, (_floor_id_yaml, room_dict) in floors.items():
-                session.add(Floor(id=floor_pk, building_id=building_id, floor_number=floor_number))
-                for room_name in room_dict.keys():
-                    session.add(Room(id=room_pk, floor_id=floor_pk, name=room_name))
-                    room_pk += 1
-                floor_pk += 1
-        session.flush()
+        meta = session.execute(select(TopologyMeta.version, TopologyMeta.source_hash).where(TopologyMeta.id == 1)).first()
+        if meta is not None and meta.source_hash == digest and not prune:
+            report.version, report.skipped = meta.version, True
+            return report
+        building_ids, floor_ids = load_building_data(buildings_dir)
+        known = set(building_ids.values())
+        wanted = {bid: floors for bid, floors in floor_ids.items() if bid in known}
+        _sync_buildings(session, building_ids, report)
+        floors = _sync_floors(session, wanted, report)
+        _sync_rooms(session, wanted, floors, report)
+        if prune:
+            _prune(session, report)
+        report.version = _write_meta(session, digest, report.changed)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync buildings/floors/rooms from YAML into the DB.")
+    parser.add_argument("--dir", default=None, help="buildings YAML directory (default data/buildings)")
+    parser.add_argument("--prune", action="store_true", help="delete floors/rooms missing from the YAML if unreferenced")
+    args = parser.parse_args()
+    r = sync_topology(args.dir, prune=args.prune)
+    if r.skipped:
+        print(f"YAML unchanged, topology version {r.version}")
+        return
+    print(
+        f"buildings +{r.buildings_added} (renamed {r.buildings_renamed}), floors +{r.floors_added}, "
+        f"rooms +{r.rooms_added}, stale floors {len(r.stale_floors)} / rooms {len(r.stale_rooms)}, "
+        f"pruned floors {r.pruned_floors} / rooms {r.pruned_rooms}, topology version {r.version}"
+    )
+
+
+if __name__ == "__main__":
+    main()
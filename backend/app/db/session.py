@@ -1,14 +1,25 @@
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Callable, Generator, List, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.core.config import get_database_url
+from app.core.config import (
+    get_async_database_url,
+    get_database_url,
+    get_db_max_overflow,
+    get_db_pool_size,
+)
+from app.core.metrics import instrument_engine
 from app.db.models import Base
 
 _engine = None
 _SessionLocal = None
+_async_engine = None
+_AsyncSessionLocal = None
+_uow_session: ContextVar[Optional[AsyncSession]] = ContextVar("uow_session", default=None)
 
 
 def get_engine():
@@ -19,6 +30,7 @@ def get_engine():
             pool_pre_ping=True,
             echo=False,
         )
+        instrument_engine(_engine)
     return _engine
 
 
@@ -43,8 +55,99 @@ def get_session() -> Generator[Session, None, None]:
         session.close()
 
 
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_database_url()
+        pool_kwargs = {}
+        if not url.startswith("sqlite"):
+            pool_kwargs = {"pool_size": get_db_pool_size(), "max_overflow": get_db_max_overflow()}
+        _async_engine = create_async_engine(url, pool_pre_ping=True, echo=False, **pool_kwargs)
+        instrument_engine(_async_engine)
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _AsyncSessionLocal
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session for one repository call; joins the enclosing unit of work if there is one."""
+    current = _uow_session.get()
+    if current is not None:
+        yield current
+        return
+    factory = get_async_session_factory()
+    session = factory()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+def in_unit_of_work() -> bool:
+    return _uow_session.get() is not None
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """Run `callback` once the enclosing unit of work commits (now, outside of one).
+
+    Lets in-process caches follow the database without recording rolled-back writes.
+    """
+    current = _uow_session.get()
+    if current is None:
+        callback()
+    else:
+        current.info.setdefault("after_commit", []).append(callback)
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncGenerator[AsyncSession, None]:
+    """Run every repository call inside the block on one session and one transaction.
+
+    Nested blocks join the outer one; the outermost commits on success and rolls
+    back on error.
+    """
+    current = _uow_session.get()
+    if current is not None:
+        yield current
+        return
+    factory = get_async_session_factory()
+    session = factory()
+    token = _uow_session.set(session)
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        _uow_session.reset(token)
+        callbacks: List[Callable[[], None]] = session.info.pop("after_commit", [])
+        await session.close()
+    for callback in callbacks:
+        callback()
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
+
+
 def init_db():
-    """Create tables and seed. Use alembic upgrade head for schema management."""
-    engine = get_engine()
-    from app.db.seed import seed_if_empty
-    seed_if_empty()
+    """Sync the YAML topology into the DB. Use alembic upgrade head for schema management."""
+    from app.db.seed import sync_topology
+    return sync_topology()
@@ -0,0 +1,120 @@
+"""Reservation storage interface used by the services.
+
+`get_store()` returns the backend selected by RESERVATION_STORE:
+- `sql` (default): the SQLAlchemy repository in app/db/repository.py.
+- `memory`: app/db/memory_store.py, process-local and lost on restart. It
+  suits benchmarks, tests and single-node deployments.
+
+With OCCUPANCY_INDEX=1 either backend is wrapped in the occupancy bitmaps of
+app/db/occupancy.py.
+
+Buildings, floors and rooms always come from the database through the
+topology snapshot; only reservations are pluggable.
+"""
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Protocol, Set, Tuple
+
+from app.core.config import get_reservation_store_backend, is_occupancy_index_enabled
+from app.db import repository
+
+
+class ReservationStore(Protocol):
+    async def find_overlapping(
+        self, building_id: int, floor_id: int, room_id: int,
+        new_start: datetime, new_end: datetime,
+        exclude_reservation_id: Optional[str] = None,
+    ) -> Optional[str]: ...
+
+    async def busy_room_ids(self, room_ids: Iterable[int], start: datetime, end: datetime) -> Set[int]: ...
+
+    async def room_intervals(
+        self, room_ids: Iterable[int], start: datetime, end: datetime
+    ) -> Dict[int, List[Tuple[datetime, datetime]]]: ...
+
+    async def spans(self, start: datetime, end: datetime) -> List[Tuple[str, int, datetime, datetime]]: ...
+
+    async def get(self, reservation_id: str) -> Optional[Dict[str, Any]]: ...
+
+    async def room_reservations(
+        self, building_id: int, floor_id: int, room_id: int, day: Optional[date] = None
+    ) -> List[Dict[str, Any]]: ...
+
+    async def try_add(
+        self, reservation_id: str, building_id: int, floor_id: int, room_id: int,
+        user_name: str, purpose: str, title: str,
+        start_datetime: datetime, end_datetime: datetime,
+    ) -> Optional[str]: ...
+
+    async def try_add_many(self, rows: List[Dict[str, Any]]) -> Dict[str, str]: ...
+
+    async def replace(
+        self, old_reservation_id: str, reservation_id: str,
+        building_id: int, floor_id: int, room_id: int,
+        user_name: str, purpose: str, title: str,
+        start_datetime: datetime, end_datetime: datetime,
+    ) -> Optional[str]: ...
+
+    async def delete(self, reservation_id: str) -> bool: ...
+
+    async def update(self, reservation_id: str, **kwargs: Any) -> bool: ...
+
+    async def user_reservations(
+        self, user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None,
+        limit: Optional[int] = None, after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    def iter_user_reservations(
+        self, user_name: str, start_day: date, end_day: date, building_id_filter: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]: ...
+
+
+class SqlReservationStore:
+    """ReservationStore over the SQLAlchemy repository functions."""
+
+    find_overlapping = staticmethod(repository.db_find_overlapping)
+    busy_room_ids = staticmethod(repository.db_get_busy_room_ids)
+    room_intervals = staticmethod(repository.db_get_room_intervals)
+    spans = staticmethod(repository.db_get_reservation_spans)
+    get = staticmethod(repository.db_get_reservation)
+    room_reservations = staticmethod(repository.db_get_room_reservations)
+    try_add = staticmethod(repository.db_try_add_reservation)
+    try_add_many = staticmethod(repository.db_try_add_reservations)
+    replace = staticmethod(repository.db_replace_reservation)
+    delete = staticmethod(repository.db_delete_reservation)
+    update = staticmethod(repository.db_update_reservation)
+    user_reservations = staticmethod(repository.db_get_user_reservations)
+    iter_user_reservations = staticmethod(repository.db_iter_user_reservations)
+
+
+_store: Optional[ReservationStore] = None
+
+
+def get_store() -> ReservationStore:
+    """Process-wide reservation store for the configured backend."""
+    global _store
+    if _store is None:
+        backend = get_reservation_store_backend()
+        if backend == "memory":
+            from app.db.memory_store import MemoryReservationStore
+            _store = MemoryReservationStore()
+        elif backend == "sql":
+            _store = SqlReservationStore()
+        else:
+            raise ValueError(f"알 수 없는 RESERVATION_STORE: {backend}")
+        if is_occupancy_index_enabled():
+            from app.db.occupancy import OccupancyIndexedStore
+            _store = OccupancyIndexedStore(_store)
+    return _store
+
+
+async def warm_store() -> None:
+    """Build the store's in-process indexes (occupancy bitmaps) before the first request."""
+    rebuild = getattr(get_store(), "rebuild", None)
+    if rebuild is not None:
+        await rebuild()
+
+
+def set_store(store: Optional[ReservationStore]) -> None:
+    """Swap the store (None resets to the configured backend on next use)."""
+    global _store
+    _store = store
@@ -0,0 +1,90 @@
+"""Conversation checkpointer for multi-turn runs (requests carrying a thread_id).
+
+CHECKPOINTER selects the backend:
+- `memory` (default): InMemorySaver that keeps the CHECKPOINT_MAX_THREADS most
+  recently used threads. State is lost on restart and not shared by workers.
+- `postgres`: AsyncPostgresSaver on DATABASE_URL. It needs the optional
+  `langgraph-checkpoint-postgres` package and creates its tables on startup.
+"""
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.core.config import get_checkpoint_max_threads, get_checkpointer_backend, get_database_url
+
+
+class LRUInMemorySaver(InMemorySaver):
+    """InMemorySaver that drops the least recently written thread beyond `max_threads`."""
+
+    def __init__(self, max_threads: int):
+        super().__init__()
+        self.max_threads = max_threads
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        out = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        self._recent[thread_id] = None
+        self._recent.move_to_end(thread_id)
+        while len(self._recent) > self.max_threads:
+            oldest, _ = self._recent.popitem(last=False)
+            self.delete_thread(oldest)
+        return out
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._recent.pop(thread_id, None)
+
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_pool: Any = None
+
+
+def _postgres_conninfo() -> str:
+    scheme, sep, rest = get_database_url().partition("://")
+    if not scheme.startswith("postgres"):
+        raise RuntimeError("CHECKPOINTER=postgres에는 PostgreSQL DATABASE_URL이 필요합니다.")
+    return f"postgresql{sep}{rest}"
+
+
+async def init_checkpointer() -> BaseCheckpointSaver:
+    """Create the configured checkpointer once per process (Postgres: open a pool and create tables)."""
+    global _checkpointer, _pool
+    if _checkpointer is not None:
+        return _checkpointer
+    backend = get_checkpointer_backend()
+    if backend == "memory":
+        _checkpointer = LRUInMemorySaver(get_checkpoint_max_threads())
+    elif backend == "postgres":
+        try:
+            from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError as e:
+            raise RuntimeError(
+                "CHECKPOINTER=postgres에는 langgraph-checkpoint-postgres 패키지가 필요합니다."
+            ) from e
+        _pool = AsyncConnectionPool(
+            _postgres_conninfo(), open=False, kwargs={"autocommit": True, "prepare_threshold": 0}
+        )
+        await _pool.open()
+        saver = AsyncPostgresSaver(_pool)
+        await saver.setup()
+        _checkpointer = saver
+    else:
+        raise ValueError(f"알 수 없는 CHECKPOINTER: {backend}")
+    return _checkpointer
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    if _checkpointer is None:
+        raise RuntimeError("init_checkpointer()가 먼저 호출되어야 합니다.")
+    return _checkpointer
+
+
+async def close_checkpointer() -> None:
+    global _checkpointer, _pool
+    if _pool is not None:
+        await _pool.close()
+    _checkpointer, _pool = None, None
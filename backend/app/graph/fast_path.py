@@ -0,0 +1,290 @@
+"""Rule-based query parser that lets the router skip the LLM for well-formed queries.
+
+Most traffic looks like `에펠탑 17층 1702-A 2025-08-13 10:00~11:00 비었어?`: building,
+floor and room names come from the topology snapshot, dates/times follow a handful
+of patterns and the intent is signalled by a keyword. When every required slot
+for the detected intent is found the parse is returned with full confidence;
+anything ambiguous or incomplete scores low and the router falls back to the LLM.
+"""
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.topology import Topology
+
+# Checked in order: "예약 취소" must be Cancel, not Book; "빈 방 있어?" must be Find, not Check.
+_INTENT_KEYWORDS: List[Tuple[str, re.Pattern]] = [
+    ("Cancel", re.compile(r"취소")),
+    ("Change", re.compile(r"변경|수정|옮겨|바꿔|미뤄|당겨")),
+    ("Mine", re.compile(r"내\s*예약|예약\s*(?:목록|내역|현황)")),
+    ("Find", re.compile(r"빈\s*(?:회의실|방)|(?:다른|아무)\s*(?:회의실|방)|(?:회의실|방)\s*(?:찾아|있나|있어)")),
+    ("Book", re.compile(r"예약\s*(?:해|하고|할래|부탁|좀|요청)|잡아")),
+    ("Check", re.compile(r"비었|비어|빈\s*시간|가능|가용|사용\s*중|있어\?|확인")),
+]
+
+_REQUIRED = {
+    "Check": ("building", "floor", "room", "start", "end"),
+    "Find": ("building", "start", "end"),
+    "Book": ("building", "floor", "room", "user_name", "title", "start", "end"),
+    "Change": ("reservation_id", "start", "end"),
+    "Cancel": ("reservation_id",),
+    "Mine": ("user_name",),
+}
+_ALLOWED = {
+    "Check": ("building", "floor", "room", "start", "end"),
+    "Find": ("building", "floor", "start", "end"),
+    "Book": ("building", "floor", "room", "user_name", "purpose", "title", "start", "end"),
+    "Change": ("reservation_id", "building", "floor", "room", "start", "end"),
+    "Cancel": ("reservation_id",),
+    "Mine": ("user_name", "building"),
+}
+
+_RESERVATION_ID = re.compile(r"(?<![\w])\d+_\d+_\d+_\d{8}_\d{4}(?![\w])")
+_FLOOR = re.compile(r"(\d{1,3})\s*층")
+_ISO_DATE = re.compile(r"(\d{4})[-./](\d{1,2})[-./](\d{1,2})")
+_KO_DATE = re.compile(r"(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+_SLASH_DATE = re.compile(r"(?<![\d/])(\d{1,2})/(\d{1,2})(?![\d/])")
+# Longest first: "내일모레" must not be read as "내일".
+_RELATIVE_DAYS = {"내일모레": 2, "오늘": 0, "내일": 1, "모레": 2, "글피": 3}
+# Date-like words the parser does not resolve; when one is present the query is not assumed to be for today.
+_DATE_HINT = re.compile(r"[월화수목금토일]요일|(?:이번|다음|담|다다음|지난)\s*주|주말|(?<![\d.:])\d{1,2}\s*일(?!간)")
+_TIME = r"(오전|오후)?\s*(\d{1,2})(?::(\d{2})|\s*시(?:\s*(\d{1,2})\s*분|\s*(반))?)"
+_TIME_RANGE = re.compile(_TIME + r"\s*(?:~|-|–|부터)\s*" + _TIME + r"(?:\s*까지)?")
+_NAME = r"([가-힣A-Za-z]{2,10})"
+_USER_NAME = [
+    re.compile(_NAME + r"\s*(?:님)?\s*(?:이름으로|명의로)"),
+    re.compile(r"(?:주최자|예약자|이름|사용자)(?:\s*(?:는|은|:)\s*|\s+)" + _NAME),
+    re.compile(_NAME + r"\s*(?:님)?\s*(?:의|내)\s*예약"),
+]
+_TITLE = re.compile(r"(?:제목|회의명)\s*(?:은|는|:)?\s*['\"]?([^,.'\"]+?)['\"]?\s*(?:[,.]|으로|로|$)")
+_TITLE_STOPWORDS = re.compile(r"\s*(?:으로|로|을|를|에서|좀)$")
+_CONJUNCTION = re.compile(r"(?:하고|그리고|다음에|및)\s")
+_RECURRENCE = re.compile(r"매일|매주|격주|반복|마다")
+_NOT_A_NAME = {"오늘", "내일", "모레", "회의", "회의실", "예약", "주간", "취소", "변경", "으로", "이름으로", "명의로"}
+
+
+@dataclass
+class FastParse:
+    intent: str
+    params: Dict[str, Any]
+    confidence: float
+    missing: List[str] = field(default_factory=list)
+
+
+@dataclass
+class FastPathStats:
+    hits: int = 0
+    misses: int = 0
+    parse_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+fast_path_stats = FastPathStats()
+
+
+_room_index: Dict[int, Dict[int, Tuple[re.Pattern, Dict[str, List[Tuple[int, str]]]]]] = {}
+
+
+def _rooms_pattern(topo: Topology, building_id: int) -> Tuple[re.Pattern, Dict[str, List[Tuple[int, str]]]]:
+    """One alternation over all room names of a building, cached per topology version."""
+    per_version = _room_index.get(topo.version)
+    if per_version is None:
+        _room_index.clear()
+        per_version = _room_index[topo.version] = {}
+    if building_id not in per_version:
+        names: Dict[str, List[Tuple[int, str]]] = {}
+        for number, fid in topo.floor_ids.get(building_id, {}).items():
+            for name in topo.room_ids.get(fid, {}):
+                names.setdefault(name.lower(), []).append((number, name))
+        alternation = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True)) or "(?!)"
+        pattern = re.compile(r"(?<![0-9A-Za-z-])(" + alternation + r")(?![0-9A-Za-z-])", re.IGNORECASE)
+        per_version[building_id] = (pattern, names)
+    return per_version[building_id]
+
+
+def _match_building(query: str, topo: Topology) -> Optional[Tuple[str, int]]:
+    for name in sorted(topo.building_ids, key=len, reverse=True):
+        if name in query:
+            return name, topo.building_ids[name]
+    return None
+
+
+def _match_room(
+    query: str, topo: Topology, building_id: int, floor_number: Optional[int]
+) -> Optional[Tuple[int, str]]:
+    """(floor_number, room name); with no floor given, a unique match across the building."""
+    pattern, names = _rooms_pattern(topo, building_id)
+    found = set()
+    for m in pattern.finditer(query):
+        for number, name in names[m.group(1).lower()]:
+            if floor_number is None or number == floor_number:
+                found.add((number, name))
+    return found.pop() if len(found) == 1 else None
+
+
+def _parse_day(query: str, today: date) -> Optional[date]:
+    """Explicit or relative date in the query; raises ValueError for impossible dates."""
+    m = _ISO_DATE.search(query)
+    if m:
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    m = _KO_DATE.search(query) or _SLASH_DATE.search(query)
+    if m:
+        return date(today.year, int(m.group(1)), int(m.group(2)))
+    for word, offset in _RELATIVE_DAYS.items():
+        if word in query:
+            return today + timedelta(days=offset)
+    return None
+
+
+def _to_minutes(meridiem: Optional[str], hour: str, minute: Optional[str], minute_ko: Optional[str], half: Optional[str]) -> int:
+    h = int(hour)
+    if meridiem == "오후" and h < 12:
+        h += 12
+    m = int(minute or minute_ko or 0) + (30 if half else 0)
+    return h * 60 + m
+
+
+def _parse_time_range(query: str) -> Optional[Tuple[int, int, re.Match]]:
+    m = _TIME_RANGE.search(query)
+    if not m:
+        return None
+    g = m.groups()
+    start = _to_minutes(*g[0:5])
+    end_meridiem = g[5] or (g[0] if g[0] == "오후" and int(g[6]) < 12 else None)
+    end = _to_minutes(end_meridiem, *g[6:10])
+    if not (0 <= start < end <= 24 * 60):
+        return None
+    return start, end, m
+
+
+def _ambiguous_hour(m: re.Match) -> bool:
+    """A start hour of 1-7 written without 오전/오후 could be morning or afternoon."""
+    return m.group(1) is None and 1 <= int(m.group(2)) <= 7
+
+
+def _iso(day: date, minutes: int) -> str:
+    return f"{day.isoformat()}T{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _user_name(query: str) -> Optional[str]:
+    for pattern in _USER_NAME:
+        m = pattern.search(query)
+        if m and m.group(1) not in _NOT_A_NAME:
+            return m.group(1)
+    return None
+
+
+def _title(query: str, time_match: Optional[re.Match]) -> Optional[str]:
+    m = _TITLE.search(query)
+    if m:
+        return m.group(1).strip()
+    if time_match is None:
+        return None
+    # "... 15:00~16:00 주간 회의 예약해줘" -> text between the time range and the booking keyword.
+    tail = query[time_match.end():]
+    for pattern in (_USER_NAME[0], _USER_NAME[1]):
+        tail = pattern.sub("", tail)
+    m = re.match(r"\s*(.+?)\s*(?:을|를)?\s*예약", tail)
+    if not m:
+        return None
+    title = _TITLE_STOPWORDS.sub("", m.group(1).strip()).strip()
+    return title or None
+
+
+def _looks_compound(query: str, n_matched: int) -> bool:
+    if len(_TIME_RANGE.findall(query)) > 1 or len(_RESERVATION_ID.findall(query)) > 1:
+        return True
+    return n_matched > 1 and _CONJUNCTION.search(query) is not None
+
+
+def _classify(query: str) -> Tuple[Optional[str], int]:
+    matched = [intent for intent, pattern in _INTENT_KEYWORDS if pattern.search(query)]
+    return (matched[0] if matched else None), len(matched)
+
+
+def parse_query(query: str, topo: Topology, today: date) -> Optional[FastParse]:
+    """Parse `query` without the LLM, or return None when it has no recognisable intent."""
+    intent, n_matched = _classify(query)
+    if intent is None:
+        return None
+    params: Dict[str, Any] = {}
+
+    m = _RESERVATION_ID.search(query)
+    if m:
+        params["reservation_id"] = m.group(0)
+
+    building = _match_building(query, topo)
+    if building:
+        params["building"] = building[0]
+        m = _FLOOR.search(query)
+        floor_number = int(m.group(1)) if m else None
+        if floor_number is not None and floor_number in topo.floor_ids.get(building[1], {}):
+            params["floor"] = floor_number
+        room = _match_room(query, topo, building[1], params.get("floor"))
+        if room:
+            params["floor"], params["room"] = room
+
+    time_range = _parse_time_range(query)
+    day_guessed = False
+    try:
+        day = _parse_day(query, today)
+    except ValueError:
+        day, time_range = None, None
+    if time_range:
+        if day is None and "reservation_id" in params:
+            # "15473_1_1_20250813_1500 11:00~12:00으로 변경" keeps the booking's own date.
+            ymd = params["reservation_id"].split("_")[3]
+            day = date(int(ymd[:4]), int(ymd[4:6]), int(ymd[6:]))
+        day_guessed = day is None
+        day = day or today
+        params["start"] = _iso(day, time_range[0])
+        params["end"] = _iso(day, time_range[1])
+
+    user_name = _user_name(query)
+    if user_name:
+        params["user_name"] = user_name
+    if intent == "Book":
+        title = _title(query, time_range[2] if time_range else None)
+        if title:
+            params["title"] = title
+            params["purpose"] = title
+    params = {k: params[k] for k in _ALLOWED[intent] if k in params}
+
+    missing = [k for k in _REQUIRED[intent] if not params.get(k)]
+    confidence = 1.0 if n_matched == 1 else 0.6
+    if intent in ("Cancel", "Change", "Mine", "Find") and n_matched > 1:
+        # "내 예약 취소해줘" also matches Mine, "빈 방 있어?" also Check; the first match in keyword order is still reliable.
+        confidence = 0.9
+    if _looks_compound(query, n_matched):
+        # "10시 예약 취소하고 1705 3시에 예약" is two requests; only the LLM router splits them.
+        confidence = min(confidence, 0.5)
+    if intent == "Book" and _RECURRENCE.search(query):
+        # "매주 월요일 10시 스탠드업 12주" is a recurring booking; the LLM router extracts the repeat slots.
+        confidence = min(confidence, 0.5)
+    if day_guessed and _DATE_HINT.search(query):
+        # "금요일 10시~11시" names a day the parser cannot resolve; "today" would book the wrong date.
+        confidence = min(confidence, 0.5)
+    if time_range and _ambiguous_hour(time_range[2]):
+        # "3시~4시" with no 오전/오후 is almost always the afternoon; let the LLM decide rather than book 03:00.
+        confidence = min(confidence, 0.5)
+    if missing:
+        confidence = 0.0
+    return FastParse(intent=intent, params=params, confidence=confidence, missing=missing)
+
+
+def try_fast_path(query: str, topo: Optional[Topology], today: date, min_confidence: float) -> Optional[FastParse]:
+    """parse_query() gated on confidence, recording hit/miss stats."""
+    t0 = time.perf_counter()
+    parsed = parse_query(query, topo, today) if topo is not None else None
+    fast_path_stats.parse_seconds += time.perf_counter() - t0
+    if parsed is None or parsed.confidence < min_confidence:
+        fast_path_stats.misses += 1
+        return None
+    fast_path_stats.hits += 1
+    return parsed
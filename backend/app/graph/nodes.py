@@ -1,92 +1,309 @@
+import asyncio
+import json
+import time
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
+from langchain_core.exceptions import OutputParserException
 from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field, ValidationError, create_model
 
-from app.core.config import llm
-from app.core.state import AgentState, BookSlots, CheckSlots, RouteOut
+from app.core.config import (
+    get_fast_path_min_confidence,
+    get_llm,
+    get_reporter_mode,
+    get_router_mode,
+    is_fast_path_enabled,
+)
+from app.core.state import (
+    AgentState,
+    BookExtract,
+    BookSlots,
+    CheckExtract,
+    CheckSlots,
+    FindExtract,
+    FindSlots,
+    RouteOut,
+    RouterExtract,
+)
+from app.core.llm_cache import cached_structured
+from app.core.metrics import observe_llm
+from app.db.session import unit_of_work
+from app.graph.fast_path import try_fast_path
+from app.graph.report_templates import render_report
+from app.services import ensure_topology
+from app.services.reservation_service import parse_reservation_id
+from app.services.topology import Topology
 from app.utils import PromptManager
 from app.tools.tools import TOOLS
 
 _prompt_manager = PromptManager()
+# A structured reply the schema could not parse; anything else (API, network, timeout) is a real failure.
+_PARSE_ERRORS = (OutputParserException, ValidationError)
 
 
 def init_node(state: AgentState) -> AgentState:
+    # In a conversation thread the previous turn's values are restored; only the query is new.
     state.setdefault("intent", "Unknown")
     state.setdefault("params", {})
     state.setdefault("need_more", False)
     state.setdefault("ask_user", "")
-    state.setdefault("plan", [])
-    state.setdefault("tool_result", None)
-    state.setdefault("final_answer", None)
+    state.setdefault("pending_query", "")
+    state.setdefault("more_requests", [])
+    state["plan"] = []
+    state["steps"] = []
+    state["results"] = []
+    state["tool_result"] = None
+    state["final_answer"] = None
     return state
 
 
-def router_node(state: AgentState) -> AgentState:
-    today = datetime.now().strftime("%Y-%m-%d")
-    route_system = _prompt_manager.get("router_intent")
-    out = llm.with_structured_output(RouteOut, method="function_calling").invoke(
-        [SystemMessage(content=route_system), HumanMessage(content=state["query"])]
-    )
+def _apply_book_slots(state: AgentState, slots: BookSlots) -> None:
+    state["params"] = {
+        "building": slots.building,
+        "floor": slots.floor,
+        "room": slots.room,
+        "user_name": slots.user_name,
+        "purpose": slots.purpose,
+        "title": slots.title,
+        "start": slots.start,
+        "end": slots.end,
+    }
+    if slots.repeat:
+        state["params"]["repeat"] = slots.repeat
+        for name in ("repeat_interval", "repeat_count", "repeat_until"):
+            if getattr(slots, name):
+                state["params"][name] = getattr(slots, name)
+    required = [slots.building, slots.room, slots.user_name, slots.title, slots.start, slots.end]
+    state["need_more"] = not all(required) or bool(slots.repeat and not (slots.repeat_count or slots.repeat_until))
+    if state["need_more"]:
+        missing = []
+        if not slots.building:
+            missing.append("건물")
+        if not slots.room:
+            missing.append("방")
+        if not slots.user_name:
+            missing.append("사용자 이름")
+        if not slots.title:
+            missing.append("제목")
+        if not slots.start or not slots.end:
+            missing.append("시작/종료 시간")
+        if slots.repeat and not (slots.repeat_count or slots.repeat_until):
+            missing.append("반복 횟수 또는 종료일")
+        state["ask_user"] = "다음 정보를 알려주세요: " + ", ".join(missing)
+
+
+def _apply_check_slots(state: AgentState, slots: CheckSlots) -> None:
+    state["params"] = {
+        "building": slots.building,
+        "floor": slots.floor,
+        "room": slots.room,
+        "start": slots.start,
+        "end": slots.end,
+    }
+    state["need_more"] = not all([slots.building, slots.room, slots.start, slots.end])
+    if state["need_more"]:
+        state["ask_user"] = "건물, 층, 방, 조회할 시간대(시작~종료)를 알려주세요."
+
+
+def _apply_find_slots(state: AgentState, slots: FindSlots) -> None:
+    state["params"] = {
+        "building": slots.building,
+        "floor": slots.floor or None,
+        "start": slots.start,
+        "end": slots.end,
+    }
+    state["need_more"] = not all([slots.building, slots.start, slots.end])
+    if state["need_more"]:
+        state["ask_user"] = "빈 회의실을 찾을 건물(선택: 층)과 시간대(시작~종료)를 알려주세요."
+
+
+async def _structured(schema, prompt_name: str, query: str, today: str):
+    """Structured-output LLM call for `prompt_name`, served from the LLM cache when possible."""
+    system = _prompt_manager.get(prompt_name, today=today)
+
+    async def call():
+        t0 = time.perf_counter()
+        out = await get_llm().with_structured_output(schema, method="function_calling", include_raw=True).ainvoke(
+            [SystemMessage(content=system), HumanMessage(content=query)]
+        )
+        observe_llm(prompt_name, time.perf_counter() - t0, out["raw"])
+        if out["parsing_error"] is not None:
+            raise out["parsing_error"]
+        return out["parsed"]
+
+    return await cached_structured(schema, query, prompt_name, _prompt_manager.version(prompt_name), today, call)
+
+
+async def _route_two_step(state: AgentState, today: str) -> None:
+    """Intent call, then a second slot-extraction call for Book/Check."""
+    out = await _structured(RouteOut, "router_intent", state["query"], today)
     state["intent"] = out.intent
     state["params"] = out.params or {}
     state["need_more"] = out.need_more
     state["ask_user"] = out.ask_user or ""
 
     if out.intent == "Book":
-        extract_system = _prompt_manager.get("book_slots_extract", today=today)
         try:
-            slots = llm.with_structured_output(BookSlots, method="function_calling").invoke(
-                [SystemMessage(content=extract_system), HumanMessage(content=state["query"])]
-            )
-            state["params"] = {
-                "building": slots.building,
-                "floor": slots.floor,
-                "room": slots.room,
-                "user_name": slots.user_name,
-                "purpose": slots.purpose,
-                "title": slots.title,
-                "start": slots.start,
-                "end": slots.end,
-            }
-            required = [slots.building, slots.room, slots.user_name, slots.title, slots.start, slots.end]
-            state["need_more"] = not all(required)
-            if state["need_more"]:
-                missing = []
-                if not slots.building:
-                    missing.append("건물")
-                if not slots.room:
-                    missing.append("방")
-                if not slots.user_name:
-                    missing.append("사용자 이름")
-                if not slots.title:
-                    missing.append("제목")
-                if not slots.start or not slots.end:
-                    missing.append("시작/종료 시간")
-                state["ask_user"] = "다음 정보를 알려주세요: " + ", ".join(missing)
-        except Exception:
+            slots = await _structured(BookSlots, "book_slots_extract", state["query"], today)
+            _apply_book_slots(state, slots)
+        except _PARSE_ERRORS:
             state["need_more"] = True
             state["ask_user"] = "예약에 필요한 정보를 파악하지 못했습니다. 건물, 층, 방, 시간, 예약자, 제목을 알려주세요."
 
     elif out.intent == "Check":
-        extract_system = _prompt_manager.get("check_slots_extract", today=today)
         try:
-            slots = llm.with_structured_output(CheckSlots, method="function_calling").invoke(
-                [SystemMessage(content=extract_system), HumanMessage(content=state["query"])]
-            )
-            state["params"] = {
-                "building": slots.building,
-                "floor": slots.floor,
-                "room": slots.room,
-                "start": slots.start,
-                "end": slots.end,
-            }
-            state["need_more"] = not all([slots.building, slots.room, slots.start, slots.end])
-            if state["need_more"]:
-                state["ask_user"] = "건물, 층, 방, 조회할 시간대(시작~종료)를 알려주세요."
-        except Exception:
+            slots = await _structured(CheckSlots, "check_slots_extract", state["query"], today)
+            _apply_check_slots(state, slots)
+        except _PARSE_ERRORS:
             state["need_more"] = True
             state["ask_user"] = "조회할 건물, 층, 방, 시간대를 알려주세요."
 
+    elif out.intent == "Find":
+        try:
+            slots = await _structured(FindSlots, "find_slots_extract", state["query"], today)
+            _apply_find_slots(state, slots)
+        except _PARSE_ERRORS:
+            state["need_more"] = True
+            state["ask_user"] = "빈 회의실을 찾을 건물과 시간대를 알려주세요."
+
+
+def _request_from_extract(result) -> Dict[str, Any]:
+    """{"intent", "params", "need_more", "ask_user"} for one RouterExtract item."""
+    request: Dict[str, Any] = {"intent": result.intent, "need_more": False, "ask_user": ""}
+    if isinstance(result, BookExtract):
+        _apply_book_slots(request, result)
+    elif isinstance(result, CheckExtract):
+        _apply_check_slots(request, result)
+    elif isinstance(result, FindExtract):
+        _apply_find_slots(request, result)
+    else:
+        request["params"] = result.params or {}
+        request["need_more"] = result.need_more
+        request["ask_user"] = result.ask_user or ""
+    return request
+
+
+async def _route_combined(state: AgentState, today: str) -> None:
+    """One structured call that returns every requested intent together with its slots."""
+    try:
+        out = await _structured(RouterExtract, "router_extract", state["query"], today)
+    except _PARSE_ERRORS:
+        state["intent"] = "Unknown"
+        state["need_more"] = True
+        state["ask_user"] = "요청을 파악하지 못했습니다. 건물, 층, 방, 시간과 원하는 작업(조회/예약/변경/취소)을 알려주세요."
+        return
+    requests = [_request_from_extract(r) for r in [out.result, *out.more]]
+    first = requests[0]
+    state["intent"] = first["intent"]
+    state["params"] = first["params"]
+    state["need_more"] = any(r["need_more"] for r in requests)
+    state["ask_user"] = " / ".join(r["ask_user"] for r in requests if r["need_more"] and r["ask_user"])
+    state["more_requests"] = [{"intent": r["intent"], "params": r["params"]} for r in requests[1:]]
+
+
+_SLOT_INTENTS = {
+    "Book": (BookSlots, _apply_book_slots, ("building", "room", "user_name", "title", "start", "end")),
+    "Check": (CheckSlots, _apply_check_slots, ("building", "room", "start", "end")),
+    "Find": (FindSlots, _apply_find_slots, ("building", "start", "end")),
+}
+
+
+@lru_cache(maxsize=None)
+def _followup_schema(slots_cls, missing: Tuple[str, ...]):
+    """`slots_cls` narrowed to the missing fields, all optional, for follow-up extraction."""
+    fields: Dict[str, Any] = {}
+    for name in missing:
+        info = slots_cls.model_fields[name]
+        fields[name] = (info.annotation, Field(default=0 if info.annotation is int else "", description=info.description))
+    return create_model(f"{slots_cls.__name__}FollowUp_{'_'.join(missing)}", **fields)
+
+
+def _slots_from_params(slots_cls, params: Dict[str, Any]) -> BaseModel:
+    values = {}
+    for name, info in slots_cls.model_fields.items():
+        value = params.get(name)
+        values[name] = value if value else (0 if info.annotation is int else "")
+    return slots_cls.model_validate(values)
+
+
+async def _route_followup(state: AgentState, pending: str, now: datetime) -> None:
+    """Answer to a ReverseQuestioner prompt: fill only the missing slots of the pending request."""
+    combined = f"{pending} {state['query']}"
+    if is_fast_path_enabled():
+        parsed = try_fast_path(combined, await ensure_topology(), now.date(), get_fast_path_min_confidence())
+        if parsed is not None:
+            state["intent"] = parsed.intent
+            state["params"] = parsed.params
+            state["need_more"] = False
+            state["ask_user"] = ""
+            return
+
+    entry = _SLOT_INTENTS.get(state.get("intent"))
+    if entry is None or state.get("more_requests"):
+        # Free-form params (Change/Cancel/Mine/Unknown) or several requests: route the whole conversation again.
+        query, state["query"] = state["query"], combined
+        await _route_llm(state, now.strftime("%Y-%m-%d"))
+        state["query"] = query
+        return
+
+    slots_cls, apply, required = entry
+    params = state.get("params") or {}
+    missing = [k for k in required if not params.get(k)]
+    if ("start" in missing) != ("end" in missing):
+        missing += [k for k in ("start", "end") if k not in missing]
+    if not params.get("floor"):
+        # Optional for validation, but the tools need it to resolve the room.
+        missing.append("floor")
+    if params.get("repeat") and not (params.get("repeat_count") or params.get("repeat_until")):
+        missing += ["repeat_count", "repeat_until"]
+    known = {k: v for k, v in params.items() if v}
+    message = (
+        f"이전 요청: {pending}\n"
+        f"이미 파악한 정보: {json.dumps(known, ensure_ascii=False, sort_keys=True)}\n"
+        f"추가 답변: {state['query']}"
+    )
+    try:
+        out = await _structured(_followup_schema(slots_cls, tuple(missing)), "followup_slots_extract", message, now.strftime("%Y-%m-%d"))
+        params = {**params, **{k: v for k, v in out.model_dump().items() if v}}
+    except _PARSE_ERRORS:
+        pass
+    apply(state, _slots_from_params(slots_cls, params))
+
+
+async def _route_llm(state: AgentState, today: str) -> None:
+    if get_router_mode() == "two_step":
+        await _route_two_step(state, today)
+    else:
+        await _route_combined(state, today)
+
+
+async def router_node(state: AgentState) -> AgentState:
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    pending = state.get("pending_query") or ""
+    if pending:
+        await _route_followup(state, pending, now)
+        state["pending_query"] = f"{pending} {state['query']}" if state["need_more"] else ""
+        return state
+
+    state["pending_query"] = ""
+    state["more_requests"] = []
+    if is_fast_path_enabled():
+        parsed = try_fast_path(
+            state["query"], await ensure_topology(), now.date(), get_fast_path_min_confidence()
+        )
+        if parsed is not None:
+            state["intent"] = parsed.intent
+            state["params"] = parsed.params
+            state["need_more"] = False
+            state["ask_user"] = ""
+            return state
+
+    await _route_llm(state, today)
+    if state["need_more"]:
+        state["pending_query"] = state["query"]
     return state
 
 
@@ -96,42 +313,155 @@ def reverse_questioner(state: AgentState) -> AgentState:
     return state
 
 
-def planner_node(state: AgentState) -> AgentState:
-    intent_to_tool = {
-        "Check": "CheckAvailability",
-        "Book": "CreateBooking",
-        "Change": "UpdateBooking",
-        "Cancel": "CancelBooking",
-        "Mine": "GetUserReservations",
-    }
-    tool = intent_to_tool.get(state["intent"])
-    if not tool:
-        state["final_answer"] = "요청을 이해하지 못했어요. (가능: 조회/예약/변경/취소/내예약)"
+_INTENT_TOOLS = {
+    "Check": "CheckAvailability",
+    "Find": "FindFreeRooms",
+    "Book": "CreateBooking",
+    "Change": "UpdateBooking",
+    "Cancel": "CancelBooking",
+    "Mine": "GetUserReservations",
+}
+_WRITE_TOOLS = ("CreateBooking", "CreateRecurringBooking", "UpdateBooking", "CancelBooking")
+
+
+def _tool_for(request: Dict[str, Any]) -> Optional[str]:
+    if request["intent"] == "Book" and request["params"].get("repeat"):
+        return "CreateRecurringBooking"
+    return _INTENT_TOOLS.get(request["intent"])
+
+
+def _resolve_room(topo: Topology, params: Dict[str, Any]) -> Optional[int]:
+    bid = topo.building_ids.get(str(params.get("building") or ""))
+    try:
+        fid = topo.floor_ids.get(bid, {}).get(int(params.get("floor") or 0))
+    except (TypeError, ValueError):
+        return None
+    return topo.room_ids.get(fid, {}).get(str(params.get("room") or ""))
+
+
+def _footprint(topo: Topology, tool: str, params: Dict[str, Any]) -> Optional[FrozenSet[int]]:
+    """Room ids a step reads or writes; None when unknown (treated as every room)."""
+    if tool in ("CheckAvailability", "CreateBooking", "CreateRecurringBooking"):
+        rid = _resolve_room(topo, params)
+        return frozenset([rid]) if rid is not None else None
+    if tool == "FindFreeRooms":
+        bid = topo.building_ids.get(str(params.get("building") or ""))
+        floors = topo.floor_ids.get(bid)
+        if floors is None:
+            return None
+        fids = [floors[params["floor"]]] if params.get("floor") in floors else floors.values()
+        return frozenset(rid for fid in fids for rid in topo.room_ids.get(fid, {}).values())
+    if tool in ("CancelBooking", "UpdateBooking"):
+        _, _, rid = parse_reservation_id(str(params.get("reservation_id") or ""))
+        if rid is None:
+            return None
+        if tool == "UpdateBooking" and params.get("room"):
+            new_rid = _resolve_room(topo, params)
+            return frozenset([rid, new_rid]) if new_rid is not None else None
+        return frozenset([rid])
+    return None
+
+
+def _depends(a: Tuple[str, Optional[FrozenSet[int]]], b: Tuple[str, Optional[FrozenSet[int]]]) -> bool:
+    """Whether two steps must keep their query order: at least one writes and their rooms may overlap."""
+    (tool_a, rooms_a), (tool_b, rooms_b) = a, b
+    if tool_a not in _WRITE_TOOLS and tool_b not in _WRITE_TOOLS:
+        return False
+    return rooms_a is None or rooms_b is None or bool(rooms_a & rooms_b)
+
+
+async def planner_node(state: AgentState) -> AgentState:
+    requests = [{"intent": state["intent"], "params": state.get("params") or {}}, *(state.get("more_requests") or [])]
+    steps: List[Dict[str, Any]] = [
+        {"tool": _tool_for(r), "params": r["params"]} for r in requests if _tool_for(r)
+    ]
+    if not steps:
+        state["final_answer"] = "요청을 이해하지 못했어요. (가능: 조회/빈 방 찾기/예약/변경/취소/내예약)"
         return state
-    state["plan"] = [tool]
+    topo = await ensure_topology() if len(steps) > 1 else None
+    marks = [(s["tool"], _footprint(topo, s["tool"], s["params"])) for s in steps] if topo else []
+    for i, step in enumerate(steps):
+        step["id"] = i
+        step["after"] = [j for j in range(i) if _depends(marks[j], marks[i])]
+    state["steps"] = steps
+    state["plan"] = [s["tool"] for s in steps]
     return state
 
 
-def executor_node(state: AgentState) -> AgentState:
-    if not state.get("plan"):
-        return state
-    tool_name = state["plan"][0]
+async def _run_step(step: Dict[str, Any]) -> Dict[str, Any]:
     try:
-        result = TOOLS[tool_name].invoke(state.get("params", {}))
-        state["tool_result"] = result
+        async with unit_of_work():
+            return await TOOLS[step["tool"]].ainvoke(step["params"])
     except Exception as e:
-        state["tool_result"] = {"ok": False, "error": str(e)}
+        return {"ok": False, "error": str(e)}
+
+
+async def executor_node(state: AgentState) -> AgentState:
+    """Run the plan's steps, each as soon as the steps it depends on are done.
+
+    Independent steps run concurrently, each in its own task and unit of work,
+    so the node takes as long as the slowest dependency chain.
+    """
+    steps = state.get("steps") or []
+    if not steps:
+        return state
+    tasks: Dict[int, asyncio.Future] = {}
+
+    async def run(step: Dict[str, Any]) -> Dict[str, Any]:
+        if step["after"]:
+            await asyncio.gather(*(tasks[i] for i in step["after"]))
+        return await _run_step(step)
+
+    for step in steps:
+        tasks[step["id"]] = asyncio.ensure_future(run(step))
+    state["results"] = list(await asyncio.gather(*tasks.values()))
+    state["tool_result"] = state["results"][0]
     return state
 
 
-def reporter_node(state: AgentState) -> AgentState:
+async def _llm_report(state: AgentState) -> str:
     sys = _prompt_manager.get("reporter")
-    tool_json = state.get("tool_result") or {}
-    params = state.get("params") or {}
-    messages = [
-        SystemMessage(content=sys),
-        HumanMessage(content=f"params: {params}\nresult: {tool_json}"),
-    ]
-    text = llm.invoke(messages).content
-    state["final_answer"] = text if isinstance(text, str) else ""
+    steps = state.get("steps") or []
+    if len(steps) > 1:
+        content = "\n".join(
+            f"[{i + 1}] {step['tool']} params: {step['params']}\nresult: {result}"
+            for i, (step, result) in enumerate(zip(steps, state.get("results") or []))
+        )
+    else:
+        content = f"params: {state.get('params') or {}}\nresult: {state.get('tool_result') or {}}"
+    messages = [SystemMessage(content=sys), HumanMessage(content=content)]
+    t0 = time.perf_counter()
+    message = await get_llm().ainvoke(messages)
+    observe_llm("reporter", time.perf_counter() - t0, message)
+    text = message.content
+    return text if isinstance(text, str) else ""
+
+
+def _render_steps(state: AgentState) -> Optional[str]:
+    """Template answer for every step, one line each, or None when any step has no template."""
+    lines = []
+    for step, result in zip(state.get("steps") or [], state.get("results") or []):
+        line = render_report(step["tool"], step["params"], result)
+        if line is None:
+            return None
+        lines.append(line)
+    return "\n".join(lines) or None
+
+
+async def reporter_node(state: AgentState) -> AgentState:
+    mode = get_reporter_mode()
+    if not state.get("steps") and state.get("final_answer"):
+        return state
+    draft = _render_steps(state) if mode != "llm" else None
+    if draft is None:
+        state["final_answer"] = await _llm_report(state)
+    elif mode == "polish":
+        sys = _prompt_manager.get("reporter_polish")
+        t0 = time.perf_counter()
+        message = await get_llm().ainvoke([SystemMessage(content=sys), HumanMessage(content=draft)])
+        observe_llm("reporter_polish", time.perf_counter() - t0, message)
+        text = message.content
+        state["final_answer"] = text if isinstance(text, str) and text else draft
+    else:
+        state["final_answer"] = draft
     return state
@@ -0,0 +1,202 @@
+"""Deterministic Korean answers for tool results.
+
+Every tool in TOOLS returns a small dict whose outcome (available, booked,
+cancelled, not found, ...) fully determines the answer, so the reporter can
+render it from a template instead of asking the LLM. `render_report` returns
+None for a tool it has no template for; the reporter then falls back to the LLM.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.topology import get_topology
+
+Renderer = Callable[[Dict[str, Any], Dict[str, Any]], str]
+
+
+def _hhmm(iso: str) -> str:
+    """'2025-08-13T10:00' -> '2025-08-13 10:00'."""
+    return iso.replace("T", " ") if isinstance(iso, str) else str(iso)
+
+
+def _time_range(start: Any, end: Any) -> str:
+    start, end = _hhmm(start), _hhmm(end)
+    if start[:10] == end[:10] and len(end) > 11:
+        return f"{start}~{end[11:]}"
+    return f"{start}~{end}"
+
+
+def _place(params: Dict[str, Any]) -> str:
+    parts = [str(params["building"])] if params.get("building") else []
+    if params.get("floor") not in (None, ""):
+        parts.append(f"{params['floor']}층")
+    if params.get("room"):
+        parts.append(str(params["room"]))
+    return " ".join(parts)
+
+
+def _place_from_ids(item: Dict[str, Any]) -> str:
+    """Building/floor/room names from the topology snapshot, falling back to ids."""
+    topo = get_topology()
+    if topo is None:
+        return f"건물 {item['building_id']} / 층 {item['floor_id']} / 방 {item['room_id']}"
+    building = topo.building_names.get(item["building_id"], str(item["building_id"]))
+    floor = topo.floors.get(item["floor_id"])
+    room = topo.rooms.get(item["room_id"])
+    return " ".join([
+        building,
+        f"{floor[1]}층" if floor else f"층 {item['floor_id']}",
+        room[1] if room else f"방 {item['room_id']}",
+    ])
+
+
+def _slot(slot: Dict[str, Any]) -> str:
+    when = _time_range(slot["start"], slot["end"])
+    return f"{when} ({slot['floor']}층 {slot['room']})" if slot.get("room") else when
+
+
+def _suggestions(result: Dict[str, Any]) -> str:
+    slots: List[Dict[str, str]] = result.get("suggestions") or []
+    if not slots:
+        return " 가까운 날짜와 회의실에서 대체 가능한 시간을 찾지 못했습니다."
+    return " 대신 가능한 시간: " + ", ".join(_slot(s) for s in slots) + "."
+
+
+def _message(result: Dict[str, Any]) -> str:
+    msg = str(result.get("message") or "").strip()
+    return msg if not msg or msg.endswith((".", "!", "?")) else msg + "."
+
+
+def _error(result: Dict[str, Any]) -> str:
+    return f"요청을 처리하지 못했습니다: {result.get('error') or result.get('message') or '알 수 없는 오류'}"
+
+
+def _list_buildings(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    names = list(result.get("buildings") or {})
+    if not names:
+        return "등록된 건물이 없습니다."
+    return f"건물 {len(names)}곳: " + ", ".join(names)
+
+
+def _list_floors(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    floors = sorted(result.get("floors") or {})
+    if not floors:
+        return f"{params.get('building', '')}에 등록된 층이 없습니다.".strip()
+    return f"{params.get('building', '')} 층 목록: ".lstrip() + ", ".join(f"{f}층" for f in floors)
+
+
+def _list_rooms(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    rooms = [r["name"] for r in result.get("rooms") or []]
+    place = _place({"building": params.get("building"), "floor": params.get("floor")})
+    if not rooms:
+        return f"{place}에 등록된 회의실이 없습니다."
+    return f"{place} 회의실 {len(rooms)}개: " + ", ".join(rooms)
+
+
+def _check_availability(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    head = f"{_place(params)} {_time_range(params.get('start'), params.get('end'))}"
+    if result.get("available"):
+        return f"{head}은(는) 예약 가능합니다."
+    conflict = result.get("conflict_reservation_id")
+    busy = f" (충돌 예약: {conflict})" if conflict else ""
+    return f"{head}은(는) 이미 예약되어 있습니다{busy}." + _suggestions(result)
+
+
+def _find_free_rooms(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    head = f"{_place({'building': params.get('building'), 'floor': params.get('floor')})} " \
+           f"{_time_range(params.get('start'), params.get('end'))}"
+    rooms = result.get("rooms") or []
+    if not rooms:
+        return f"{head}에 비어 있는 회의실이 없습니다."
+    names = ", ".join(f"{r['floor']}층 {r['room']}" for r in rooms)
+    return f"{head}에 비어 있는 회의실 {len(rooms)}개: {names}"
+
+
+def _create_booking(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    head = f"{_place(params)} {_time_range(params.get('start'), params.get('end'))}"
+    if result.get("ok"):
+        title = f" '{params['title']}'" if params.get("title") else ""
+        return f"{head}{title} 예약을 완료했습니다. 예약 ID: {result.get('reservation_id')}"
+    return f"{head} 예약에 실패했습니다. {_message(result)}".rstrip() + _suggestions(result)
+
+
+_REPEAT_LABELS = {"daily": "매일", "weekly": "매주"}
+
+
+def _create_recurring_booking(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    every = _REPEAT_LABELS.get(params.get("repeat"), "")
+    interval = params.get("repeat_interval") or 1
+    if interval > 1:
+        every = f"{interval}{'일' if params.get('repeat') == 'daily' else '주'}마다"
+    title = f" '{params['title']}'" if params.get("title") else ""
+    head = " ".join(part for part in (f"{_place(params)}{title}", every, "반복 예약") if part)
+    booked = result.get("booked") or []
+    conflicts = result.get("conflicts") or []
+    if not booked and not conflicts:
+        return f"{head}을 하지 못했습니다. {_message(result)}".rstrip()
+    if booked:
+        lines = [f"{head} {len(booked)}건을 완료했습니다 ({_time_range(booked[0]['start'], booked[0]['end'])}부터)."]
+    else:
+        lines = [f"{head}을 하지 못했습니다. 모든 회차가 기존 예약과 겹칩니다."]
+    if conflicts:
+        if booked:
+            lines.append(f"겹쳐서 예약하지 못한 {len(conflicts)}건:")
+        for c in conflicts:
+            lines.append(f"- {_time_range(c['start'], c['end'])} (충돌 예약: {c['conflict_reservation_id']})")
+    return "\n".join(lines)
+
+
+def _update_booking(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    rid = params.get("reservation_id", "")
+    if result.get("ok"):
+        return f"예약 {rid}: {result.get('message', '예약이 수정되었습니다.')}"
+    text = f"예약 {rid}을(를) 수정하지 못했습니다. {_message(result)}".rstrip()
+    return text + _suggestions(result) if "suggestions" in result else text
+
+
+def _cancel_booking(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    rid = params.get("reservation_id", "")
+    if result.get("ok"):
+        return f"예약 {rid}을(를) 취소했습니다."
+    return f"예약 {rid}을(를) 취소하지 못했습니다. {_message(result)}".rstrip()
+
+
+def _get_user_reservations(params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    user = params.get("user_name", "")
+    items = result.get("items") or []
+    if not items:
+        return f"{user}님의 예정된 예약이 없습니다."
+    lines = [f"{user}님의 예약 {len(items)}건:"]
+    for item in items:
+        lines.append(
+            f"- {_time_range(item['start'], item['end'])} {_place_from_ids(item)} "
+            f"'{item.get('title', '')}' (ID: {item['reservation_id']})"
+        )
+    if result.get("next_cursor"):
+        lines.append("이후 예약이 더 있습니다.")
+    return "\n".join(lines)
+
+
+_RENDERERS: Dict[str, Renderer] = {
+    "ListBuildings": _list_buildings,
+    "ListFloors": _list_floors,
+    "ListRooms": _list_rooms,
+    "CheckAvailability": _check_availability,
+    "FindFreeRooms": _find_free_rooms,
+    "CreateBooking": _create_booking,
+    "CreateRecurringBooking": _create_recurring_booking,
+    "UpdateBooking": _update_booking,
+    "CancelBooking": _cancel_booking,
+    "GetUserReservations": _get_user_reservations,
+}
+
+
+def render_report(tool_name: str, params: Dict[str, Any], result: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Answer for `result` of `tool_name`, or None when no template applies."""
+    renderer = _RENDERERS.get(tool_name)
+    if renderer is None or not isinstance(result, dict):
+        return None
+    if result.get("ok") is False and "error" in result and "message" not in result:
+        return _error(result)
+    try:
+        return renderer(params or {}, result)
+    except (KeyError, TypeError, AttributeError):
+        return None
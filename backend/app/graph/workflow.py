@@ -1,5 +1,7 @@
 from langgraph.graph import END, START, StateGraph
 
+from app.core.metrics import timed_node
+from app.graph.checkpoint import get_checkpointer
 from app.core.state import AgentState
 from app.graph.nodes import (
     executor_node,
@@ -15,14 +17,18 @@ def _route_after_router(state: AgentState) -> str:
     return "ReverseQuestioner" if state.get("need_more") else "Planner"
 
 
-def get_agent():
+_agent = None
+_conversation_agent = None
+
+
+def build_agent(checkpointer=None):
     graph = StateGraph(AgentState)
-    graph.add_node("Init", init_node)
-    graph.add_node("Router", router_node)
-    graph.add_node("Planner", planner_node)
-    graph.add_node("Executor", executor_node)
-    graph.add_node("Reporter", reporter_node)
-    graph.add_node("ReverseQuestioner", reverse_questioner)
+    graph.add_node("Init", timed_node("Init", init_node))
+    graph.add_node("Router", timed_node("Router", router_node))
+    graph.add_node("Planner", timed_node("Planner", planner_node))
+    graph.add_node("Executor", timed_node("Executor", executor_node))
+    graph.add_node("Reporter", timed_node("Reporter", reporter_node))
+    graph.add_node("ReverseQuestioner", timed_node("ReverseQuestioner", reverse_questioner))
 
     graph.add_edge(START, "Init")
     graph.add_edge("Init", "Router")
@@ -36,4 +42,26 @@ def get_agent():
     graph.add_edge("Executor", "Reporter")
     graph.add_edge("Reporter", END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+
+def get_agent():
+    """Return the process-wide compiled agent, compiling it on first use."""
+    global _agent
+    if _agent is None:
+        _agent = build_agent()
+    return _agent
+
+
+def get_conversation_agent():
+    """The agent compiled with the conversation checkpointer; invoke with configurable.thread_id."""
+    global _conversation_agent
+    if _conversation_agent is None:
+        _conversation_agent = build_agent(get_checkpointer())
+    return _conversation_agent
+
+
+def reset_conversation_agent() -> None:
+    """Drop the agent compiled against the current checkpointer (call when the checkpointer is closed)."""
+    global _conversation_agent
+    _conversation_agent = None
@@ -1,26 +1,36 @@
-from app.services import building_service, reservation_service
+from app.services import building_service, reservation_service, topology
 
 ISO_FMT = reservation_service.ISO_FMT
 parse_iso = reservation_service.parse_iso
 add_reservation = reservation_service.add_reservation
+add_recurring_reservations = reservation_service.add_recurring_reservations
 cancel_reservation = reservation_service.cancel_reservation
 check_time_overlap = reservation_service.check_time_overlap
 get_reservation = reservation_service.get_reservation
 get_room_reservations = reservation_service.get_room_reservations
 get_user_reservations_list = reservation_service.get_user_reservations_list
+get_user_reservations_page = reservation_service.get_user_reservations_page
+iter_user_reservations = reservation_service.iter_user_reservations
 update_reservation = reservation_service.update_reservation
 find_gaps_for_day = reservation_service.find_gaps_for_day
 suggest_same_room_slots = reservation_service.suggest_same_room_slots
+suggest_slots = reservation_service.suggest_slots
+find_free_rooms = reservation_service.find_free_rooms
 get_buildings = building_service.get_buildings
 get_floors = building_service.get_floors
 get_rooms = building_service.get_rooms
 resolve_building_id = building_service.resolve_building_id
 resolve_floor_id = building_service.resolve_floor_id
 resolve_room_id = building_service.resolve_room_id
+ensure_topology = topology.ensure_topology
+get_topology = topology.get_topology
+invalidate_topology = topology.invalidate_topology
 
 __all__ = [
-    "ISO_FMT", "parse_iso", "add_reservation", "cancel_reservation",
+    "ISO_FMT", "parse_iso", "add_reservation", "add_recurring_reservations", "cancel_reservation",
     "check_time_overlap", "get_buildings", "get_floors", "get_reservation",
-    "get_rooms", "get_user_reservations_list", "resolve_building_id",
-    "resolve_floor_id", "resolve_room_id", "suggest_same_room_slots", "update_reservation",
+    "get_rooms", "get_user_reservations_list", "get_user_reservations_page", "iter_user_reservations",
+    "resolve_building_id",
+    "resolve_floor_id", "resolve_room_id", "suggest_same_room_slots", "suggest_slots", "find_free_rooms", "update_reservation",
+    "ensure_topology", "get_topology", "invalidate_topology",
 ]
@@ -1,24 +1,30 @@
 from typing import Union
 
-from app.db.repository import db_get_building_ids, db_get_floor_ids, db_get_rooms
+from app.services.topology import ensure_topology
 
 
-def get_buildings():
-    return db_get_building_ids()
+async def get_buildings():
+    topo = await ensure_topology()
+    return dict(topo.building_ids)
 
 
-def get_floors(building_id):
-    return db_get_floor_ids(building_id)
+async def get_floors(building_id):
+    topo = await ensure_topology()
+    return dict(topo.floor_ids.get(building_id, {}))
 
 
-def get_rooms(building_id, floor_id):
-    return db_get_rooms(building_id, floor_id)
+async def get_rooms(building_id, floor_id):
+    topo = await ensure_topology()
+    floor = topo.floors.get(floor_id)
+    if floor is None or floor[0] != building_id:
+        return None
+    return dict(topo.room_ids.get(floor_id, {}))
 
 
-def resolve_building_id(building: Union[str, int]) -> int:
+async def resolve_building_id(building: Union[str, int]) -> int:
     if isinstance(building, int):
         return building
-    m = get_buildings()
+    m = (await ensure_topology()).building_ids
     if building in m:
         return m[building]
     try:
@@ -27,13 +33,14 @@ def resolve_building_id(building: Union[str, int]) -> int:
         raise ValueError(f"알 수 없는 빌딩: {building}")
 
 
-def resolve_floor_id(building_id: int, floor: Union[int, str]) -> int:
-    floors = get_floors(building_id)
+async def resolve_floor_id(building_id: int, floor: Union[int, str]) -> int:
+    topo = await ensure_topology()
+    floors = topo.floor_ids.get(building_id, {})
     if isinstance(floor, int) and floor in floors:
         return floors[floor]
     try:
         f = int(floor)
-        if f in floors.values():
+        if f in topo.floors and topo.floors[f][0] == building_id:
             return f
         if f in floors:
             return floors[f]
@@ -42,19 +49,21 @@ def resolve_floor_id(building_id: int, floor: Union[int, str]) -> int:
     raise ValueError(f"알 수 없는 층: {floor} (building_id={building_id})")
 
 
-def resolve_room_id(building_id: int, floor_id: int, room: Union[str, int]) -> int:
-    rooms = get_rooms(building_id, floor_id)
-    if rooms is None:
+async def resolve_room_id(building_id: int, floor_id: int, room: Union[str, int]) -> int:
+    topo = await ensure_topology()
+    floor = topo.floors.get(floor_id)
+    if floor is None or floor[0] != building_id:
         raise ValueError(f"층 정보 없음 (building_id={building_id}, floor_id={floor_id})")
+    rooms = topo.room_ids.get(floor_id, {})
     if isinstance(room, int):
-        if room in rooms.values():
+        if room in topo.rooms and topo.rooms[room][0] == floor_id:
             return room
         raise ValueError(f"알 수 없는 회의실 ID: {room}")
     if room in rooms:
         return rooms[room]
     try:
         r = int(room)
-        if r in rooms.values():
+        if r in topo.rooms and topo.rooms[r][0] == floor_id:
             return r
     except Exception:
         pass
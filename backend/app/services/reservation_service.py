@@ -1,14 +1,13 @@
-from datetime import datetime, date
-
-from app.db.repository import (
-    db_add_reservation,
-    db_delete_reservation,
-    db_find_overlapping,
-    db_get_reservation,
-    db_get_room_reservations,
-    db_get_user_reservations,
-    db_update_reservation,
-)
+import base64
+import binascii
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from app.core.config import get_business_hours, get_suggest_days, get_suggest_nearby_rooms
+
+from app.db.session import unit_of_work
+from app.db.store import get_store
+from app.services.topology import ensure_topology
 
 ISO_FMT = "%Y-%m-%dT%H:%M"
 
@@ -29,119 +28,305 @@ def parse_reservation_id(reservation_id):
     return None, None, None
 
 
-def check_time_overlap(building_id, floor_id, room_id, new_start, new_end, exclude_reservation_id=None):
-    conflict = db_find_overlapping(
+async def check_time_overlap(building_id, floor_id, room_id, new_start, new_end, exclude_reservation_id=None):
+    conflict = await get_store().find_overlapping(
         building_id, floor_id, room_id, new_start, new_end, exclude_reservation_id
     )
     return (True, conflict) if conflict else (False, None)
 
 
-def add_reservation(building_id, floor_id, room_id, user_name, purpose, title, start_datetime, end_datetime):
+async def add_reservation(building_id, floor_id, room_id, user_name, purpose, title, start_datetime, end_datetime):
     reservation_id = generate_reservation_id(building_id, floor_id, room_id, start_datetime)
-    is_overlap, conflicting_reservation_id = check_time_overlap(
-        building_id, floor_id, room_id, start_datetime, end_datetime
-    )
-    if is_overlap:
-        return False, f"예약이 겹칩니다. 충돌하는 예약: {conflicting_reservation_id}", None
-    db_add_reservation(
+    conflicting_reservation_id = await get_store().try_add(
         reservation_id, building_id, floor_id, room_id,
         user_name, purpose, title, start_datetime, end_datetime,
     )
+    if conflicting_reservation_id:
+        return False, f"예약이 겹칩니다. 충돌하는 예약: {conflicting_reservation_id}", None
     return True, "예약이 성공적으로 추가되었습니다.", reservation_id
 
 
-def cancel_reservation(reservation_id):
+_REPEAT_STEPS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+MAX_OCCURRENCES = 366
+
+
+def expand_occurrences(
+    start_datetime: datetime, end_datetime: datetime, repeat: str,
+    interval: int = 1, count: Optional[int] = None, until: Optional[date] = None,
+) -> List[Tuple[datetime, datetime]]:
+    """(start, end) of each occurrence: every `interval` days/weeks from the first, `count` times or through `until`."""
+    if repeat not in _REPEAT_STEPS:
+        raise ValueError(f"지원하지 않는 반복 주기입니다: {repeat} (daily, weekly)")
+    if not count and until is None:
+        raise ValueError("반복 횟수나 종료일이 필요합니다.")
+    if until is not None and until < start_datetime.date():
+        raise ValueError("반복 종료일이 시작일보다 빠릅니다.")
+    step = _REPEAT_STEPS[repeat] * max(interval, 1)
+    if end_datetime - start_datetime > step:
+        raise ValueError("회의 시간이 반복 간격보다 길어 회차끼리 겹칩니다.")
+    limit = min(count or MAX_OCCURRENCES + 1, MAX_OCCURRENCES + 1)
+    out = []
+    start, end = start_datetime, end_datetime
+    while len(out) < limit and (until is None or start.date() <= until):
+        out.append((start, end))
+        start, end = start + step, end + step
+    if len(out) > MAX_OCCURRENCES:
+        raise ValueError(f"반복 예약은 최대 {MAX_OCCURRENCES}회까지 가능합니다.")
+    return out
+
+
+async def add_recurring_reservations(
+    building_id, floor_id, room_id, user_name, purpose, title, start_datetime, end_datetime,
+    repeat: str, interval: int = 1, count: Optional[int] = None, until: Optional[date] = None,
+):
+    """Book every free occurrence of a series with one conflict query and one bulk insert.
+
+    Returns (booked rows, [(row, conflicting reservation_id)]) in occurrence order.
+    """
+    rows = [
+        {
+            "reservation_id": generate_reservation_id(building_id, floor_id, room_id, s),
+            "building_id": building_id,
+            "floor_id": floor_id,
+            "room_id": room_id,
+            "user_name": user_name,
+            "purpose": purpose,
+            "title": title,
+            "start_datetime": s,
+            "end_datetime": e,
+        }
+        for s, e in expand_occurrences(start_datetime, end_datetime, repeat, interval, count, until)
+    ]
+    conflicts = await get_store().try_add_many(rows)
+    booked = [r for r in rows if r["reservation_id"] not in conflicts]
+    return booked, [(r, conflicts[r["reservation_id"]]) for r in rows if r["reservation_id"] in conflicts]
+
+
+async def cancel_reservation(reservation_id):
     building_id, floor_id, room_id = parse_reservation_id(reservation_id)
     if building_id is None:
         return False, "잘못된 예약 ID 형식입니다."
-    ok = db_delete_reservation(reservation_id)
+    ok = await get_store().delete(reservation_id)
     return (True, "예약이 성공적으로 취소되었습니다.") if ok else (False, "존재하지 않는 예약입니다.")
 
 
-def get_room_reservations(building_id, floor_id, room_id, date=None):
-    return db_get_room_reservations(building_id, floor_id, room_id, day=date)
+async def get_room_reservations(building_id, floor_id, room_id, date=None):
+    return await get_store().room_reservations(building_id, floor_id, room_id, day=date)
 
 
-def update_reservation(reservation_id, **kwargs):
+async def update_reservation(reservation_id, existing=None, **kwargs):
+    """Apply kwargs to a reservation in one transaction.
+
+    Pass `existing` (the row from get_reservation) to reuse an already-loaded row.
+    """
     building_id, floor_id, room_id = parse_reservation_id(reservation_id)
     if building_id is None:
         return False, "잘못된 예약 ID 형식입니다."
-    existing = db_get_reservation(reservation_id)
-    if not existing:
-        return False, "존재하지 않는 예약입니다."
-    new_reservation = {**existing, **kwargs}
-    time_changed = "start_datetime" in kwargs or "end_datetime" in kwargs
-    room_changed = "building_id" in kwargs or "floor_id" in kwargs or "room_id" in kwargs
-    if time_changed or room_changed:
-        new_reservation_id = generate_reservation_id(
-            new_reservation["building_id"],
-            new_reservation["floor_id"],
-            new_reservation["room_id"],
-            new_reservation["start_datetime"],
-        )
-        is_overlap, conflicting = check_time_overlap(
-            new_reservation["building_id"],
-            new_reservation["floor_id"],
-            new_reservation["room_id"],
-            new_reservation["start_datetime"],
-            new_reservation["end_datetime"],
-            exclude_reservation_id=reservation_id,
-        )
-        if is_overlap:
-            return False, f"예약이 겹칩니다. 충돌하는 예약: {conflicting}"
-        db_delete_reservation(reservation_id)
-        db_add_reservation(
-            new_reservation_id,
-            new_reservation["building_id"],
-            new_reservation["floor_id"],
-            new_reservation["room_id"],
-            new_reservation["user_name"],
-            new_reservation["purpose"],
-            new_reservation["title"],
-            new_reservation["start_datetime"],
-            new_reservation["end_datetime"],
+    async with unit_of_work():
+        if existing is None:
+            existing = await get_store().get(reservation_id)
+        if not existing:
+            return False, "존재하지 않는 예약입니다."
+        new_reservation = {**existing, **kwargs}
+        time_changed = "start_datetime" in kwargs or "end_datetime" in kwargs
+        room_changed = "building_id" in kwargs or "floor_id" in kwargs or "room_id" in kwargs
+        if time_changed or room_changed:
+            new_reservation_id = generate_reservation_id(
+                new_reservation["building_id"],
+                new_reservation["floor_id"],
+                new_reservation["room_id"],
+                new_reservation["start_datetime"],
+            )
+            conflicting = await get_store().replace(
+                reservation_id,
+                new_reservation_id,
+                new_reservation["building_id"],
+                new_reservation["floor_id"],
+                new_reservation["room_id"],
+                new_reservation["user_name"],
+                new_reservation["purpose"],
+                new_reservation["title"],
+                new_reservation["start_datetime"],
+                new_reservation["end_datetime"],
+            )
+            if conflicting:
+                return False, f"예약이 겹칩니다. 충돌하는 예약: {conflicting}"
+            return True, f"예약이 성공적으로 수정되었습니다. 새 예약 ID: {new_reservation_id}"
+        await get_store().update(
+            reservation_id,
+            user_name=new_reservation.get("user_name"),
+            purpose=new_reservation.get("purpose"),
+            title=new_reservation.get("title"),
         )
-        return True, f"예약이 성공적으로 수정되었습니다. 새 예약 ID: {new_reservation_id}"
-    db_update_reservation(
-        reservation_id,
-        user_name=new_reservation.get("user_name"),
-        purpose=new_reservation.get("purpose"),
-        title=new_reservation.get("title"),
-        start_datetime=new_reservation.get("start_datetime"),
-        end_datetime=new_reservation.get("end_datetime"),
-    )
-    return True, "예약이 성공적으로 수정되었습니다."
+        return True, "예약이 성공적으로 수정되었습니다."
+
+
+async def get_reservation(reservation_id):
+    return await get_store().get(reservation_id)
 
 
-def get_reservation(reservation_id):
-    return db_get_reservation(reservation_id)
+def _business_windows(first_day: date, days: int) -> List[Tuple[datetime, datetime]]:
+    open_t, close_t = get_business_hours()
+    return [
+        (datetime.combine(d, open_t), datetime.combine(d, close_t))
+        for d in (first_day + timedelta(days=i) for i in range(days))
+    ]
 
 
-def find_gaps_for_day(building_id: int, floor_id: int, room_id: int, day: date):
-    res_list = get_room_reservations(building_id, floor_id, room_id, date=day)
-    open_t = datetime.combine(day, datetime.min.time()).replace(hour=9, minute=0)
-    close_t = datetime.combine(day, datetime.min.time()).replace(hour=19, minute=0)
-    gaps, cursor = [], open_t
-    for r in res_list:
-        s, e = r["start_datetime"], r["end_datetime"]
-        if cursor < s:
-            gaps.append((cursor, s))
-        cursor = max(cursor, e)
-    if cursor < close_t:
-        gaps.append((cursor, close_t))
+def _sweep_gaps(
+    intervals: List[Tuple[datetime, datetime]], windows: List[Tuple[datetime, datetime]]
+) -> List[Tuple[datetime, datetime]]:
+    """Free gaps inside sorted, disjoint windows, given intervals sorted by start (one merge pass)."""
+    gaps, i = [], 0
+    for w_open, w_close in windows:
+        while i < len(intervals) and intervals[i][1] <= w_open:
+            i += 1
+        cursor, j = w_open, i
+        while j < len(intervals) and intervals[j][0] < w_close:
+            s, e = intervals[j]
+            if s > cursor:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+            j += 1
+        if cursor < w_close:
+            gaps.append((cursor, w_close))
     return gaps
 
 
-def suggest_same_room_slots(b_id: int, f_id: int, r_id: int, req_start: datetime, req_end: datetime, n=3):
+async def find_gaps_for_day(building_id: int, floor_id: int, room_id: int, day: date):
+    windows = _business_windows(day, 1)
+    intervals = await get_store().room_intervals([room_id], *windows[0])
+    return _sweep_gaps(intervals[room_id], windows)
+
+
+def _rooms_by_proximity(topo, building_id: int, floor_id: Optional[int]) -> List[Tuple[int, int, str]]:
+    """(room_id, floor_id, name) of a building ordered by floor distance from floor_id, floor, name."""
+    anchor = topo.floors[floor_id][1] if floor_id in topo.floors else None
+    rooms = [
+        (rid, fid, name)
+        for fid in topo.floor_ids.get(building_id, {}).values()
+        for name, rid in topo.room_ids.get(fid, {}).items()
+    ]
+
+    def rank(item):
+        number = topo.floors[item[1]][1]
+        return (abs(number - anchor) if anchor is not None else 0), number, item[2]
+
+    return sorted(rooms, key=rank)
+
+
+async def suggest_slots(
+    b_id: int, f_id: int, r_id: int, req_start: datetime, req_end: datetime, n=3,
+    days: Optional[int] = None, nearby_rooms: Optional[int] = None,
+):
+    """Alternative slots for a refused request, closest to the requested time first.
+
+    Searches business hours of the requested day and the following days
+    (SUGGEST_DAYS). Up to `n` slots in the requested room come first; with
+    SUGGEST_NEARBY_ROOMS set, the closest slot in each of that many nearby rooms
+    is appended as an extra. All reservations come from one range query; gaps
+    are found with a merge sweep. Each gap offers the start closest to the
+    requested time of day and its two edges.
+    """
+    days = get_suggest_days() if days is None else days
+    nearby_rooms = get_suggest_nearby_rooms() if nearby_rooms is None else nearby_rooms
+    topo = await ensure_topology()
+    rooms = [(r_id, f_id, topo.rooms[r_id][1] if r_id in topo.rooms else str(r_id))]
+    if nearby_rooms:
+        rooms += [r for r in _rooms_by_proximity(topo, b_id, f_id) if r[0] != r_id][:nearby_rooms]
+
     dur = req_end - req_start
+    windows = _business_windows(req_start.date(), days)
+    intervals = await get_store().room_intervals([r[0] for r in rooms], windows[0][0], windows[-1][1])
+    candidates = {}
+    for room_rank, (rid, fid, name) in enumerate(rooms):
+        for gs, ge in _sweep_gaps(intervals[rid], windows):
+            latest = ge - dur
+            if latest < gs:
+                continue
+            target = datetime.combine(gs.date(), req_start.time())
+            for start in (min(max(target, gs), latest), gs, latest):
+                key = (rid, start)
+                if key not in candidates:
+                    candidates[key] = (abs(start - req_start), room_rank, start, rid, fid, name)
+
+    ranked = sorted(candidates.values())
+    picked = [c for c in ranked if c[3] == r_id][:n]
+    extra_rooms = set()
+    for c in ranked:
+        if c[3] != r_id and c[3] not in extra_rooms:
+            extra_rooms.add(c[3])
+            picked.append(c)
     out = []
-    for gs, ge in find_gaps_for_day(b_id, f_id, r_id, req_start.date()):
-        if gs + dur <= ge:
-            out.append({"start": (gs).strftime(ISO_FMT), "end": (gs + dur).strftime(ISO_FMT)})
-        if len(out) >= n:
-            break
+    for _, _, start, rid, fid, name in picked:
+        slot = {"start": start.strftime(ISO_FMT), "end": (start + dur).strftime(ISO_FMT)}
+        if rid != r_id:
+            slot.update({"room_id": rid, "floor": topo.floors[fid][1], "room": name})
+        out.append(slot)
     return out
 
 
-def get_user_reservations_list(user_name: str, start_day: date, end_day: date, building_id_filter=None):
-    return db_get_user_reservations(user_name, start_day, end_day, building_id_filter)
+async def suggest_same_room_slots(b_id: int, f_id: int, r_id: int, req_start: datetime, req_end: datetime, n=3):
+    return await suggest_slots(b_id, f_id, r_id, req_start, req_end, n=n, nearby_rooms=0)
+
+
+async def get_user_reservations_list(user_name: str, start_day: date, end_day: date, building_id_filter=None):
+    return await get_store().user_reservations(user_name, start_day, end_day, building_id_filter)
+
+
+def encode_cursor(start: datetime, reservation_id: str) -> str:
+    """Opaque keyset cursor for the row (start, reservation_id)."""
+    return base64.urlsafe_b64encode(f"{start.isoformat()}|{reservation_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; ValueError if the cursor is malformed."""
+    try:
+        start, reservation_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(start), reservation_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"잘못된 cursor: {cursor}") from None
+
+
+async def get_user_reservations_page(
+    user_name: str, start_day: date, end_day: date, building_id_filter=None, limit: int = 50, cursor: Optional[str] = None,
+):
+    """(up to `limit` reservations in start order, cursor of the next page or None)."""
+    after = decode_cursor(cursor) if cursor else None
+    rows = await get_store().user_reservations(
+        user_name, start_day, end_day, building_id_filter, limit=limit + 1, after=after
+    )
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["start"], rows[-1]["reservation_id"])
+
+
+def iter_user_reservations(user_name: str, start_day: date, end_day: date, building_id_filter=None):
+    """Async iterator over all of the user's reservations in start order, fetched in batches (exports)."""
+    return get_store().iter_user_reservations(user_name, start_day, end_day, building_id_filter)
+
+
+async def find_free_rooms(
+    building_id: int, start: datetime, end: datetime,
+    floor_id: Optional[int] = None, near_floor_id: Optional[int] = None, limit: Optional[int] = None,
+):
+    """Rooms of a building (or one floor) free for [start, end), with one busy-room query.
+
+    Ranked by floor distance from `floor_id`/`near_floor_id` (same floor first), then
+    floor number and room name.
+    """
+    topo = await ensure_topology()
+    anchor = floor_id if floor_id is not None else near_floor_id
+    candidates = [
+        r for r in _rooms_by_proximity(topo, building_id, anchor)
+        if floor_id is None or r[1] == floor_id
+    ]
+    busy = await get_store().busy_room_ids([rid for rid, _, _ in candidates], start, end)
+    free = [c for c in candidates if c[0] not in busy]
+    if limit is not None:
+        free = free[:limit]
+    return [
+        {"room_id": rid, "floor_id": fid, "floor": topo.floors[fid][1], "room": name}
+        for rid, fid, name in free
+    ]
@@ -0,0 +1,117 @@
+"""In-process snapshot of the building/floor/room topology.
+
+The topology is synced from YAML and almost never changes, so it is loaded once
+into immutable lookup maps and shared by every request. A snapshot is replaced
+(never mutated) when it is invalidated, or when it is older than
+TOPOLOGY_TTL_SECONDS and topology_meta.version has moved since it was loaded;
+an unchanged version only renews the snapshot's TTL.
+"""
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional, Tuple
+
+from app.core.config import get_topology_ttl_seconds
+from app.db.repository import db_get_topology_version, db_load_topology
+
+
+@dataclass(frozen=True)
+class Topology:
+    version: int
+    loaded_at: float
+    building_ids: Mapping[str, int]
+    building_names: Mapping[int, str]
+    floor_ids: Mapping[int, Mapping[int, int]]
+    floors: Mapping[int, Tuple[int, int]]
+    room_ids: Mapping[int, Mapping[str, int]]
+    rooms: Mapping[int, Tuple[int, str]]
+    db_version: int = 0
+
+
+def build_topology(
+    buildings: Iterable[Tuple[int, str]],
+    floors: Iterable[Tuple[int, int, int]],
+    rooms: Iterable[Tuple[int, int, str]],
+    version: int = 0,
+    db_version: int = 0,
+) -> Topology:
+    """Index (id, name) buildings, (id, building_id, number) floors and (id, floor_id, name) rooms."""
+    building_ids = {name: bid for bid, name in buildings}
+    floor_ids = {bid: {} for bid in building_ids.values()}
+    floors_by_id = {}
+    for fid, bid, number in floors:
+        floor_ids.setdefault(bid, {})[number] = fid
+        floors_by_id[fid] = (bid, number)
+    room_ids = {fid: {} for fid in floors_by_id}
+    rooms_by_id = {}
+    for rid, fid, name in rooms:
+        room_ids.setdefault(fid, {})[name] = rid
+        rooms_by_id[rid] = (fid, name)
+    return Topology(
+        version=version,
+        loaded_at=time.monotonic(),
+        building_ids=MappingProxyType(building_ids),
+        building_names=MappingProxyType({bid: name for name, bid in building_ids.items()}),
+        floor_ids=MappingProxyType({bid: MappingProxyType(m) for bid, m in floor_ids.items()}),
+        floors=MappingProxyType(floors_by_id),
+        room_ids=MappingProxyType({fid: MappingProxyType(m) for fid, m in room_ids.items()}),
+        rooms=MappingProxyType(rooms_by_id),
+        db_version=db_version,
+    )
+
+
+_topology: Optional[Topology] = None
+_stale = False
+_version = 0
+# asyncio.Lock binds to the loop it is first contended on; run.py and the benchmarks call asyncio.run() repeatedly.
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+def get_topology() -> Optional[Topology]:
+    """Current snapshot without any I/O (None before the first load)."""
+    return _topology
+
+
+def invalidate_topology() -> None:
+    """Force the next ensure_topology() to reload the snapshot."""
+    global _stale
+    _stale = True
+
+
+def _is_fresh(topo: Optional[Topology]) -> bool:
+    if topo is None or _stale:
+        return False
+    return time.monotonic() - topo.loaded_at < get_topology_ttl_seconds()
+
+
+async def refresh_topology() -> Topology:
+    global _topology, _stale, _version
+    # Version first: a sync landing in between makes the next check reload again.
+    db_version = await db_get_topology_version()
+    buildings, floors, rooms = await db_load_topology()
+    _version += 1
+    _topology = build_topology(buildings, floors, rooms, version=_version, db_version=db_version)
+    _stale = False
+    return _topology
+
+
+async def ensure_topology() -> Topology:
+    """Return a fresh snapshot, reloading at most once across concurrent callers."""
+    global _topology
+    topo = _topology
+    if _is_fresh(topo):
+        return topo
+    loop = asyncio.get_running_loop()
+    lock = _locks.get(loop)
+    if lock is None:
+        lock = _locks[loop] = asyncio.Lock()
+    async with lock:
+        if _is_fresh(_topology):
+            return _topology
+        if _topology is not None and not _stale:
+            if await db_get_topology_version() == _topology.db_version:
+                _topology = replace(_topology, loaded_at=time.monotonic())
+                return _topology
+        return await refresh_topology()
@@ -1,4 +1,5 @@
-from typing import Optional, Union
+from datetime import date
+from typing import Literal, Optional, Union
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -32,6 +33,24 @@ class CheckAvailabilityInput(BaseModel):
         return v
 
 
+class FindFreeRoomsInput(BaseModel):
+    building: Union[str, int]
+    floor: Optional[Union[int, str]] = None
+    start: str
+    end: str
+    limit: int = 10
+
+    @field_validator("end")
+    @classmethod
+    def _end_after_start(cls, v, info):
+        s = info.data.get("start")
+        if s:
+            sd, ed = parse_iso(s), parse_iso(v)
+            if ed <= sd:
+                raise ValueError("종료시각은 시작시각 이후여야 합니다.")
+        return v
+
+
 class CreateBookingInput(BaseModel):
     building: Union[str, int]
     floor: Union[int, str]
@@ -43,6 +62,20 @@ class CreateBookingInput(BaseModel):
     end: str
 
 
+class CreateRecurringBookingInput(CreateBookingInput):
+    repeat: Literal["daily", "weekly"] = Field(..., description="반복 주기: daily(매일) / weekly(매주)")
+    repeat_interval: int = Field(1, ge=1, le=52, description="며칠/몇 주마다 (기본 1)")
+    repeat_count: Optional[int] = Field(None, ge=1, description="총 회차 수 (첫 회 포함)")
+    repeat_until: Optional[str] = Field(None, description="마지막 회차 날짜 YYYY-MM-DD (포함)")
+
+    @field_validator("repeat_until")
+    @classmethod
+    def _until_is_date(cls, v):
+        if v:
+            date.fromisoformat(v)
+        return v or None
+
+
 class UpdateBookingInput(BaseModel):
     reservation_id: str
     building: Optional[Union[str, int]] = None
@@ -62,3 +95,5 @@ class GetUserReservationsInput(BaseModel):
     user_name: str
     days_ahead: int = 7
     building: Optional[Union[str, int]] = None
+    limit: int = Field(50, ge=1, le=200, description="한 번에 가져올 최대 건수")
+    cursor: Optional[str] = Field(None, description="이전 응답의 next_cursor (다음 페이지)")
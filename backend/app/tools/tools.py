@@ -1,22 +1,25 @@
-from typing import Any, Dict, List, Optional, Union
+from datetime import date
+from typing import Any, Dict, Optional, Union
 
 from langchain_core.tools import tool
 
 from app.services import (
     ISO_FMT,
+    add_recurring_reservations,
     add_reservation,
     cancel_reservation,
     check_time_overlap,
+    find_free_rooms,
     get_buildings,
     get_floors,
     get_reservation,
     get_rooms,
-    get_user_reservations_list,
+    get_user_reservations_page,
     parse_iso,
     resolve_building_id,
     resolve_floor_id,
     resolve_room_id,
-    suggest_same_room_slots,
+    suggest_slots,
     update_reservation,
 )
 from app.tools.schemas import (
@@ -25,30 +28,32 @@ from app.tools.schemas import (
     CancelBookingInput,
     CheckAvailabilityInput,
     CreateBookingInput,
+    CreateRecurringBookingInput,
+    FindFreeRoomsInput,
     GetUserReservationsInput,
     UpdateBookingInput,
 )
 
 
 @tool("ListBuildings")
-def list_buildings() -> Dict[str, Any]:
+async def list_buildings() -> Dict[str, Any]:
     """빌딩 목록을 반환합니다. {이름: id} 형태."""
-    return {"buildings": get_buildings()}
+    return {"buildings": await get_buildings()}
 
 
 @tool("ListFloors", args_schema=BuildingRequired)
-def list_floors(building: Union[str, int]) -> Dict[str, Any]:
+async def list_floors(building: Union[str, int]) -> Dict[str, Any]:
     """해당 빌딩의 층 목록을 반환합니다. {층수: floor_id} 형태."""
-    b_id = resolve_building_id(building)
-    return {"building_id": b_id, "floors": get_floors(b_id)}
+    b_id = await resolve_building_id(building)
+    return {"building_id": b_id, "floors": await get_floors(b_id)}
 
 
 @tool("ListRooms", args_schema=BuildingAndFloor)
-def list_rooms(building: Union[str, int], floor: Union[int, str]) -> Dict[str, Any]:
+async def list_rooms(building: Union[str, int], floor: Union[int, str]) -> Dict[str, Any]:
     """해당 빌딩/층의 회의실 목록을 반환합니다."""
-    b_id = resolve_building_id(building)
-    f_id = resolve_floor_id(b_id, floor)
-    rooms = get_rooms(b_id, f_id)
+    b_id = await resolve_building_id(building)
+    f_id = await resolve_floor_id(b_id, floor)
+    rooms = await get_rooms(b_id, f_id)
     return {
         "building_id": b_id,
         "floor_id": f_id,
@@ -57,43 +62,90 @@ def list_rooms(building: Union[str, int], floor: Union[int, str]) -> Dict[str, A
 
 
 @tool("CheckAvailability", args_schema=CheckAvailabilityInput)
-def check_availability(
+async def check_availability(
     building: Union[str, int], floor: Union[int, str], room: Union[str, int], start: str, end: str
 ) -> Dict[str, Any]:
     """요청 시간대의 회의실 가용 여부를 확인하고, 불가 시 대안 시간을 제안합니다."""
-    b_id = resolve_building_id(building)
-    f_id = resolve_floor_id(b_id, floor)
-    r_id = resolve_room_id(b_id, f_id, room)
+    b_id = await resolve_building_id(building)
+    f_id = await resolve_floor_id(b_id, floor)
+    r_id = await resolve_room_id(b_id, f_id, room)
     s_dt, e_dt = parse_iso(start), parse_iso(end)
-    overlap, conflict_res = check_time_overlap(b_id, f_id, r_id, s_dt, e_dt)
+    overlap, conflict_res = await check_time_overlap(b_id, f_id, r_id, s_dt, e_dt)
     if overlap:
         return {
             "ok": True,
             "available": False,
             "conflict_reservation_id": conflict_res,
-            "suggestions": suggest_same_room_slots(b_id, f_id, r_id, s_dt, e_dt, n=3),
+            "suggestions": await suggest_slots(b_id, f_id, r_id, s_dt, e_dt, n=3),
         }
     return {"ok": True, "available": True}
 
 
+@tool("FindFreeRooms", args_schema=FindFreeRoomsInput)
+async def find_free_rooms_tool(
+    building: Union[str, int], start: str, end: str,
+    floor: Optional[Union[int, str]] = None, limit: int = 10,
+) -> Dict[str, Any]:
+    """빌딩(선택: 층) 안에서 요청 시간대에 비어 있는 회의실을 찾습니다. 같은 층이 먼저 나옵니다."""
+    b_id = await resolve_building_id(building)
+    f_id = await resolve_floor_id(b_id, floor) if floor not in (None, "", 0) else None
+    s_dt, e_dt = parse_iso(start), parse_iso(end)
+    rooms = await find_free_rooms(b_id, s_dt, e_dt, floor_id=f_id, limit=limit)
+    return {"ok": True, "building_id": b_id, "count": len(rooms), "rooms": rooms}
+
+
 @tool("CreateBooking", args_schema=CreateBookingInput)
-def create_booking(
+async def create_booking(
     building: Union[str, int], floor: Union[int, str], room: Union[str, int],
     user_name: str, purpose: str, title: str, start: str, end: str,
 ) -> Dict[str, Any]:
     """회의실 예약을 생성합니다."""
-    b_id = resolve_building_id(building)
-    f_id = resolve_floor_id(b_id, floor)
-    r_id = resolve_room_id(b_id, f_id, room)
+    b_id = await resolve_building_id(building)
+    f_id = await resolve_floor_id(b_id, floor)
+    r_id = await resolve_room_id(b_id, f_id, room)
     s_dt, e_dt = parse_iso(start), parse_iso(end)
-    ok, msg, res_id = add_reservation(b_id, f_id, r_id, user_name, purpose, title, s_dt, e_dt)
+    ok, msg, res_id = await add_reservation(b_id, f_id, r_id, user_name, purpose, title, s_dt, e_dt)
     if not ok:
-        return {"ok": False, "message": msg, "suggestions": suggest_same_room_slots(b_id, f_id, r_id, s_dt, e_dt, n=3)}
+        return {"ok": False, "message": msg, "suggestions": await suggest_slots(b_id, f_id, r_id, s_dt, e_dt, n=3)}
     return {"ok": True, "message": msg, "reservation_id": res_id}
 
 
+@tool("CreateRecurringBooking", args_schema=CreateRecurringBookingInput)
+async def create_recurring_booking(
+    building: Union[str, int], floor: Union[int, str], room: Union[str, int],
+    user_name: str, purpose: str, title: str, start: str, end: str,
+    repeat: str, repeat_interval: int = 1, repeat_count: Optional[int] = None, repeat_until: Optional[str] = None,
+) -> Dict[str, Any]:
+    """매일/매주 반복 예약을 한 번에 생성합니다. 겹치지 않는 회차만 예약하고 겹친 회차는 충돌 예약과 함께 알려줍니다."""
+    b_id = await resolve_building_id(building)
+    f_id = await resolve_floor_id(b_id, floor)
+    r_id = await resolve_room_id(b_id, f_id, room)
+    s_dt, e_dt = parse_iso(start), parse_iso(end)
+    until = date.fromisoformat(repeat_until) if repeat_until else None
+    try:
+        booked, conflicts = await add_recurring_reservations(
+            b_id, f_id, r_id, user_name, purpose, title, s_dt, e_dt,
+            repeat, repeat_interval, repeat_count, until,
+        )
+    except ValueError as e:
+        return {"ok": False, "message": str(e)}
+    return {
+        "ok": bool(booked),
+        "booked": [
+            {"reservation_id": r["reservation_id"], "start": r["start_datetime"].strftime(ISO_FMT),
+             "end": r["end_datetime"].strftime(ISO_FMT)}
+            for r in booked
+        ],
+        "conflicts": [
+            {"start": r["start_datetime"].strftime(ISO_FMT), "end": r["end_datetime"].strftime(ISO_FMT),
+             "conflict_reservation_id": conflict}
+            for r, conflict in conflicts
+        ],
+    }
+
+
 @tool("UpdateBooking", args_schema=UpdateBookingInput)
-def update_booking(
+async def update_booking(
     reservation_id: str,
     building: Optional[Union[str, int]] = None,
     floor: Optional[Union[int, str]] = None,
@@ -104,22 +156,19 @@ def update_booking(
     purpose: Optional[str] = None,
 ) -> Dict[str, Any]:
     """예약 시간/장소/제목/목적을 수정합니다."""
+    curr = await get_reservation(reservation_id)
+    if not curr:
+        return {"ok": False, "error": "존재하지 않는 예약입니다."}
     updates: Dict[str, Any] = {}
     if building is not None:
-        updates["building_id"] = resolve_building_id(building)
+        updates["building_id"] = await resolve_building_id(building)
     if floor is not None:
-        curr = get_reservation(reservation_id)
-        if not curr and "building_id" not in updates:
-            return {"ok": False, "error": "존재하지 않는 예약입니다."}
-        b_for = updates.get("building_id", curr["building_id"] if curr else None)
-        updates["floor_id"] = resolve_floor_id(b_for, floor)
+        b_for = updates.get("building_id", curr["building_id"])
+        updates["floor_id"] = await resolve_floor_id(b_for, floor)
     if room is not None:
-        curr = get_reservation(reservation_id)
-        if not curr and ("building_id" not in updates or "floor_id" not in updates):
-            return {"ok": False, "error": "존재하지 않는 예약입니다."}
         b_for = updates.get("building_id", curr["building_id"])
         f_for = updates.get("floor_id", curr["floor_id"])
-        updates["room_id"] = resolve_room_id(b_for, f_for, room)
+        updates["room_id"] = await resolve_room_id(b_for, f_for, room)
     if start is not None:
         updates["start_datetime"] = parse_iso(start)
     if end is not None:
@@ -128,51 +177,46 @@ def update_booking(
         updates["title"] = title
     if purpose is not None:
         updates["purpose"] = purpose
-    ok, msg = update_reservation(reservation_id, **updates)
+    ok, msg = await update_reservation(reservation_id, existing=curr, **updates)
     if not ok:
-        curr = get_reservation(reservation_id)
-        if not curr:
-            return {"ok": False, "error": msg}
         b_id = updates.get("building_id", curr["building_id"])
         f_id = updates.get("floor_id", curr["floor_id"])
         r_id = updates.get("room_id", curr["room_id"])
         s_dt = updates.get("start_datetime", curr["start_datetime"])
         e_dt = updates.get("end_datetime", curr["end_datetime"])
-        return {"ok": False, "message": msg, "suggestions": suggest_same_room_slots(b_id, f_id, r_id, s_dt, e_dt, n=3)}
+        return {"ok": False, "message": msg, "suggestions": await suggest_slots(b_id, f_id, r_id, s_dt, e_dt, n=3)}
     return {"ok": True, "message": msg}
 
 
 @tool("CancelBooking", args_schema=CancelBookingInput)
-def cancel_booking(reservation_id: str) -> Dict[str, Any]:
+async def cancel_booking(reservation_id: str) -> Dict[str, Any]:
     """예약을 취소합니다."""
-    ok, msg = cancel_reservation(reservation_id)
+    ok, msg = await cancel_reservation(reservation_id)
     return {"ok": ok, "message": msg}
 
 
 @tool("GetUserReservations", args_schema=GetUserReservationsInput)
-def get_user_reservations(
-    user_name: str, days_ahead: int = 7, building: Optional[Union[str, int]] = None
+async def get_user_reservations(
+    user_name: str, days_ahead: int = 7, building: Optional[Union[str, int]] = None,
+    limit: int = 50, cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """사용자의 예약 목록을 오늘부터 N일까지 조회합니다. building으로 필터 가능."""
+    """사용자의 예약 목록을 오늘부터 N일까지 시작 시각 순으로 조회합니다. building으로 필터 가능.
+    결과가 limit보다 많으면 next_cursor를 cursor로 넘겨 다음 페이지를 조회합니다."""
     from datetime import date, timedelta
     start_day = date.today()
     end_day = start_day + timedelta(days=days_ahead)
-    b_filter = resolve_building_id(building) if building is not None else None
-    raw = get_user_reservations_list(user_name, start_day, end_day, b_filter)
-    items: List[Dict[str, Any]] = [
-        {
-            "reservation_id": r["reservation_id"],
-            "building_id": r["building_id"],
-            "floor_id": r["floor_id"],
-            "room_id": r["room_id"],
-            "title": r["title"],
-            "purpose": r["purpose"],
-            "start": r["start"].strftime(ISO_FMT) if hasattr(r["start"], "strftime") else r["start"],
-            "end": r["end"].strftime(ISO_FMT) if hasattr(r["end"], "strftime") else r["end"],
-        }
-        for r in raw
-    ]
-    return {"ok": True, "count": len(items), "items": items}
+    b_filter = await resolve_building_id(building) if building is not None else None
+    try:
+        raw, next_cursor = await get_user_reservations_page(user_name, start_day, end_day, b_filter, limit, cursor)
+    except ValueError as e:
+        return {"ok": False, "message": str(e)}
+    for r in raw:
+        r["start"] = r["start"].strftime(ISO_FMT)
+        r["end"] = r["end"].strftime(ISO_FMT)
+    result = {"ok": True, "count": len(raw), "items": raw}
+    if next_cursor:
+        result["next_cursor"] = next_cursor
+    return result
 
 
 TOOLS = {
@@ -180,7 +224,9 @@ TOOLS = {
     "ListFloors": list_floors,
     "ListRooms": list_rooms,
     "CheckAvailability": check_availability,
+    "FindFreeRooms": find_free_rooms_tool,
     "CreateBooking": create_booking,
+    "CreateRecurringBooking": create_recurring_booking,
     "UpdateBooking": update_booking,
     "CancelBooking": cancel_booking,
     "GetUserReservations": get_user_reservations,
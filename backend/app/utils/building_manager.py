@@ -1,3 +1,4 @@
+import hashlib
 from pathlib import Path
 from typing import Any, Dict
 
@@ -5,6 +6,8 @@ import yaml
 
 
 DEFAULT_BUILDINGS_DIR = "data/buildings"
+# libyaml parses the building files ~4x faster than the pure-Python loader.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def _load_yml(base_dir: Path, filename: str) -> Any:
@@ -12,14 +15,29 @@ def _load_yml(base_dir: Path, filename: str) -> Any:
     if not path.exists():
         raise FileNotFoundError(f"Buildings data not found: {path}")
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_Loader)
 
 
-def load_building_data(buildings_dir: str = None) -> tuple:
+def _base_dir(buildings_dir: str = None) -> Path:
     if buildings_dir is None:
-        base = Path(__file__).resolve().parent.parent.parent / DEFAULT_BUILDINGS_DIR
-    else:
-        base = Path(buildings_dir)
+        return Path(__file__).resolve().parent.parent.parent / DEFAULT_BUILDINGS_DIR
+    return Path(buildings_dir)
+
+
+def building_data_digest(buildings_dir: str = None) -> str:
+    """sha256 over building_ids.yml + floor_ids.yml, to skip parsing when nothing changed."""
+    base = _base_dir(buildings_dir)
+    h = hashlib.sha256()
+    for filename in ("building_ids.yml", "floor_ids.yml"):
+        path = base / filename
+        if not path.exists():
+            raise FileNotFoundError(f"Buildings data not found: {path}")
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def load_building_data(buildings_dir: str = None) -> tuple:
+    base = _base_dir(buildings_dir)
     raw_building_ids = _load_yml(base, "building_ids.yml")
     raw_floor_ids = _load_yml(base, "floor_ids.yml")
     building_ids = {}
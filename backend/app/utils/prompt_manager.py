@@ -1,3 +1,4 @@
+import hashlib
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -37,6 +38,13 @@ class PromptManager:
             text = text.format(**format_params)
         return text
 
+    def version(self, name: str) -> str:
+        """`version` key of the yml, or a hash of its content when there is none."""
+        data = self._load_yml(name)
+        if data.get("version") is not None:
+            return str(data["version"])
+        return hashlib.sha1(str(data.get("content", "")).encode("utf-8")).hexdigest()[:12]
+
     def list_prompts(self) -> list:
         if not self.prompts_dir.exists():
             return []
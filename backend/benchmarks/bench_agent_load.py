@@ -0,0 +1,138 @@
+"""Offline end-to-end load test of the agent with the fake LLM.
+
+Replays the queries of the fake LLM corpus (``data/fake_llm_corpus.yml``)
+through the compiled graph (``--target graph``) or the FastAPI ``/run``
+endpoint (``--target http``, in-process via ASGI unless ``--url`` points at a
+server started with LLM_PROVIDER=fake) at a fixed concurrency, and reports
+latency percentiles, throughput and SQL statements per request. No OpenAI key
+is needed. Bookings are really written, so use a scratch database when
+DATABASE_URL points at Postgres.
+
+    python benchmarks/bench_agent_load.py [--target graph|http] [--url URL]
+        [--requests 200] [--concurrency 16] [--llm-ms 300]
+        [--no-fast-path] [--no-cache] [--store sql|memory] [--corpus path.yml]
+"""
+import argparse
+import asyncio
+import os
+import re
+import time
+from typing import Awaitable, Callable, List
+
+from common import BACKEND_DIR, print_table, summarize
+
+
+def _configure(args) -> None:
+    # Must happen before the first get_llm() call, which builds the process-wide client.
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_ms)
+    if args.corpus:
+        os.environ["FAKE_LLM_CORPUS"] = args.corpus
+    if args.no_fast_path:
+        os.environ["FAST_PATH_ENABLED"] = "0"
+    if args.no_cache:
+        os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ["RESERVATION_STORE"] = args.store
+
+
+def _corpus_queries() -> List[str]:
+    from app.core.config import get_llm
+
+    return get_llm().queries()
+
+
+def _local_db_queries() -> float:
+    from app.core.metrics import DB_QUERIES
+
+    return sum(s.value for m in DB_QUERIES.collect() for s in m.samples if s.name.endswith("_total"))
+
+
+async def _remote_db_queries(client) -> float:
+    text = (await client.get("/metrics")).text
+    return sum(float(v) for v in re.findall(r"^agent_db_queries_total\{[^}]*\} (\S+)$", text, re.M))
+
+
+async def _drive(call: Callable[[str], Awaitable[None]], queries: List[str], n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await call(queries[i % len(queries)])
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return latencies, time.perf_counter() - t0, errors
+
+
+async def main_async(args) -> None:
+    from common import setup_database
+
+    if not args.url:
+        print(f"database: {setup_database()}")
+    queries = _corpus_queries()
+
+    if args.target == "graph":
+        from run import arun, startup
+
+        await startup()
+
+        async def call(q: str) -> None:
+            await arun(q)
+
+        before = _local_db_queries()
+        latencies, wall, errors = await _drive(call, queries, args.requests, args.concurrency)
+        db_queries = _local_db_queries() - before
+    else:
+        import httpx
+
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        else:
+            from run import startup
+            from server import app
+
+            await startup()
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+        async def call(q: str) -> None:
+            res = await client.post("/run", json={"query": q})
+            res.raise_for_status()
+
+        async with client:
+            before = await _remote_db_queries(client)
+            latencies, wall, errors = await _drive(call, queries, args.requests, args.concurrency)
+            db_queries = await _remote_db_queries(client) - before
+
+    print(f"target={args.target} store={args.store} requests={args.requests} concurrency={args.concurrency} "
+          f"llm_ms={args.llm_ms} corpus_queries={len(queries)} errors={errors}")
+    print_table({args.target: summarize(latencies)})
+    print(f"throughput={args.requests / wall:.1f} req/s  wall={wall:.2f}s")
+    print(f"db_queries/request={db_queries / args.requests:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("graph", "http"), default="graph")
+    parser.add_argument("--url", default=None, help="running server to hit instead of in-process ASGI")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="fake LLM latency per call")
+    parser.add_argument("--corpus", default=str(BACKEND_DIR / "data" / "fake_llm_corpus.yml"))
+    parser.add_argument("--no-fast-path", action="store_true", help="route every query through the LLM")
+    parser.add_argument("--no-cache", action="store_true", help="disable the LLM response cache")
+    parser.add_argument("--store", choices=("sql", "memory"), default="sql", help="reservation store backend")
+    args = parser.parse_args()
+    _configure(args)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Hundreds of parallel bookers racing for the same room.
+
+Each booker asks for a random 30-120 minute slot on one day of one room, all
+fired at once through ``add_reservation``. Afterwards the room is checked for
+overlapping pairs: the count must be zero.
+
+    python benchmarks/bench_concurrent_booking.py --bookers 300
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import print_table, setup_database, summarize
+
+
+async def book(i: int, rng: random.Random, day: datetime, ids) -> tuple:
+    from app.services import add_reservation
+
+    b_id, f_id, r_id = ids
+    start = day + timedelta(minutes=rng.randrange(0, 10 * 60, 15))
+    end = start + timedelta(minutes=rng.choice([30, 60, 90, 120]))
+    t0 = time.perf_counter()
+    try:
+        ok, _msg, _res_id = await add_reservation(b_id, f_id, r_id, f"booker_{i}", "", "race", start, end)
+        err = None
+    except Exception as e:
+        ok, err = False, type(e).__name__
+    return ok, err, (time.perf_counter() - t0) * 1000
+
+
+async def run(bookers: int, seed: int) -> None:
+    from sqlalchemy import delete, func, select
+    from sqlalchemy.orm import aliased
+
+    from app.db.models import Reservation
+    from app.db.session import dispose_async_engine, get_async_session
+    from app.services import resolve_building_id, resolve_floor_id, resolve_room_id
+
+    b_id = await resolve_building_id("에펠탑")
+    f_id = await resolve_floor_id(b_id, 17)
+    r_id = await resolve_room_id(b_id, f_id, "1702-A")
+    day = datetime(2030, 1, 7, 9, 0)
+    async with get_async_session() as session:
+        await session.execute(delete(Reservation).where(Reservation.room_id == r_id))
+
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(book(i, rng, day, (b_id, f_id, r_id)) for i in range(bookers)))
+    wall = time.perf_counter() - t0
+
+    a, b = aliased(Reservation), aliased(Reservation)
+    async with get_async_session() as session:
+        overlaps = (await session.execute(
+            select(func.count()).select_from(a).join(b, a.id < b.id).where(
+                a.room_id == r_id, b.room_id == r_id,
+                a.start_datetime < b.end_datetime, a.end_datetime > b.start_datetime,
+            )
+        )).scalar()
+    await dispose_async_engine()
+
+    errors = {}
+    for _ok, err, _ms in results:
+        if err:
+            errors[err] = errors.get(err, 0) + 1
+    print(f"bookers={bookers} booked={sum(1 for ok, _, _ in results if ok)} "
+          f"errors={errors or 0} overlapping_pairs={overlaps} wall={wall:.2f}s")
+    print_table({"add_reservation": summarize([ms for _, _, ms in results])})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookers", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    setup_database()
+    asyncio.run(run(args.bookers, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Hit rate and latency saved by the rule-based router fast path.
+
+Runs every query of a corpus through ``parse_query`` and reports how many skip
+the LLM router, how long parsing takes, and the LLM latency saved assuming
+``--llm-ms`` per structured call (Check/Book skip two calls, the rest one).
+
+    python benchmarks/bench_fast_path.py [--corpus queries.txt] [--llm-ms 900]
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from datetime import date
+
+from common import setup_database
+
+DEFAULT_CORPUS = [
+    "에펠탑 17층 1702-A 2025-08-13 10:00~11:00 비었어?",
+    "에펠탑 17층 1702-A 오늘 15:00~16:00 주간 회의 예약해줘. 주최자 홍길동",
+    "예약 아이디 15473_1_1_20250813_1500 취소해줘",
+    "홍길동 내 예약 보여줘",
+    "본관 17층 1705-A 내일 오후 3시~4시 사용 가능해?",
+    "본관 1705-A 내일 10시~11시 비어있어?",
+    "15473_1_1_20250813_1500 예약을 11:00~12:00으로 변경해줘",
+    "에펠탑 1702-A 8월 20일 10시 반부터 11시 반까지 비어있어?",
+    "에펠탑 17층 1702-A 내일 10:00-11:00 제목: 스프린트 리뷰, 예약자 김철수 예약해줘",
+    "별관107 16층 1608 모레 14:00~15:30 가능?",
+    "동관A 5층 502 2025-09-01 09:00~10:00 신규 입사자 OT 예약해줘 주최자 박민수",
+    "김철수 내 예약 목록 알려줘",
+    "회의실 예약하고 싶어",
+    "내일 오후에 쓸 수 있는 방 있어?",
+    "에펠탑 18층 1801 비었어?",
+    "지난번 예약 시간 좀 바꿔줘",
+]
+
+
+async def main_async(queries, llm_ms: float) -> None:
+    from app.core.config import get_fast_path_min_confidence
+    from app.graph.fast_path import parse_query
+    from app.services import ensure_topology
+
+    topo = await ensure_topology()
+    today = date.today()
+    min_conf = get_fast_path_min_confidence()
+    for q in queries:
+        parse_query(q, topo, today)
+    hits, saved_calls, parse_s = Counter(), 0, 0.0
+    for q in queries:
+        t0 = time.perf_counter()
+        parsed = parse_query(q, topo, today)
+        parse_s += time.perf_counter() - t0
+        if parsed is not None and parsed.confidence >= min_conf:
+            hits[parsed.intent] += 1
+            saved_calls += 2 if parsed.intent in ("Check", "Book") else 1
+
+    n, n_hit = len(queries), sum(hits.values())
+    print(f"queries={n} fast_path_hits={n_hit} hit_rate={n_hit / n:.1%} by_intent={dict(hits)}")
+    print(f"mean parse time={parse_s / n * 1e6:.1f}us")
+    print(f"LLM calls skipped={saved_calls} (~{saved_calls * llm_ms / n:.0f} ms saved per query at {llm_ms:.0f} ms/call)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="one query per line (default: built-in sample)")
+    parser.add_argument("--llm-ms", type=float, default=900.0)
+    args = parser.parse_args()
+    setup_database()
+    queries = DEFAULT_CORPUS
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    asyncio.run(main_async(queries, args.llm_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start import cost of the backend entry points, from ``python -X importtime``.
+
+Each target is imported in fresh interpreters (``--repeat`` times) and the
+cumulative import time of its top-level imports is summarized. DB-only
+targets (the seed step in docker-entrypoint.sh, Alembic's env.py, importing
+run.py) must not pull in LangChain/LangGraph/OpenAI; the script exits 1 if
+one does, so it can guard regressions in CI.
+
+    python benchmarks/bench_import_time.py [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+from common import BACKEND_DIR, print_table, summarize
+
+# name -> (statement, must stay free of the agent stack)
+TARGETS: Dict[str, Tuple[str, bool]] = {
+    "seed": ("from app.db.session import init_db", True),
+    "alembic_env": ("import app.core.config, app.db.models", True),
+    "run_module": ("import run", True),
+    "agent_graph": ("import app.graph.workflow", False),
+    "server": ("import server", False),
+}
+_AGENT_STACK = re.compile(r"^(langchain\w*|langgraph\w*|openai)(\.|$)")
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _import_once(stmt: str) -> Tuple[float, Dict[str, int], Set[str]]:
+    """(total ms, cumulative us per module, modules imported) for one fresh interpreter."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    total_us, cumulative, modules = 0, {}, set()
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        cum, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        modules.add(name)
+        cumulative[name] = cum
+        if indent == 1:
+            total_us += cum
+    return total_us / 1000, cumulative, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=8, help="heaviest top-level packages to list per target")
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    rows, failures = {}, []
+    heaviest: Dict[str, List[Tuple[str, int]]] = {}
+    for name, (stmt, db_only) in TARGETS.items():
+        samples: List[float] = []
+        for _ in range(args.repeat):
+            total_ms, cumulative, modules = _import_once(stmt)
+            samples.append(total_ms)
+        rows[name] = summarize(samples)
+        packages = {}
+        for module, us in cumulative.items():
+            top = module.split(".")[0]
+            packages[top] = max(packages.get(top, 0), us)
+        heaviest[name] = sorted(packages.items(), key=lambda kv: -kv[1])[: args.top]
+        leaked = sorted(m for m in modules if _AGENT_STACK.match(m) and "." not in m)
+        if db_only and leaked:
+            failures.append(f"{name}: imports {', '.join(leaked)}")
+
+    print_table(rows)
+    for name, items in heaviest.items():
+        print(f"{name}: " + ", ".join(f"{pkg} {us / 1000:.0f}ms" for pkg, us in items))
+    if failures:
+        print("agent stack imported on a DB-only path:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Overlap-probe latency on a reservations table with millions of historical rows.
+
+Seeds ``--rows`` non-overlapping historical reservations spread over all rooms
+(server-side generate_series, one statement), then times ``db_find_overlapping``
+for random rooms around "now" with the planner allowed to use indexes and with
+index scans disabled (what the table looked like before the room/time index).
+
+Postgres only: point DATABASE_URL at a scratch database migrated to head.
+
+    python benchmarks/bench_overlap_probe.py --rows 2000000 --probes 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import print_table, setup_database, summarize
+
+SEED_SQL = """
+INSERT INTO reservations (
+    reservation_id, building_id, floor_id, room_id, user_name, purpose, title, notes,
+    start_datetime, end_datetime
+)
+SELECT
+    'bench_' || g,
+    f.building_id, r.floor_id, r.id,
+    'bench_user_' || (g % 5000), '', 'bench', '',
+    :base + ((g / :n_rooms) * interval '1 hour'),
+    :base + ((g / :n_rooms) * interval '1 hour') + interval '30 minutes'
+FROM generate_series(0, :rows - 1) AS g
+JOIN (SELECT id, floor_id, row_number() OVER (ORDER BY id) - 1 AS idx FROM rooms) r
+    ON r.idx = g % :n_rooms
+JOIN floors f ON f.id = r.floor_id
+"""
+
+
+def seed(rows: int) -> None:
+    from sqlalchemy import text
+
+    from app.db.session import get_engine
+
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM reservations WHERE reservation_id LIKE 'bench_%'"))
+        n_rooms = conn.execute(text("SELECT count(*) FROM rooms")).scalar()
+        hours = rows // n_rooms + 1
+        base = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours)
+        t0 = time.perf_counter()
+        conn.execute(text(SEED_SQL), {"base": base, "n_rooms": n_rooms, "rows": rows})
+        print(f"seeded {rows} rows over {n_rooms} rooms in {time.perf_counter() - t0:.1f}s")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE reservations"))
+
+
+async def probe(n: int, rooms) -> list:
+    from app.db.repository import db_find_overlapping
+
+    now = datetime.now().replace(second=0, microsecond=0)
+    rng = random.Random(42)
+    samples = []
+    for _ in range(n):
+        fid, bid, rid = rng.choice(rooms)
+        start = now + timedelta(minutes=rng.randrange(-600, 600, 30))
+        t0 = time.perf_counter()
+        await db_find_overlapping(bid, fid, rid, start, start + timedelta(hours=1))
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+async def run_probes(n: int, rooms, disable_indexes: bool) -> list:
+    from sqlalchemy import event
+
+    from app.db.session import dispose_async_engine, get_async_engine
+
+    await dispose_async_engine()
+    if disable_indexes:
+        def _no_index(dbapi_conn, _record):
+            cur = dbapi_conn.cursor()
+            cur.execute("SET enable_indexscan = off")
+            cur.execute("SET enable_bitmapscan = off")
+            cur.close()
+
+        event.listen(get_async_engine().sync_engine, "connect", _no_index)
+    await probe(10, rooms)
+    samples = await probe(n, rooms)
+    await dispose_async_engine()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--probes", type=int, default=500)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL", "").startswith("postgres"):
+        raise SystemExit("DATABASE_URL must point at a Postgres database")
+    setup_database()
+    if not args.skip_seed:
+        seed(args.rows)
+
+    from sqlalchemy import text
+
+    from app.db.session import get_engine
+
+    with get_engine().connect() as conn:
+        rooms = conn.execute(
+            text("SELECT r.floor_id, f.building_id, r.id FROM rooms r JOIN floors f ON f.id = r.floor_id")
+        ).all()
+
+    print_table({
+        "indexed": summarize(asyncio.run(run_probes(args.probes, rooms, disable_indexes=False))),
+        "seq scan (no index)": summarize(asyncio.run(run_probes(args.probes, rooms, disable_indexes=True))),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Per-request setup overhead of /run: before vs after the app lifecycle.
+
+Before: every request called the original ``init_db()``, i.e. ``seed_if_empty()``
+(one session and a COUNT(*) on buildings), and rebuilt/recompiled the
+StateGraph; that path is reproduced inline here because ``init_db()`` now runs
+the YAML topology sync instead. After: both happen once at startup and requests
+only look up the shared compiled agent. The LLM is not involved.
+
+    python benchmarks/bench_request_overhead.py [-n 200]
+"""
+import argparse
+
+from common import print_table, setup_database, summarize, time_calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=200, help="simulated requests per variant")
+    args = parser.parse_args()
+
+    url = setup_database()
+
+    from sqlalchemy import func, select
+
+    from app.db.models import Building
+    from app.db.session import get_engine, get_session
+    from app.graph.workflow import build_agent, get_agent
+
+    def seed_if_empty_check():
+        # The original per-request init_db(): get_engine() + seed_if_empty()'s emptiness check.
+        get_engine()
+        with get_session() as session:
+            session.scalar(select(func.count()).select_from(Building))
+
+    def per_request_setup():
+        seed_if_empty_check()
+        build_agent()
+
+    get_agent()
+    print(f"DB: {url}")
+    print_table({
+        "before (seed check + compile)": summarize(time_calls(per_request_setup, args.n)),
+        "after (shared agent)": summarize(time_calls(get_agent, args.n)),
+    })
+
+
+if __name__ == "__main__":
+    main()
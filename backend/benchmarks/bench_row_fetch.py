@@ -0,0 +1,148 @@
+"""Time and memory to fetch reservation rows: ORM entities vs Core column rows.
+
+Seeds ``--rows`` reservations into one room, then reads them all back with:
+
+- ``orm entities``: the previous repository code, ``select(Reservation)`` +
+  ``.unique().scalars()`` + one dict per entity + a Python sort;
+- ``core -> dict``: ``db_get_room_reservations`` as it is now, explicit columns,
+  ORDER BY in SQL, one dict per row;
+- ``core tuples``: the same columns as plain rows, the floor of what the DB
+  driver costs.
+
+Latency comes from untraced runs. Peak and retained memory per call come from
+one extra run under tracemalloc.
+
+    python benchmarks/bench_row_fetch.py [--rows 10000] [-n 20]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from common import print_table, setup_database, summarize
+
+
+def seed(rows: int) -> int:
+    from sqlalchemy import delete, insert, select
+
+    from app.db.models import Floor, Reservation, Room
+    from app.db.session import get_session
+
+    with get_session() as session:
+        room_id, floor_id, building_id = session.execute(
+            select(Room.id, Room.floor_id, Floor.building_id).join(Floor, Room.floor_id == Floor.id).limit(1)
+        ).one()
+        session.execute(delete(Reservation))
+        base = datetime(2020, 1, 1, 9, 0)
+        session.execute(insert(Reservation), [
+            {
+                "reservation_id": f"bench_{i}", "building_id": building_id, "floor_id": floor_id,
+                "room_id": room_id, "user_name": "bench", "purpose": "", "title": "bench", "notes": "",
+                "start_datetime": base + timedelta(hours=i),
+                "end_datetime": base + timedelta(hours=i, minutes=30),
+            }
+            for i in range(rows)
+        ])
+    return room_id
+
+
+async def orm_entities(building_id: int, floor_id: int, room_id: int) -> List[dict]:
+    from sqlalchemy import select
+
+    from app.db.models import Reservation
+    from app.db.session import get_async_session
+
+    async with get_async_session() as session:
+        q = select(Reservation).where(
+            Reservation.building_id == building_id,
+            Reservation.floor_id == floor_id,
+            Reservation.room_id == room_id,
+        )
+        rows = (await session.execute(q)).unique().scalars().all()
+        out = [
+            {
+                "reservation_id": r.reservation_id, "building_id": r.building_id, "floor_id": r.floor_id,
+                "room_id": r.room_id, "user_name": r.user_name, "purpose": r.purpose, "title": r.title,
+                "start_datetime": r.start_datetime, "end_datetime": r.end_datetime,
+            }
+            for r in rows
+        ]
+        out.sort(key=lambda x: x["start_datetime"])
+        return out
+
+
+async def core_tuples(building_id: int, floor_id: int, room_id: int) -> list:
+    from sqlalchemy import select
+
+    from app.db.models import Reservation
+    from app.db.repository import _RESERVATION_COLUMNS
+    from app.db.session import get_async_session
+
+    async with get_async_session() as session:
+        q = select(*_RESERVATION_COLUMNS).where(
+            Reservation.building_id == building_id,
+            Reservation.floor_id == floor_id,
+            Reservation.room_id == room_id,
+        ).order_by(Reservation.start_datetime)
+        return (await session.execute(q)).all()
+
+
+async def measure(fn: Callable[..., Awaitable[list]], args: tuple, n: int, rows: int) -> Dict[str, float]:
+    await fn(*args)  # warm the statement cache and the pool
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        result = await fn(*args)
+        samples.append((time.perf_counter() - t0) * 1000)
+        assert len(result) == rows
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = await fn(*args)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    stats = summarize(samples)
+    stats["peak_kib"] = (peak - before) / 1024
+    stats["retained_kib"] = (after - before) / 1024
+    return stats
+
+
+async def run(rows: int, n: int) -> None:
+    from app.db.repository import db_get_room_reservations
+    from app.services import ensure_topology
+
+    room_id = seed(rows)
+    topo = await ensure_topology()
+    floor_id = topo.rooms[room_id][0]
+    args = (topo.floors[floor_id][0], floor_id, room_id)
+    results = {
+        "orm entities": await measure(orm_entities, args, n, rows),
+        "core -> dict": await measure(db_get_room_reservations, args, n, rows),
+        "core tuples": await measure(core_tuples, args, n, rows),
+    }
+    print_table(results)
+    per = 10_000 / rows
+    print(f"\nper 10k rows ({rows} fetched per call)")
+    print("".ljust(16) + "ms".rjust(10) + "peak KiB".rjust(12) + "kept KiB".rjust(12))
+    for name, s in results.items():
+        print(
+            name.ljust(16) + f"{s['mean_ms'] * per:.1f}".rjust(10)
+            + f"{s['peak_kib'] * per:.0f}".rjust(12) + f"{s['retained_kib'] * per:.0f}".rjust(12)
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="reservations fetched per call")
+    parser.add_argument("-n", type=int, default=20, help="timed calls per variant")
+    args = parser.parse_args()
+
+    url = setup_database()
+    print(f"DB: {url}")
+    asyncio.run(run(args.rows, args.n))
+
+
+if __name__ == "__main__":
+    main()
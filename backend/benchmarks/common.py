@@ -0,0 +1,72 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against ``DATABASE_URL`` when it is set, otherwise against a
+throwaway SQLite file so they can be run without a Postgres container.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def setup_database() -> str:
+    """Point the app at a benchmark DB, create the schema and seed it."""
+    if not os.getenv("DATABASE_URL"):
+        path = Path(tempfile.gettempdir()) / "meeting_room_bench.db"
+        if path.exists():
+            path.unlink()
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    from app.db.models import Base
+    from app.db.session import get_engine, init_db
+
+    Base.metadata.create_all(get_engine())
+    init_db()
+    return os.environ["DATABASE_URL"]
+
+
+def time_calls(fn: Callable[[], object], n: int) -> List[float]:
+    """Call ``fn`` ``n`` times and return per-call latencies in milliseconds."""
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) if samples else 0.0,
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+    }
+
+
+def print_table(rows: Dict[str, Dict[str, float]]) -> None:
+    cols = ["n", "mean_ms", "p50_ms", "p95_ms", "p99_ms"]
+    width = max(len(k) for k in rows) + 2
+    print("".ljust(width) + "".join(c.rjust(12) for c in cols))
+    for name, stats in rows.items():
+        cells = []
+        for c in cols:
+            v = stats.get(c, 0)
+            cells.append((f"{v:d}" if isinstance(v, int) else f"{v:.3f}").rjust(12))
+        print(name.ljust(width) + "".join(cells))
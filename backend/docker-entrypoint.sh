@@ -31,14 +31,14 @@ fi
 echo "Running database migrations..."
 alembic upgrade head
 
-echo "Seeding database if empty..."
+echo "Syncing building topology..."
 python -c "
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path('.').resolve()))
 from app.db.session import init_db
-init_db()
-print('Database ready.')
+r = init_db()
+print(f'Database ready (topology version {r.version}).')
 "
 
 exec "$@"
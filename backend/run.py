@@ -1,21 +1,147 @@
+import asyncio
 import sys
 from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 import app.core.config  # noqa: F401
-from app.core.config import check_env_set
-from app.db.session import init_db
-from app.graph.workflow import get_agent
+from app.core.config import check_env_set, get_batch_concurrency, get_llm
+from app.db import init_db, warm_store
+from app.db.session import dispose_async_engine
+from app.services import ensure_topology
 
+# The LangGraph/LangChain stack (app.graph) is imported inside the functions that
+# need it, so importing this module for DB work stays cheap; startup() loads it once.
 
-def run(query: str) -> dict:
+_started = False
+
+
+async def startup() -> None:
+    """Check env, sync the YAML topology into the DB, load the topology and indexes and compile the agent once per process."""
+    global _started
+    if _started:
+        return
     ok, missing = check_env_set()
     if not ok:
         raise RuntimeError(f"필수 환경 변수가 없습니다: {missing}. .env에 OPENAI_API_KEY를 설정하세요.")
-    init_db()
-    agent = get_agent()
-    return agent.invoke({"query": query})
+    # The YAML sync runs on the sync engine; keep it off the event loop.
+    await asyncio.to_thread(init_db)
+    await ensure_topology()
+    await warm_store()
+    from app.graph.checkpoint import init_checkpointer
+    from app.graph.workflow import get_agent
+
+    await init_checkpointer()
+    get_agent()
+    get_llm()
+    _started = True
+
+
+async def shutdown() -> None:
+    global _started
+    if _started:
+        from app.graph.checkpoint import close_checkpointer
+        from app.graph.workflow import reset_conversation_agent
+
+        await close_checkpointer()
+        reset_conversation_agent()
+    _started = False
+
+
+def _agent_and_config(thread_id: Optional[str]) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """Stateless agent, or the checkpointed one when the run belongs to a conversation thread."""
+    from app.graph.workflow import get_agent, get_conversation_agent
+
+    if not thread_id:
+        return get_agent(), None
+    return get_conversation_agent(), {"configurable": {"thread_id": thread_id}}
+
+
+async def arun(query: str, thread_id: Optional[str] = None) -> dict:
+    """Run one query; with thread_id, a follow-up to an unanswered question continues that request."""
+    await startup()
+    agent, config = _agent_and_config(thread_id)
+    return await agent.ainvoke({"query": query}, config)
+
+
+_STREAMED_NODES = ("Router", "Executor", "Reporter", "ReverseQuestioner")
+
+
+def _node_summary(node: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    if node == "Router":
+        return {"intent": state.get("intent"), "need_more": state.get("need_more", False)}
+    if node == "Executor":
+        plan = state.get("plan") or []
+        results = [r or {} for r in state.get("results") or []]
+        return {"tool": plan[0] if plan else None, "tools": plan, "ok": all(r.get("ok") for r in results)}
+    return {}
+
+
+async def astream(query: str, thread_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Yield node-completion and reporter-token events while the agent runs, then the final answer.
+
+    Events: {"event": "node", "node", "data"}, {"event": "token", "text"},
+    {"event": "final", "final_answer"}.
+    """
+    await startup()
+    final: Dict[str, Any] = {}
+    agent, config = _agent_and_config(thread_id)
+    async for ev in agent.astream_events({"query": query}, config, version="v2"):
+        kind = ev["event"]
+        node = ev.get("metadata", {}).get("langgraph_node")
+        if kind == "on_chat_model_stream" and node == "Reporter":
+            text = ev["data"]["chunk"].content
+            if isinstance(text, str) and text:
+                yield {"event": "token", "text": text}
+        elif kind == "on_chain_end" and ev["name"] in _STREAMED_NODES and node == ev["name"]:
+            state = ev["data"].get("output")
+            if isinstance(state, dict):
+                yield {"event": "node", "node": node, "data": _node_summary(node, state)}
+        elif kind == "on_chain_end" and not ev.get("parent_ids"):
+            final = ev["data"].get("output") or {}
+    yield {"event": "final", "final_answer": final.get("final_answer", "")}
+
+
+async def arun_batch(
+    queries: List[str], concurrency: Optional[int] = None
+) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """Run queries through the shared agent, at most `concurrency` at a time.
+
+    Yields (index, result) in completion order; a failed query yields
+    (index, {"error": message}). Closing the iterator cancels unfinished queries.
+    """
+    await startup()
+    agent, _ = _agent_and_config(None)
+    sem = asyncio.Semaphore(max(1, concurrency or get_batch_concurrency()))
+
+    async def one(i: int, query: str) -> Tuple[int, Dict[str, Any]]:
+        async with sem:
+            try:
+                return i, await agent.ainvoke({"query": query})
+            except Exception as e:
+                return i, {"error": str(e)}
+
+    tasks = [asyncio.ensure_future(one(i, q)) for i, q in enumerate(queries)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run(query: str) -> dict:
+    """Run one query on a fresh event loop; loop-bound resources (engine pool, checkpointer) are released on exit."""
+
+    async def once() -> dict:
+        try:
+            return await arun(query)
+        finally:
+            await shutdown()
+            await dispose_async_engine()
+
+    return asyncio.run(once())
 
 
 if __name__ == "__main__":
@@ -1,15 +1,39 @@
+import json
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import List, Optional
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 
-from run import run as agent_run
+from app.core.config import get_batch_max_queries
+from app.core.llm_cache import llm_cache_stats
+from app.core.metrics import render_metrics
+from app.db.session import dispose_async_engine
+from run import arun as agent_run
+from run import arun_batch as agent_run_batch
+from run import astream as agent_stream
+from run import shutdown, startup
 
-app = FastAPI(title="Meeting Room Agent", description="회의실 예약/조회 LangGraph 에이전트 API")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await startup()
+    yield
+    await shutdown()
+    await dispose_async_engine()
+
+
+app = FastAPI(
+    title="Meeting Room Agent",
+    description="회의실 예약/조회 LangGraph 에이전트 API",
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,28 +46,99 @@ app.add_middleware(
 
 class RunRequest(BaseModel):
     query: str
+    thread_id: Optional[str] = Field(default=None, max_length=128, description="대화 스레드 ID (역질문에 이어 답할 때 같은 값)")
 
 
 class RunResponse(BaseModel):
     final_answer: str
     success: bool = True
+    thread_id: Optional[str] = None
+    need_more: bool = False
+
+
+class BatchRunRequest(BaseModel):
+    queries: List[str] = Field(min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1, le=64)
 
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    stats = llm_cache_stats
+    return {
+        "status": "ok",
+        "llm_cache": {
+            "hits": stats.hits,
+            "shared_hits": stats.shared_hits,
+            "misses": stats.misses,
+            "hit_rate": round(stats.hit_rate, 4),
+        },
+    }
 
 
 @app.post("/run", response_model=RunResponse)
-def run_agent(req: RunRequest):
+async def run_agent(req: RunRequest):
     try:
-        result = agent_run(req.query)
+        result = await agent_run(req.query, req.thread_id)
         answer = result.get("final_answer", "")
-        return RunResponse(final_answer=answer, success=True)
+        return RunResponse(
+            final_answer=answer, success=True, thread_id=req.thread_id, need_more=bool(result.get("need_more")),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/run/stream")
+async def run_agent_stream(req: RunRequest):
+    """Server-Sent Events: `node` per finished graph node, `token` per reporter chunk, then `final`."""
+    async def events():
+        try:
+            async for ev in agent_stream(req.query, req.thread_id):
+                yield _sse(ev.pop("event"), ev)
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/run/batch")
+async def run_agent_batch(req: BatchRunRequest):
+    """NDJSON, one line per query in completion order: {"index", "final_answer", "success"[, "error"]}.
+
+    Queries share the compiled graph, topology snapshot and LLM client; at most
+    `concurrency` (default BATCH_CONCURRENCY) run at once.
+    """
+    limit = get_batch_max_queries()
+    if len(req.queries) > limit:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {limit}개 질의까지 처리할 수 있습니다.")
+
+    async def lines():
+        async for i, result in agent_run_batch(req.queries, req.concurrency):
+            item = {"index": i, "final_answer": result.get("final_answer", ""), "success": "error" not in result}
+            if "error" in result:
+                item["error"] = result["error"]
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,62 @@
+"""Shared fixtures: the app on a throwaway SQLite DB seeded from data/buildings.
+
+Uses the same setup as the benchmarks (benchmarks/common.py). Async code is
+driven with asyncio.run() through the `arun` fixture, one loop per call, and
+the async engine is disposed after each call so no pool outlives its loop.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from common import setup_database  # noqa: E402
+
+# Fixtures delete every reservation, so never run against a configured DATABASE_URL.
+os.environ.pop("DATABASE_URL", None)
+os.environ.update({"RESERVATION_STORE": "sql", "OCCUPANCY_INDEX": "0"})
+os.environ.pop("SUGGEST_NEARBY_ROOMS", None)
+setup_database()
+
+from sqlalchemy import delete  # noqa: E402
+
+from app.db.models import Reservation  # noqa: E402
+from app.db.session import dispose_async_engine, get_session  # noqa: E402
+from app.db.store import set_store  # noqa: E402
+
+
+@pytest.fixture
+def arun():
+    def run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await dispose_async_engine()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture(autouse=True)
+def empty_reservations():
+    with get_session() as session:
+        session.execute(delete(Reservation))
+    set_store(None)
+    yield
+    set_store(None)
+
+
+@pytest.fixture
+def eiffel(arun):
+    """(building_id, floor_id, {room name: room_id}) of 에펠탑 17층."""
+    from app.services import ensure_topology
+
+    topo = arun(ensure_topology())
+    building_id = topo.building_ids["에펠탑"]
+    floor_id = topo.floor_ids[building_id][17]
+    return building_id, floor_id, dict(topo.room_ids[floor_id])
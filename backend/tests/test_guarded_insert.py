@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from app.db.repository import db_get_reservation, db_try_add_reservation
+from app.services.reservation_service import generate_reservation_id
+
+
+def _book(arun, building_id, floor_id, room_id, start, end, user_name="홍길동"):
+    reservation_id = generate_reservation_id(building_id, floor_id, room_id, start)
+    conflict = arun(db_try_add_reservation(
+        reservation_id, building_id, floor_id, room_id, user_name, "회의", "회의", start, end,
+    ))
+    return reservation_id, conflict
+
+
+def test_free_slot_is_inserted(arun, eiffel):
+    b, f, rooms = eiffel
+    rid, conflict = _book(arun, b, f, rooms["1702-A"], datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 11))
+    assert conflict is None
+    assert arun(db_get_reservation(rid))["user_name"] == "홍길동"
+
+
+def test_overlap_returns_the_existing_reservation(arun, eiffel):
+    b, f, rooms = eiffel
+    first, _ = _book(arun, b, f, rooms["1702-A"], datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 11))
+    rid, conflict = _book(arun, b, f, rooms["1702-A"], datetime(2030, 8, 13, 10, 30), datetime(2030, 8, 13, 11, 30))
+    assert conflict == first
+    assert arun(db_get_reservation(rid)) is None
+
+
+def test_same_start_reports_the_taken_id(arun, eiffel):
+    b, f, rooms = eiffel
+    first, _ = _book(arun, b, f, rooms["1702-A"], datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 11))
+    _, conflict = _book(arun, b, f, rooms["1702-A"], datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 10, 30), "김철수")
+    assert conflict == first
+    assert arun(db_get_reservation(first))["user_name"] == "홍길동"
+
+
+def test_back_to_back_and_other_rooms_do_not_conflict(arun, eiffel):
+    b, f, rooms = eiffel
+    _book(arun, b, f, rooms["1702-A"], datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 11))
+    _, after = _book(arun, b, f, rooms["1702-A"], datetime(2030, 8, 13, 11), datetime(2030, 8, 13, 12))
+    _, other_room = _book(arun, b, f, rooms["1705"], datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 11))
+    assert after is None
+    assert other_room is None
@@ -0,0 +1,75 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.db.memory_store import MemoryReservationStore
+from app.db.store import SqlReservationStore
+
+
+@pytest.fixture(params=["sql", "memory"])
+def store(request):
+    return SqlReservationStore() if request.param == "sql" else MemoryReservationStore()
+
+
+def _args(b, f, r, start, minutes, user_name="홍길동"):
+    rid = f"{b}_{f}_{r}_{start:%Y%m%d_%H%M}"
+    return (rid, b, f, r, user_name, "회의", "회의", start, start + timedelta(minutes=minutes))
+
+
+def test_store_contract(arun, eiffel, store):
+    b, f, rooms = eiffel
+    r = rooms["1702-A"]
+    first = _args(b, f, r, datetime(2030, 8, 13, 10), 60)
+    assert arun(store.try_add(*first)) is None
+    assert arun(store.try_add(*_args(b, f, r, datetime(2030, 8, 13, 10, 30), 60))) == first[0]
+    assert arun(store.try_add(*_args(b, f, r, datetime(2030, 8, 13, 11), 30))) is None
+
+    assert arun(store.find_overlapping(b, f, r, datetime(2030, 8, 13, 9), datetime(2030, 8, 13, 10))) is None
+    assert arun(store.find_overlapping(b, f, r, datetime(2030, 8, 13, 9), datetime(2030, 8, 13, 10, 1))) == first[0]
+    assert arun(store.find_overlapping(
+        b, f, r, datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 11), exclude_reservation_id=first[0],
+    )) is None
+    assert arun(store.busy_room_ids(rooms.values(), datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 12))) == {r}
+
+    day = [x["reservation_id"] for x in arun(store.room_reservations(b, f, r, date(2030, 8, 13)))]
+    assert day == [first[0], f"{b}_{f}_{r}_20300813_1100"]
+    assert arun(store.delete(first[0])) is True
+    assert arun(store.delete(first[0])) is False
+    assert arun(store.get(first[0])) is None
+
+
+def test_memory_store_matches_sql(arun, eiffel):
+    """Random bookings, moves and cancellations give the same answers on both stores.
+
+    With several overlapping reservations either store may name a different one,
+    so conflicts are compared by whether there is one.
+    """
+    b, f, rooms = eiffel
+    room_ids = list(rooms.values())[:3]
+    sql, mem = SqlReservationStore(), MemoryReservationStore()
+    rnd = random.Random(7)
+    base = datetime(2030, 1, 1, 8)
+    ids = []
+    for _ in range(300):
+        r = rnd.choice(room_ids)
+        start = base + timedelta(days=rnd.randint(0, 2), minutes=30 * rnd.randint(0, 20))
+        new = _args(b, f, r, start, 30 * rnd.randint(1, 4), rnd.choice(["a", "b", "c"]))
+        op = rnd.random()
+        if op < 0.5:
+            assert (arun(sql.try_add(*new)) is None) == (arun(mem.try_add(*new)) is None)
+            ids.append(new[0])
+        elif op < 0.65 and ids:
+            old = rnd.choice(ids)
+            assert (arun(sql.replace(old, *new)) is None) == (arun(mem.replace(old, *new)) is None)
+            ids.append(new[0])
+        elif op < 0.75 and ids:
+            old = rnd.choice(ids)
+            assert arun(sql.delete(old)) == arun(mem.delete(old))
+        else:
+            window = (start, start + timedelta(hours=2))
+            assert arun(sql.room_intervals(room_ids, *window)) == arun(mem.room_intervals(room_ids, *window))
+    for user_name in "abc":
+        assert arun(sql.user_reservations(user_name, date(2030, 1, 1), date(2030, 1, 5))) == arun(
+            mem.user_reservations(user_name, date(2030, 1, 1), date(2030, 1, 5))
+        )
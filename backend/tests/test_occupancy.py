@@ -0,0 +1,96 @@
+import asyncio
+import random
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app.db.memory_store import MemoryReservationStore
+from app.db.occupancy import OccupancyIndex, OccupancyIndexedStore
+from app.services.reservation_service import _sweep_gaps
+
+DAY = date(2030, 8, 13)
+
+
+def at(hour, minute=0, day=DAY):
+    return datetime.combine(day, time(hour, minute))
+
+
+@pytest.fixture
+def index():
+    return OccupancyIndex(DAY, slot_minutes=15, horizon_days=3)
+
+
+def test_aligned_questions_are_answered_from_the_bits(index):
+    index.add("a", 1, at(10), at(11))
+    assert index.is_free(1, at(10, 30), at(11, 30)) is False
+    assert index.is_free(1, at(11), at(12)) is True
+    assert index.is_free(1, at(9), at(10)) is True
+    assert index.is_free(2, at(10), at(11)) is True
+
+
+def test_inconclusive_questions_go_to_the_store(index):
+    index.add("a", 1, at(10, 5), at(10, 50))
+    assert index.is_free(1, at(10, 50), at(11)) is None
+    assert index.is_free(1, at(10), at(10, 15)) is None
+    assert index.is_free(1, at(9), at(10)) is True
+    assert index.is_free(1, at(10), at(11, 0, DAY + timedelta(days=3))) is None
+
+
+def test_remove_keeps_the_neighbour_sharing_an_edge_slot(index):
+    index.add("a", 1, at(10), at(10, 50))
+    index.add("b", 1, at(10, 50), at(11, 30))
+    index.remove("a")
+    assert index.is_free(1, at(10), at(10, 45)) is True
+    # 10:45-11:00 is still b's edge slot; b is off-slot, so the store decides.
+    assert index.is_free(1, at(10, 45), at(11)) is None
+    assert index.span("b") == (1, at(10, 50), at(11, 30))
+
+
+def test_busy_intervals_are_clipped_to_the_query(index):
+    index.add("a", 1, at(10), at(11))
+    index.add("b", 1, at(12), at(13))
+    assert index.busy_intervals(1, at(10, 2), at(12, 7)) == [(at(10, 2), at(11)), (at(12), at(12, 7))]
+    assert index.busy_intervals(1, at(9), at(14)) == [(at(10), at(11)), (at(12), at(13))]
+
+
+def test_indexed_store_matches_the_wrapped_store(arun):
+    """Random writes through the index give the same conflicts, busy rooms and gaps as a plain store."""
+    plain = MemoryReservationStore()
+    occ = OccupancyIndexedStore(MemoryReservationStore(), slot_minutes=15, horizon_days=3)
+    arun(occ.rebuild())
+    today = datetime.combine(date.today(), time())
+    rooms = [1, 2, 3]
+    rnd = random.Random(7)
+    ids = []
+    for step in range(1500):
+        room_id = rnd.choice(rooms)
+        start = today + timedelta(days=rnd.randint(-1, 3), minutes=rnd.choice([5, 15, 30]) * rnd.randint(0, 280))
+        end = start + timedelta(minutes=rnd.choice([15, 30, 60, 13]) * rnd.randint(1, 4))
+        op = rnd.random()
+        if op < 0.4:
+            args = (f"r{step}", 1, 1, room_id, "u", "p", "t", start, end)
+            assert (arun(plain.try_add(*args)) is None) == (arun(occ.try_add(*args)) is None)
+            ids.append(f"r{step}")
+        elif op < 0.5 and ids:
+            old = rnd.choice(ids)
+            assert arun(plain.delete(old)) == arun(occ.delete(old))
+        else:
+            assert (arun(plain.find_overlapping(1, 1, room_id, start, end)) is None) == (
+                arun(occ.find_overlapping(1, 1, room_id, start, end)) is None
+            )
+            assert arun(plain.busy_room_ids(rooms, start, end)) == arun(occ.busy_room_ids(rooms, start, end))
+            a, b = arun(plain.room_intervals(rooms, start, end)), arun(occ.room_intervals(rooms, start, end))
+            for room in rooms:
+                assert _sweep_gaps(a[room], [(start, end)]) == _sweep_gaps(b[room], [(start, end)])
+
+
+def test_rebuild_works_from_successive_event_loops(arun):
+    occ = OccupancyIndexedStore(MemoryReservationStore(), slot_minutes=15, horizon_days=3)
+
+    async def contended_rebuild():
+        occ._index.first_day = None
+        await asyncio.gather(*[occ.rebuild() for _ in range(5)])
+
+    for _ in range(2):
+        arun(contended_rebuild())
+        assert occ._index.first_day == date.today()
@@ -0,0 +1,69 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.db.memory_store import MemoryReservationStore
+from app.db.store import set_store
+from app.services.reservation_service import (
+    MAX_OCCURRENCES,
+    add_recurring_reservations,
+    add_reservation,
+    expand_occurrences,
+)
+
+START, END = datetime(2030, 8, 13, 10), datetime(2030, 8, 13, 11)
+
+
+def test_weekly_count():
+    out = expand_occurrences(START, END, "weekly", count=3)
+    assert out == [(START + timedelta(weeks=i), END + timedelta(weeks=i)) for i in range(3)]
+
+
+def test_daily_interval_until_is_inclusive():
+    out = expand_occurrences(START, END, "daily", interval=2, until=date(2030, 8, 19))
+    assert [s.day for s, _ in out] == [13, 15, 17, 19]
+
+
+def test_count_and_until_stop_at_whichever_comes_first():
+    assert len(expand_occurrences(START, END, "weekly", count=10, until=date(2030, 8, 27))) == 3
+    assert len(expand_occurrences(START, END, "weekly", count=2, until=date(2030, 12, 31))) == 2
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"repeat": "monthly", "count": 3},
+    {"repeat": "weekly"},
+    {"repeat": "weekly", "until": date(2030, 8, 12)},
+    {"repeat": "daily", "count": MAX_OCCURRENCES + 1},
+    {"repeat": "daily", "until": date(2032, 1, 1)},
+])
+def test_invalid_series_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        expand_occurrences(START, END, **kwargs)
+
+
+def test_meeting_longer_than_the_interval_is_rejected():
+    with pytest.raises(ValueError):
+        expand_occurrences(START, START + timedelta(hours=25), "daily", count=3)
+
+
+@pytest.mark.parametrize("backend", ["sql", "memory"])
+def test_series_books_free_occurrences_and_reports_conflicts(arun, eiffel, backend):
+    if backend == "memory":
+        set_store(MemoryReservationStore())
+    b, f, rooms = eiffel
+    r = rooms["1702-A"]
+    blockers = []
+    for week in (2, 5):
+        start = START + timedelta(weeks=week, minutes=30)
+        ok, _, rid = arun(add_reservation(b, f, r, "김철수", "회의", "회의", start, start + timedelta(hours=1)))
+        assert ok
+        blockers.append(rid)
+
+    booked, conflicts = arun(add_recurring_reservations(
+        b, f, r, "홍길동", "스탠드업", "스탠드업", START, END, "weekly", count=8,
+    ))
+    assert len(booked) == 6
+    assert [(row["start_datetime"], conflict) for row, conflict in conflicts] == [
+        (START + timedelta(weeks=2), blockers[0]),
+        (START + timedelta(weeks=5), blockers[1]),
+    ]
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.reservation_service import add_reservation, suggest_slots
+
+
+@pytest.fixture
+def busy_morning(arun, eiffel):
+    """1702-A on 2030-08-13 is taken 10:00-11:00 and 11:00-18:00."""
+    b, f, rooms = eiffel
+    for start, end in ((10, 11), (11, 18)):
+        ok, _, _ = arun(add_reservation(
+            b, f, rooms["1702-A"], "홍길동", "회의", "회의", datetime(2030, 8, 13, start), datetime(2030, 8, 13, end),
+        ))
+        assert ok
+    return eiffel
+
+
+def _suggest(arun, eiffel, **kwargs):
+    b, f, rooms = eiffel
+    return arun(suggest_slots(
+        b, f, rooms["1702-A"], datetime(2030, 8, 13, 10, 30), datetime(2030, 8, 13, 11, 30), days=2, **kwargs,
+    ))
+
+
+def test_same_room_slots_closest_first(arun, busy_morning):
+    slots = _suggest(arun, busy_morning)
+    assert [(s["start"], s["end"]) for s in slots] == [
+        ("2030-08-13T09:00", "2030-08-13T10:00"),
+        ("2030-08-13T18:00", "2030-08-13T19:00"),
+        ("2030-08-14T09:00", "2030-08-14T10:00"),
+    ]
+    assert all("room" not in s for s in slots)
+
+
+def test_nearby_rooms_are_extras_after_the_requested_room(arun, busy_morning):
+    slots = _suggest(arun, busy_morning, nearby_rooms=2)
+    assert len(slots) == 5
+    assert all("room" not in s for s in slots[:3])
+    assert [(s["room"], s["start"]) for s in slots[3:]] == [
+        ("1705", "2030-08-13T10:30"),
+        ("1708-B", "2030-08-13T10:30"),
+    ]
+
+
+def test_free_request_time_is_suggested_as_is(arun, eiffel):
+    b, f, rooms = eiffel
+    slots = arun(suggest_slots(
+        b, f, rooms["1705"], datetime(2030, 8, 13, 10, 30), datetime(2030, 8, 13, 11, 30), n=1, days=1,
+    ))
+    assert slots == [{"start": "2030-08-13T10:30", "end": "2030-08-13T11:30"}]
@@ -1,16 +1,55 @@
 import { useState } from 'react'
 
-async function runAgent(query: string): Promise<{ final_answer: string; success: boolean }> {
-  const res = await fetch('/api/run', {
+type StreamHandlers = {
+  onNode: (node: string, data: Record<string, unknown>) => void
+  onToken: (text: string) => void
+}
+
+const NODE_LABELS: Record<string, string> = {
+  Router: '요청 분석 완료',
+  Executor: '조회/예약 처리 완료',
+  ReverseQuestioner: '추가 정보 필요',
+  Reporter: '응답 작성 완료',
+}
+
+// POST /api/run/stream 을 읽으면서 SSE 이벤트(node/token/final/error)를 처리하고 최종 답변을 반환
+// threadId가 같으면 역질문("다음 정보를 알려주세요")에 빠진 정보만 답해도 이전 요청에 이어서 처리됨
+async function runAgentStream(query: string, threadId: string, handlers: StreamHandlers): Promise<string> {
+  const res = await fetch('/api/run/stream', {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ query }),
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify({ query, thread_id: threadId }),
   })
-  if (!res.ok) {
+  if (!res.ok || !res.body) {
     const text = await res.text()
     throw new Error(text || res.statusText)
   }
-  return res.json()
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let finalAnswer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let sep: number
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, sep)
+      buffer = buffer.slice(sep + 2)
+      let event = 'message'
+      let data = ''
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data += line.slice(5).trim()
+      }
+      const payload = data ? JSON.parse(data) : {}
+      if (event === 'node') handlers.onNode(payload.node, payload.data ?? {})
+      else if (event === 'token') handlers.onToken(payload.text ?? '')
+      else if (event === 'final') finalAnswer = payload.final_answer ?? ''
+      else if (event === 'error') throw new Error(payload.detail || '요청 실패')
+    }
+  }
+  return finalAnswer
 }
 
 export default function App() {
@@ -18,6 +57,8 @@ export default function App() {
   const [answer, setAnswer] = useState<string | null>(null)
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  const [progress, setProgress] = useState<string[]>([])
+  const [threadId] = useState(() => crypto.randomUUID())
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault()
@@ -25,9 +66,16 @@ export default function App() {
     setLoading(true)
     setError(null)
     setAnswer(null)
+    setProgress([])
     try {
-      const data = await runAgent(query.trim())
-      setAnswer(data.final_answer ?? '')
+      const final = await runAgentStream(query.trim(), threadId, {
+        onNode: (node) => {
+          const label = NODE_LABELS[node]
+          if (label) setProgress((prev) => [...prev, label])
+        },
+        onToken: (text) => setAnswer((prev) => (prev ?? '') + text),
+      })
+      setAnswer(final)
     } catch (err) {
       setError(err instanceof Error ? err.message : '요청 실패')
     } finally {
@@ -74,6 +122,9 @@ export default function App() {
           {loading ? '처리 중…' : '보내기'}
         </button>
       </form>
+      {loading && progress.length > 0 && (
+        <p style={{ marginTop: '1rem', color: '#666', fontSize: '0.85rem' }}>{progress.join(' → ')}</p>
+      )}
       {error && (
         <div style={{ marginTop: '1rem', padding: '0.75rem', background: '#fef2f2', color: '#b91c1c', borderRadius: 8 }}>
           {error}